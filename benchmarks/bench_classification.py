@@ -0,0 +1,57 @@
+# benchmarks/bench_classification.py
+"""
+Vergleicht die Einstufung eines kompletten Abrufs über ThresholdClassifier (ein NumPy-Durchlauf)
+mit der bisherigen Schleife über check_for_warning, für synthetische Stationen.
+
+Aufruf: python benchmarks/bench_classification.py [--stations 244 10000 100000]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import time
+import random
+import argparse
+from classification import ThresholdClassifier, level_for
+
+
+def synthetic_stations(count):
+    rng = random.Random(42)
+    threshold_map = {}
+    for i in range(count):
+        mw = rng.randint(20, 200)
+        threshold_map[f"Station {i}"] = {
+            "MW": mw, "HW2": mw + 100, "HW20": mw + 180, "HW50": mw + 210, "HW100": mw + 240,
+        }
+    values = [rng.randint(0, 500) for _ in range(count)]
+    return threshold_map, values
+
+
+def best_of(func, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[244, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'stationen':>10} {'aufbau (ms)':>12} {'numpy (ms)':>11} {'schleife (ms)':>14}")
+    for count in args.stations:
+        threshold_map, values = synthetic_stations(count)
+        names = list(threshold_map)
+        build = best_of(lambda: ThresholdClassifier(threshold_map), runs=1)
+        classifier = ThresholdClassifier(threshold_map)
+        indices = classifier.indices(names)
+        vectorized = best_of(lambda: classifier.classify(names, values, indices))
+        loop = best_of(lambda: [level_for(v, threshold_map[n]) for n, v in zip(names, values)])
+        print(f"{count:>10} {build * 1000:>12.2f} {vectorized * 1000:>11.2f} {loop * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
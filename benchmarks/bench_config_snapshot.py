@@ -0,0 +1,95 @@
+# benchmarks/bench_config_snapshot.py
+"""
+Vergleicht Ladezeit und belegten Speicher von load_config (JSON) und load_config_snapshot
+(kompilierter Snapshot) für die echte Konfiguration und synthetische Stationslisten.
+
+Der Speicher wird mit tracemalloc als Größe der nach dem Laden gehaltenen Objekte gemessen;
+die per mmap eingeblendete Schwellentabelle zählt dabei nicht mit und steht als Dateigröße
+des Snapshots daneben.
+
+Aufruf: python benchmarks/bench_config_snapshot.py [--stations 244 50000]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import gc
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from config_manager import load_config, save_config
+from config_snapshot import load_config_snapshot, snapshot_path_for
+
+
+def synthetic_config(count):
+    rng = random.Random(42)
+    base, _ = load_config(os.path.join(ROOT, "config", "water_level_config.json"))
+    stations = []
+    for i in range(count):
+        mw = rng.randint(20, 200)
+        stations.append({
+            "name": f"Station {i}",
+            "riverName": f"Fluss {i % 400}",
+            "riverAreaName": f"Gebiet {i % 12}",
+            "catchmentArea": f"{rng.randint(1, 9000)},{rng.randint(0, 99):02d} km²",
+            "href": f"/flussgebiet/gebiet{i % 12}/station{i}",
+            "waterThresholds": {"HW100": mw + 240, "HW50": mw + 210, "HW20": mw + 180, "HW2": mw + 100, "MW": mw},
+        })
+    return {"general_config": base["general_config"], "water_stations": stations}
+
+
+def best_of(func, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def retained_bytes(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[244, 50000])
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print(f"{'stationen':>10} {'json (ms)':>10} {'kompilieren (ms)':>17} {'snapshot (ms)':>14} "
+              f"{'json (KiB)':>11} {'snapshot (KiB)':>15} {'datei (KiB)':>12}")
+        for count in args.stations:
+            path = os.path.join(tmpdir, f"config_{count}.json")
+            save_config(synthetic_config(count), path)
+
+            json_time = best_of(lambda: load_config(path))
+
+            def compile_once():
+                if os.path.exists(snapshot_path_for(path)):
+                    os.remove(snapshot_path_for(path))
+                return load_config_snapshot(path)
+            compile_time = best_of(compile_once, runs=1)
+            snapshot_time = best_of(lambda: load_config_snapshot(path))
+
+            json_memory = retained_bytes(lambda: load_config(path))
+            snapshot_memory = retained_bytes(lambda: load_config_snapshot(path))
+            file_size = os.path.getsize(snapshot_path_for(path))
+            print(f"{count:>10} {json_time * 1000:>10.2f} {compile_time * 1000:>17.2f} {snapshot_time * 1000:>14.2f} "
+                  f"{json_memory / 1024:>11.0f} {snapshot_memory / 1024:>15.0f} {file_size / 1024:>12.0f}")
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
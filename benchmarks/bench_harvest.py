@@ -0,0 +1,47 @@
+# benchmarks/bench_harvest.py
+"""
+Misst die Laufzeit von harvest_thresholds in Abhängigkeit von der Worker-Anzahl gegen
+den lokalen Fixture-Server (HTTP-Backend, künstliche Latenz pro Detailseite).
+
+Aufruf: python benchmarks/bench_harvest.py [--stations 244] [--latency 0.05] [--workers 1 2 4 8 16]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import io
+import time
+import argparse
+import contextlib
+from fixture_server import FixtureServer
+from create_json_config import harvest_thresholds
+from retriever import HttpRetriever
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=244)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    routes = {f"/flussgebiet/bench/station{i}": "station_detail.html" for i in range(args.stations)}
+    server = FixtureServer(routes, latency=args.latency).start()
+    hrefs = [server.base_url + path for path in routes]
+    try:
+        print(f"{'workers':>8} {'sekunden':>10} {'stationen/s':>12}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            # Die Debug-Ausgaben der Parser würden die Messung verfälschen
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = harvest_thresholds(hrefs, HttpRetriever, max_workers=workers, progress=None)
+            elapsed = time.perf_counter() - start
+            assert all(results), "Nicht alle Stationen lieferten Schwellenwerte"
+            print(f"{workers:>8} {elapsed:>10.2f} {len(hrefs) / elapsed:>12.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# benchmarks/bench_offline.py
+"""
+Offline-Benchmark der Abruf- und Verarbeitungskette gegen den lokalen FixtureServer mit den
+aufgezeichneten 244 Stationen (tests/fixtures/pegelliste_land.json): mehrseitige Pegelliste,
+JSON-Schnittstelle und Detailseiten mit #pegelkennwerte, jeweils mit einstellbarer Latenz.
+
+Gemessen werden load_config, get_all_water_data, get_station_thresholds und
+process_stations, jeweils gesamt und – wo sinnvoll – je Stufe. Der Selenium-Pfad läuft über
+FixtureDriver (tests/fixture_site.py) statt Chrome, misst also den Code des Dienstes, nicht den Browser.
+
+Das Ergebnis wird als JSON ausgegeben (--output), mit --compare wird es gegen eine frühere
+Ausgabe verglichen; Verschlechterungen des Medians über --tolerance führen zu Exit-Code 1.
+
+Aufruf: python benchmarks/bench_offline.py [--latency 0.02] [--runs 3] [--detail-stations 50]
+                                           [--output bench.json] [--compare alt.json] [--tolerance 0.2]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import datetime
+import data_retriever
+import metrics
+import service
+from fixture_server import FixtureServer
+from fixture_site import FixtureDriver, load_stations, site_routes, render_list_pages, list_url, api_url
+from config_manager import load_config
+from config_snapshot import load_config_snapshot
+from data_retriever import get_all_water_data, get_station_thresholds, parse_water_rows
+from retriever import HttpRetriever
+from reading_store import ReadingStore
+from pipeline import StationPipeline
+
+CONFIG_PATH = os.path.join(ROOT, "config", "water_level_config.json")
+STAGES = ("fetch", "select", "parse", "evaluate", "persist")
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def measure(func, runs, setup=None):
+    """
+    Führt func runs-mal aus; func kann ein Dictionary {stufe: sekunden} liefern, das als
+    Aufschlüsselung je Stufe mit ausgegeben wird. setup läuft vor jedem Durchlauf ungemessen.
+    """
+    samples, stages = [], {}
+    for _ in range(runs):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        breakdown = func(state) if setup is not None else func()
+        samples.append(time.perf_counter() - start)
+        if isinstance(breakdown, dict):
+            for stage, seconds in breakdown.items():
+                stages.setdefault(stage, []).append(seconds)
+    result = summarize(samples)
+    if stages:
+        result["stages"] = {stage: summarize(values) for stage, values in stages.items()}
+    return result
+
+
+class _ParseTimer:
+    # Misst die Zeit in parse_water_rows, während get_all_water_data läuft
+    def __init__(self):
+        self.seconds = 0.0
+        self.original = data_retriever.parse_water_rows
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.original(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def __enter__(self):
+        data_retriever.parse_water_rows = self
+        return self
+
+    def __exit__(self, *exc):
+        data_retriever.parse_water_rows = self.original
+
+
+class TimedPipeline(StationPipeline):
+    """StationPipeline, die die Zeit je Stufe aufsummiert (für process_stations)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+
+    def _timed(self, stage, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.stage_seconds[stage] += time.perf_counter() - start
+
+    def fetch(self, *args):
+        return self._timed("fetch", super().fetch, *args)
+
+    def select(self, *args):
+        return self._timed("select", super().select, *args)
+
+    def parse(self, *args):
+        return self._timed("parse", super().parse, *args)
+
+    def evaluate(self, *args):
+        return self._timed("evaluate", super().evaluate, *args)
+
+    def persist(self, *args):
+        return self._timed("persist", super().persist, *args)
+
+
+def bench_load_config(results, tmpdir, runs):
+    path = os.path.join(tmpdir, "water_level_config.json")
+    shutil.copyfile(CONFIG_PATH, path)
+    results["load_config.json"] = measure(lambda: load_config(path), runs)
+    load_config_snapshot(path)
+    results["load_config.snapshot"] = measure(lambda: load_config_snapshot(path), runs)
+
+
+def bench_water_data(results, server, stations, runs):
+    url = list_url(server.base_url)
+
+    def scrape(filter_names=None):
+        def run():
+            driver = FixtureDriver()
+            with _ParseTimer() as parse_timer:
+                start = time.perf_counter()
+                get_all_water_data(driver, url, filter_names=filter_names)
+                total = time.perf_counter() - start
+            driver.quit()
+            # Rest: Warten auf Zeilen/Next-Button und Elementzugriffe
+            return {
+                "navigation": driver.navigation_seconds,
+                "parse": parse_timer.seconds,
+                "wait": total - driver.navigation_seconds - parse_timer.seconds,
+            }
+        return run
+
+    results["get_all_water_data.selenium.all"] = measure(scrape(), runs)
+    results["get_all_water_data.selenium.last_station"] = measure(scrape([stations[-1]["name"]]), runs)
+
+    pages = [page.decode("utf-8") for page in render_list_pages(stations)]
+    results["parse_water_rows.all_pages"] = measure(
+        lambda: [parse_water_rows(page, base_url=url) for page in pages], runs)
+
+    retriever = HttpRetriever(api_url=api_url(server.base_url))
+    results["get_all_water_data.http.api"] = measure(lambda: retriever.get_all_water_data(url), runs)
+    retriever.close()
+
+
+def bench_thresholds(results, server, stations, runs, count):
+    hrefs = [server.base_url + station["href"] for station in stations[:count]]
+
+    def selenium():
+        driver = FixtureDriver()
+        start = time.perf_counter()
+        for href in hrefs:
+            get_station_thresholds(driver, href)
+        total = time.perf_counter() - start
+        driver.quit()
+        return {"navigation": driver.navigation_seconds, "extract": total - driver.navigation_seconds}
+
+    results[f"get_station_thresholds.selenium.{count}"] = measure(selenium, runs)
+    retriever = HttpRetriever()
+    results[f"get_station_thresholds.http.{count}"] = measure(
+        lambda: [retriever.get_station_thresholds(href) for href in hrefs], runs)
+    retriever.close()
+
+
+def bench_process_stations(results, server, tmpdir, runs):
+    config, threshold_map = load_config(CONFIG_PATH)
+    config["general_config"]["data_url"] = list_url(server.base_url)
+    config["general_config"]["selected_stations"] = None
+    retriever = HttpRetriever(api_url=api_url(server.base_url))
+    counter = iter(range(1_000_000))
+
+    def fresh_pipeline(warm=False):
+        store = ReadingStore(os.path.join(tmpdir, f"readings_{next(counter)}.sqlite"))
+        service._pipeline = TimedPipeline()
+        if warm:
+            service.process_stations(config, threshold_map, retriever, store=store)
+            service._pipeline.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        return store
+
+    def run(store):
+        service.process_stations(config, threshold_map, retriever, store=store)
+        store.close()
+        return dict(service._pipeline.stage_seconds)
+
+    # cold: alle Stationen neu; steady: zweiter Abruf ohne neue Messwerte
+    results["process_stations.http.cold"] = measure(run, runs, setup=fresh_pipeline)
+    results["process_stations.http.steady"] = measure(run, runs, setup=lambda: fresh_pipeline(warm=True))
+    retriever.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, tolerance, min_delta=0.001):
+    """
+    Liefert die Benchmarks, deren Median um mehr als tolerance (Anteil) und mindestens
+    min_delta Sekunden gestiegen ist (Messrauschen im Sub-Millisekundenbereich ignorieren).
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        increase = result["median"] - old["median"]
+        if increase > old["median"] * tolerance and increase > min_delta:
+            regressions.append((name, old["median"], result["median"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--detail-stations", type=int, default=50)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta", type=float, default=0.001)
+    parser.add_argument("--metrics", action="store_true",
+                        help="Instrumentierung (metrics) einschalten, um deren Mehraufwand zu messen")
+    parser.add_argument("--with-logging", action="store_true",
+                        help="Log-Ausgaben pro Station nicht unterdrücken (Standard: nur Warnungen)")
+    args = parser.parse_args()
+
+    if not args.with_logging:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.metrics:
+        metrics.enable()
+
+    stations = load_stations()
+    server = FixtureServer(site_routes(stations), latency=args.latency).start()
+    tmpdir = tempfile.mkdtemp()
+    results = {}
+    try:
+        bench_load_config(results, tmpdir, args.runs)
+        bench_water_data(results, server, stations, args.runs)
+        bench_thresholds(results, server, stations, args.runs, min(args.detail_stations, len(stations)))
+        bench_process_stations(results, server, tmpdir, args.runs)
+    finally:
+        server.stop()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stations": len(stations),
+            "latency_seconds": args.latency,
+            "runs": args.runs,
+            "metrics": args.metrics,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_page_load.py
+"""
+Vergleicht die Browser-Profile "full" und "lean" aus driver_manager gegen die lokale
+Fixture-Pegelliste: übertragene Bytes und Zeit bis zur ersten Tabellenzeile.
+Benötigt einen lokal installierten Chrome.
+
+Aufruf: python benchmarks/bench_page_load.py [--runs 5]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import time
+import argparse
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from fixture_server import FixtureServer
+from driver_manager import get_web_driver
+
+# Platzhalter in realistischer Größe für die Assets, die die Fixture-Seite referenziert
+ASSETS = {
+    "/static/css/main.css": b"body{margin:0}\n" * 12000,
+    "/static/media/roboto-regular.woff2": os.urandom(64 * 1024),
+    "/static/media/logo-rlp.png": os.urandom(48 * 1024),
+    "/img/trend-up.svg": b'<svg xmlns="http://www.w3.org/2000/svg"></svg>',
+}
+
+
+def measure(server, profile, runs):
+    driver = get_web_driver(profile=profile)
+    url = server.base_url + "/pegelliste/land"
+    try:
+        timings, transferred = [], []
+        for _ in range(runs):
+            server.bytes_sent.clear()
+            # Cache leeren, damit jeder Lauf alle Ressourcen neu anfordert
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            start = time.perf_counter()
+            driver.get(url)
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "MuiDataGrid-row")))
+            timings.append(time.perf_counter() - start)
+            transferred.append(sum(server.bytes_sent.values()))
+        return min(timings), max(transferred)
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    routes = {"/pegelliste/land": "pegelliste_page.html"}
+    routes.update(ASSETS)
+    server = FixtureServer(routes).start()
+    try:
+        print(f"{'profil':>8} {'bytes':>10} {'erste Zeile (ms)':>18}")
+        for profile in ("full", "lean"):
+            first_row, transferred = measure(server, profile, args.runs)
+            print(f"{profile:>8} {transferred:>10} {first_row * 1000:>18.1f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
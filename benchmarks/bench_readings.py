@@ -0,0 +1,110 @@
+# benchmarks/bench_readings.py
+"""
+Vergleicht die bisherigen 7-teiligen Text-Tupel mit den kompakten Readings (readings.py):
+belegter Speicher je Messwert und Zeit für Erzeugen plus Auswerten von Wert und Zeitstempel.
+
+- tuple: Tupel aus frisch erzeugten Texten (wie sie der Parser liefert); parse_value_cm und
+  parse_x_last laufen wie bisher für jeden Eintrag.
+- reading (kalt): ReadingBuilder ohne vorhandene Stationen.
+- reading (warm): Stationen aus dem vorherigen Abruf sind noch vorhanden und werden geteilt,
+  der Normalfall im laufenden Dienst.
+
+Der Speicher wird mit tracemalloc als Größe der nach dem Erzeugen gehaltenen Objekte gemessen.
+
+Aufruf: python benchmarks/bench_readings.py [--stations 244 50000]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import gc
+import time
+import random
+import argparse
+import tracemalloc
+from readings import ReadingBuilder, _format_number_de, parse_value_cm
+from reading_store import parse_x_last
+from fixture_site import load_stations
+
+
+def raw_rows(count):
+    # Die aufgezeichneten Stationen, für größere Mengen synthetisch ergänzt
+    rng = random.Random(42)
+    stations = load_stations()
+    rows = []
+    for i in range(count):
+        if i < len(stations):
+            s = stations[i]
+            rows.append((s["name"], s["riverName"] or "", s["riverAreaName"] or "", f"{s['yLast']} cm", s["xLast"],
+                         f"{_format_number_de(s['catchmentArea'])} km²" if s["catchmentArea"] is not None else "",
+                         "https://hochwasser.rlp.de" + s["href"]))
+        else:
+            rows.append((f"Station {i}", f"Fluss {i % 400}", f"Gebiet {i % 12}", f"{rng.randint(5, 900)} cm",
+                         f"18.10.2026 14:{rng.choice(('00', '15', '30', '45'))}",
+                         f"{_format_number_de(rng.uniform(1, 9000))} km²",
+                         f"https://hochwasser.rlp.de/flussgebiet/gebiet{i % 12}/station{i}"))
+    return rows
+
+
+def fresh(rows):
+    # Neue String-Objekte je Abruf, wie sie der HTML-Parser erzeugt
+    return [tuple((field + ".")[:-1] for field in row) for row in rows]
+
+
+def tuples_cycle(rows):
+    data = fresh(rows)
+    parsed = [(parse_value_cm(entry[3]), parse_x_last(entry[4])) for entry in data]
+    return data, parsed
+
+
+def readings_cycle(rows):
+    builder = ReadingBuilder()
+    return [builder.build(*row) for row in fresh(rows)]
+
+
+def best_of(func, runs=5):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def retained_bytes(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[244, 50000])
+    args = parser.parse_args()
+
+    print(f"{'stationen':>10} {'variante':>16} {'zeit (ms)':>10} {'bytes/messwert':>15}")
+    for count in args.stations:
+        rows = raw_rows(count)
+        # Nur die Eingangstexte des Abrufs zählen nicht mit, die Tupel bzw. Readings schon
+        tuple_memory = retained_bytes(lambda: tuples_cycle(rows)[0])
+        cold_memory = retained_bytes(lambda: readings_cycle(rows))
+        previous = readings_cycle(rows)
+        warm_memory = retained_bytes(lambda: readings_cycle(rows))
+        variants = (
+            ("tuple", best_of(lambda: tuples_cycle(rows)), tuple_memory),
+            ("reading (kalt)", None, cold_memory),
+            ("reading (warm)", best_of(lambda: readings_cycle(rows)), warm_memory),
+        )
+        for name, seconds, memory in variants:
+            timing = f"{seconds * 1000:>10.2f}" if seconds is not None else f"{'-':>10}"
+            print(f"{count:>10} {name:>16} {timing} {memory / count:>15.0f}")
+        del previous
+
+
+if __name__ == "__main__":
+    main()
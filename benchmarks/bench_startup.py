@@ -0,0 +1,117 @@
+# benchmarks/bench_startup.py
+"""
+Kaltstart des Dienstes: Importzeit von service_core laut python -X importtime und Zeit vom
+Prozessstart bis zum ersten abgeschlossenen Abruf (erste Ausgabe des ServiceCore).
+
+Jeder Lauf ist ein frischer Interpreter. Abgerufen wird über das HTTP-Backend vom lokalen
+FixtureServer (tests/fixture_site.py), gemessen wird also der Start des Dienstes ohne Netz und
+ohne Browser. Module von selenium (WebDriver), watchdog und webdriver_manager, die schon beim
+Import geladen werden, sind gesondert aufgeführt; mit --watch läuft der Konfig-Watcher mit.
+
+Aufruf: python benchmarks/bench_startup.py [--runs 5] [--top 10] [--watch]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from config_manager import load_config, save_config
+from fixture_server import FixtureServer
+from fixture_site import api_url, list_url, load_stations, site_routes
+
+SRC = os.path.join(ROOT, 'src')
+HEAVY_PREFIXES = ("selenium.webdriver.remote", "watchdog", "webdriver_manager")
+
+# Läuft im Kindprozess: Dienstkern importieren und nach dem ersten Abruf beenden
+FIRST_POLL = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import json, asyncio
+from service_core import ServiceCore
+imported = time.perf_counter()
+core = ServiceCore(sys.argv[2], store_factory=lambda general: None, watch_config=sys.argv[3] == "1")
+def first_poll(cycle):
+    print(json.dumps({"import": imported - start, "first_poll": time.perf_counter() - start,
+                      "readings": len(cycle["readings"])}), flush=True)
+    core.stop()
+core.add_sink("erster_abruf", first_poll)
+asyncio.run(core.run())
+"""
+
+
+def importtime(cwd):
+    """(self, kumuliert) in Sekunden je Modul aus python -X importtime -c 'import service_core'."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {SRC!r}); import service_core"],
+                            cwd=cwd, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            modules[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return modules
+
+
+def first_poll(cwd, config_path, watch):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", FIRST_POLL, SRC, config_path, "1" if watch else "0"],
+                            cwd=cwd, capture_output=True, text=True, check=True, timeout=120)
+    wall = time.perf_counter() - start
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["wall"] = wall
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--watch", action="store_true", help="Konfig-Watcher (watchdog) mitstarten")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    server = FixtureServer(site_routes(load_stations())).start()
+    try:
+        config, _ = load_config(os.path.join(ROOT, "config", "water_level_config.json"))
+        general = config["general_config"]
+        general.update({"retriever": "http", "http_api_url": api_url(server.base_url),
+                        "data_url": list_url(server.base_url), "selected_stations": None})
+        for key in ("metrics_port", "api_port", "alerts", "store_path"):
+            general.pop(key, None)
+        config_path = os.path.join(tmpdir, "water_level_config.json")
+        save_config(config, config_path)
+
+        modules = importtime(tmpdir)
+        print(f"Import service_core: {modules['service_core'][1] * 1000:.1f} ms (python -X importtime)")
+        heavy = sorted(name for name in modules if name.startswith(HEAVY_PREFIXES))
+        print(f"Schwere Module beim Import: {', '.join(heavy) if heavy else 'keine'}")
+        print(f"\nTeuerste Module (eigene Zeit):")
+        for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"  {name:<50} {own * 1000:>8.1f} ms  (kumuliert {cumulative * 1000:.1f} ms)")
+
+        # Der erste Lauf kompiliert zusätzlich den Konfigurations-Snapshot
+        runs = [first_poll(tmpdir, config_path, args.watch) for _ in range(args.runs + 1)]
+        print(f"\n{'lauf':>6} {'import (ms)':>12} {'erster Abruf (ms)':>18} {'prozess (ms)':>13} {'messwerte':>10}")
+        for label, timings in [("kalt", runs[0])] + [(str(i), t) for i, t in enumerate(runs[1:], start=1)]:
+            print(f"{label:>6} {timings['import'] * 1000:>12.1f} {timings['first_poll'] * 1000:>18.1f} "
+                  f"{timings['wall'] * 1000:>13.1f} {timings['readings']:>10}")
+        warm = runs[1:]
+        print(f"{'median':>6} {statistics.median(t['import'] for t in warm) * 1000:>12.1f} "
+              f"{statistics.median(t['first_poll'] for t in warm) * 1000:>18.1f} "
+              f"{statistics.median(t['wall'] for t in warm) * 1000:>13.1f}")
+    finally:
+        server.stop()
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_trend.py
+"""
+Misst den Aufwand der Trendberechnung (trend.TrendEngine) pro Abruf: update() mit einer neuen
+Messung je Station plus time_to_thresholds() für alle Schwellen, nach einer Einlaufphase mit
+vollen Ringpuffern. Zum Vergleich eine Regression über die vollständige Historie je Station
+(np.polyfit), wie sie ohne laufende Summen nötig wäre.
+
+Aufruf: python benchmarks/bench_trend.py [--stations 244 50000] [--cycles 200] [--history 96]
+"""
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import time
+import argparse
+import numpy as np
+from trend import TrendEngine
+from classification import THRESHOLD_KEYS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, nargs="+", default=[244, 50000])
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--history", type=int, default=96, help="Messungen je Station für den Vergleich")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'stationen':>10} {'update+eta (µs)':>16} {'je station (ns)':>16} {'polyfit historie (ms)':>22}")
+    for count in args.stations:
+        names = [f"Station {i}" for i in range(count)]
+        limits = np.sort(rng.uniform(50, 800, (count, len(THRESHOLD_KEYS))), axis=1)
+        engine = TrendEngine()
+        level = rng.uniform(50, 400, count)
+        timings = []
+        for cycle in range(engine.capacity + args.cycles):
+            level += rng.normal(0, 5, count)
+            timestamps = [1_792_000_000 + cycle * 900] * count
+            values = level.round().astype(int).tolist()
+            start = time.perf_counter()
+            rows = engine.update(names, timestamps, values)
+            engine.time_to_thresholds(rows, limits)
+            if cycle >= engine.capacity:
+                timings.append(time.perf_counter() - start)
+        per_cycle = float(np.median(timings))
+
+        # Vergleich: Regression je Station über die gesamte Historie (nur für eine Stichprobe gemessen)
+        sample = min(count, 244)
+        hours = np.arange(args.history) * 0.25
+        history = rng.normal(0, 5, (sample, args.history)).cumsum(axis=1) + 200
+        start = time.perf_counter()
+        for row in history:
+            np.polyfit(hours, row, 1)
+        rescan = (time.perf_counter() - start) * count / sample
+
+        print(f"{count:>10} {per_cycle * 1e6:>16.0f} {per_cycle * 1e9 / count:>16.0f} {rescan * 1000:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# src/alerts.py
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import urllib.request
+from collections import namedtuple
+from classification import LEVEL_NAMES
+
+# kind: "level" (Stufenwechsel) oder "trend" (Warnschwelle laut Trend bald erreicht);
+# eta_seconds nur bei "trend"
+Alert = namedtuple("Alert", ["station", "kind", "level", "previous_level", "value_cm", "timestamp", "eta_seconds"])
+
+_STOP = object()
+
+
+def alert_to_dict(alert):
+    entry = alert._asdict()
+    entry["level"] = LEVEL_NAMES[alert.level]
+    entry["previous_level"] = LEVEL_NAMES[alert.previous_level]
+    return entry
+
+
+def alert_from_dict(entry):
+    entry = dict(entry)
+    entry["level"] = LEVEL_NAMES.index(entry["level"])
+    entry["previous_level"] = LEVEL_NAMES.index(entry["previous_level"])
+    return Alert(**entry)
+
+
+def format_batch(alerts):
+    # Eine Textzeile pro Alarm, z. B. für E-Mail oder SMS
+    lines = []
+    for alert in alerts:
+        if alert.kind == "trend":
+            lines.append(f"{alert.station}: {LEVEL_NAMES[alert.level]} voraussichtlich in "
+                         f"{alert.eta_seconds / 60:.0f} min ({alert.value_cm} cm)")
+        else:
+            lines.append(f"{alert.station}: {LEVEL_NAMES[alert.previous_level]} -> {LEVEL_NAMES[alert.level]} "
+                         f"({alert.value_cm} cm)")
+    return "\n".join(lines)
+
+
+class LogSink:
+    name = "log"
+
+    def send(self, alerts):
+        logging.warning("Alarm: %s", format_batch(alerts).replace("\n", "; "))
+
+
+class WebhookSink:
+    """Sendet jeden Stapel als JSON per POST ({"alerts": [...], "text": "..."}) an url."""
+
+    def __init__(self, url, timeout=10, name=None):
+        self.url = url
+        self.timeout = timeout
+        self.name = name or "webhook"
+
+    def send(self, alerts):
+        body = json.dumps({"alerts": [alert_to_dict(a) for a in alerts], "text": format_batch(alerts)},
+                          ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json; charset=utf-8"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def sink_from_config(entry):
+    if entry.get("type") == "log":
+        return LogSink()
+    if entry.get("type") == "webhook":
+        return WebhookSink(entry["url"], timeout=entry.get("timeout_seconds", 10), name=entry.get("name"))
+    raise ValueError(f"Unbekannte Alarm-Ausgabe: {entry}")
+
+
+class _SinkWorker:
+    """
+    Eigener Thread je Ausgabe mit begrenzter Warteschlange. Fehlgeschlagene Zustellungen werden
+    mit exponentiell wachsender Pause wiederholt; gelingt sie nach max_attempts nicht, landet der
+    Stapel im Spool (JSON Lines) und wird nach der nächsten erfolgreichen Zustellung erneut versucht.
+    """
+
+    def __init__(self, sink, queue_size, spool_path, max_attempts, backoff_seconds, max_backoff_seconds):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.spool_path = spool_path
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.delivered = 0
+        self.spooled = 0
+        self._spool_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"alerts-{sink.name}", daemon=True)
+        self.thread.start()
+
+    def offer(self, alerts):
+        # Nie blockieren: Ist die Warteschlange voll, geht der älteste Stapel in den Spool
+        while True:
+            try:
+                self.queue.put_nowait(alerts)
+                return
+            except queue.Full:
+                try:
+                    oldest = self.queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if oldest is not _STOP:
+                    logging.warning("Alarm-Ausgabe '%s' kommt nicht hinterher, Stapel wird gespoolt.", self.sink.name)
+                    self._spool(oldest)
+
+    def _run(self):
+        self._deliver_spool()
+        while True:
+            alerts = self.queue.get()
+            if alerts is _STOP:
+                return
+            if self._deliver(alerts):
+                self._deliver_spool()
+            else:
+                self._spool(alerts)
+
+    def _deliver(self, alerts):
+        delay = self.backoff_seconds
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.sink.send(alerts)
+                self.delivered += 1
+                return True
+            except Exception as e:
+                logging.warning("Alarm-Ausgabe '%s' fehlgeschlagen (Versuch %d/%d): %s",
+                                self.sink.name, attempt, self.max_attempts, e)
+            if attempt == self.max_attempts or self._stopping.wait(delay * random.uniform(0.8, 1.2)):
+                break
+            delay = min(delay * 2, self.max_backoff_seconds)
+        return False
+
+    def _spool(self, alerts):
+        self.spooled += 1
+        if self.spool_path is None:
+            logging.error("Alarm-Stapel für '%s' nicht zustellbar und verworfen: %s",
+                          self.sink.name, format_batch(alerts).replace("\n", "; "))
+            return
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps([alert_to_dict(a) for a in alerts], ensure_ascii=False) + "\n")
+
+    def _deliver_spool(self):
+        # Gespoolte Stapel erneut zustellen; was wieder scheitert, bleibt im Spool
+        if self.spool_path is None or not os.path.exists(self.spool_path):
+            return
+        with self._spool_lock:
+            with open(self.spool_path, encoding="utf-8") as f:
+                batches = [[alert_from_dict(a) for a in json.loads(line)] for line in f if line.strip()]
+            os.remove(self.spool_path)
+        for index, alerts in enumerate(batches):
+            if self._stopping.is_set() or not self._deliver(alerts):
+                for remaining in batches[index:]:
+                    self._spool(remaining)
+                return
+
+    def stop(self, timeout):
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        # Noch ausstehende Stapel nicht verlieren
+        self._stopping.set()
+        self.thread.join(timeout)
+        while True:
+            try:
+                alerts = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if alerts is not _STOP:
+                self._spool(alerts)
+
+
+class AlertDispatcher:
+    """
+    Stellt Alarme zu, ohne den Abruf aufzuhalten.
+
+    publish() nimmt die Alarme eines Abrufs entgegen, verwirft Wiederholungen (gleiche Station
+    und Stufe innerhalb von renotify_seconds) und legt sie als ein Stapel je Ausgabe in deren
+    Warteschlange; Zustellung, Wiederholversuche und Spool laufen in den Threads der Ausgaben.
+    """
+
+    def __init__(self, sinks, renotify_seconds=3600, queue_size=100, spool_dir=None, max_attempts=4,
+                 backoff_seconds=1.0, max_backoff_seconds=60.0, clock=time.monotonic):
+        self.renotify_seconds = renotify_seconds
+        self.clock = clock
+        self._notified = {}
+        self._lock = threading.Lock()
+        if spool_dir is not None:
+            os.makedirs(spool_dir, exist_ok=True)
+        self.workers = [
+            _SinkWorker(sink, queue_size,
+                        os.path.join(spool_dir, f"{index}_{sink.name}.jsonl") if spool_dir else None,
+                        max_attempts, backoff_seconds, max_backoff_seconds)
+            for index, sink in enumerate(sinks)
+        ]
+
+    @classmethod
+    def from_config(cls, alerts_config):
+        """general_config["alerts"], z. B. {"sinks": [{"type": "webhook", "url": "..."}], "spool_dir": "data/alerts"}"""
+        return cls(
+            [sink_from_config(entry) for entry in alerts_config.get("sinks", [{"type": "log"}])],
+            renotify_seconds=alerts_config.get("renotify_seconds", 3600),
+            queue_size=alerts_config.get("queue_size", 100),
+            spool_dir=alerts_config.get("spool_dir"),
+            max_attempts=alerts_config.get("max_attempts", 4),
+            backoff_seconds=alerts_config.get("backoff_seconds", 1.0),
+            max_backoff_seconds=alerts_config.get("max_backoff_seconds", 60.0),
+        )
+
+    def publish(self, alerts):
+        """Alarme eines Abrufs einreihen; liefert die tatsächlich eingereihten (ohne Wiederholungen)."""
+        now = self.clock()
+        fresh = []
+        with self._lock:
+            for alert in alerts:
+                key = (alert.station, alert.kind, alert.level)
+                last = self._notified.get(key)
+                if last is not None and now - last < self.renotify_seconds:
+                    continue
+                self._notified[key] = now
+                fresh.append(alert)
+        if fresh:
+            for worker in self.workers:
+                worker.offer(fresh)
+        return fresh
+
+    def close(self, timeout=5.0):
+        for worker in self.workers:
+            worker.stop(timeout)
@@ -0,0 +1,57 @@
+# src/change_detection.py
+import time
+from collections import namedtuple
+from readings import Reading
+
+# new/changed: Einträge (Readings oder 7-teilige Tupel) mit neuer Messung, stale: Stationsnamen,
+# deren Messung seit stale_after_seconds nicht mehr fortgeschrieben wurde, unchanged: Anzahl
+CycleDelta = namedtuple("CycleDelta", ["new", "changed", "stale", "unchanged"])
+
+
+class ChangeDetector:
+    """
+    Merkt sich pro Station den zuletzt gesehenen Messwert (xLast, yLast), damit nur Stationen mit
+    einer neuen Messung ausgewertet, gespeichert und gemeldet werden. Die Pegel werden upstream
+    nur alle 15 Minuten aktualisiert, der Abruf läuft deutlich häufiger.
+    """
+
+    def __init__(self, stale_after_seconds=3600, clock=time.time):
+        self.stale_after_seconds = stale_after_seconds
+        self.clock = clock
+        # name -> [xLast, yLast, Zeitpunkt der letzten Änderung, als veraltet gemeldet]
+        self._last_seen = {}
+        self.counters = {"total": 0, "new": 0, "changed": 0, "unchanged": 0, "stale": 0}
+
+    def update(self, data):
+        """Gleicht die Einträge eines Abrufs mit dem Index ab und liefert ein CycleDelta."""
+        now = self.clock()
+        new, changed, stale = [], [], []
+        for entry in data:
+            if type(entry) is Reading:
+                # Ausgewertete Werte vergleichen, ohne die Texte zu erzeugen
+                name, y_last, x_last = entry.station.name, entry.value_cm, entry.timestamp
+            else:
+                name, y_last, x_last = entry[0], entry[3], entry[4]
+            seen = self._last_seen.get(name)
+            if seen is None:
+                self._last_seen[name] = [x_last, y_last, now, False]
+                new.append(entry)
+            elif seen[0] != x_last or seen[1] != y_last:
+                seen[0], seen[1], seen[2], seen[3] = x_last, y_last, now, False
+                changed.append(entry)
+            elif not seen[3] and now - seen[2] > self.stale_after_seconds:
+                # Nur beim Übergang melden, nicht in jedem weiteren Abruf
+                seen[3] = True
+                stale.append(name)
+        unchanged = len(data) - len(new) - len(changed)
+        self.counters = {
+            "total": len(data),
+            "new": len(new),
+            "changed": len(changed),
+            "unchanged": unchanged,
+            "stale": len(stale),
+        }
+        return CycleDelta(new, changed, stale, unchanged)
+
+    def forget(self, name):
+        self._last_seen.pop(name, None)
@@ -0,0 +1,116 @@
+# src/chromedriver.py
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+import subprocess
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "chromedriver.json")
+
+# Im Prozess bereits aufgelöste Pfade je (version, cache_path): ein DriverPool startet mehrere
+# Driver, gesucht wird trotzdem nur einmal
+_resolved = {}
+_lock = threading.Lock()
+
+
+def _matches(pinned, version):
+    # "120" passt zu "120.0.6099.109", ohne Pin passt jede ermittelte Version
+    if pinned is None:
+        return True
+    return version is not None and (version == pinned or version.startswith(pinned + "."))
+
+
+def driver_version(path):
+    """Version eines chromedriver ("ChromeDriver 120.0.6099.109 (...)" -> "120.0.6099.109") oder None."""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    parts = output.split()
+    return parts[1] if len(parts) > 1 and parts[0] == "ChromeDriver" else None
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.decoder.JSONDecodeError) as e:
+        logging.warning("chromedriver-Cache %s konnte nicht gelesen werden: %s", cache_path, e)
+        return None
+
+
+def _write_cache(cache_path, path, version):
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "version": version, "resolvedAt": time.time()}, f, indent=4)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logging.warning("chromedriver-Cache %s konnte nicht geschrieben werden: %s", cache_path, e)
+
+
+def install_with_webdriver_manager(version=None):
+    # Einziger Weg ins Netz; webdriver_manager wird erst hier importiert
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager(driver_version=version).install()
+
+
+def resolve_chromedriver(version=None, path=None, cache_path=CACHE_PATH, installer=install_with_webdriver_manager,
+                         refresh=False):
+    """
+    Liefert den Pfad zum chromedriver, offline zuerst:
+
+    1. path bzw. die Umgebungsvariable CHROMEDRIVER_PATH, sofern die Datei existiert.
+    2. Der lokale Cache (cache_path), solange die Datei dort noch existiert und zur gepinnten
+       version passt ("120" passt zu jeder 120.x).
+    3. Ein chromedriver im PATH mit passender Version.
+    4. installer(version) (Standard: webdriver_manager, löst die Version über das Netz auf).
+
+    Das Ergebnis aus 3. und 4. wird im Cache abgelegt, weitere Starts kommen ohne Netz aus.
+    refresh=True überspringt Cache und PATH, z. B. wenn Chrome aktualisiert wurde und der
+    gecachte Driver nicht mehr passt.
+    """
+    path = path or os.environ.get("CHROMEDRIVER_PATH")
+    if path:
+        if os.path.isfile(path):
+            return path
+        logging.warning("chromedriver unter %s nicht gefunden, suche weiter.", path)
+
+    key = (version, cache_path)
+    with _lock:
+        if not refresh and key in _resolved and os.path.isfile(_resolved[key]):
+            return _resolved[key]
+
+        if not refresh:
+            cached = _read_cache(cache_path)
+            if cached and os.path.isfile(cached.get("path") or "") and _matches(version, cached.get("version")):
+                _resolved[key] = cached["path"]
+                return cached["path"]
+
+            on_path = shutil.which("chromedriver")
+            if on_path:
+                found = driver_version(on_path)
+                if _matches(version, found):
+                    logging.info("Nutze chromedriver %s aus dem PATH (%s).", found or "?", on_path)
+                    _write_cache(cache_path, on_path, found)
+                    _resolved[key] = on_path
+                    return on_path
+
+        logging.info("Löse chromedriver%s über das Netz auf...", f" {version}" if version else "")
+        try:
+            installed = installer(version)
+        except Exception as e:
+            raise Exception(
+                f"Kein passender chromedriver gefunden und Auflösung über das Netz fehlgeschlagen ({e}). "
+                "Ohne Netz chromedriver_path in general_config oder CHROMEDRIVER_PATH setzen."
+            ) from e
+        _write_cache(cache_path, installed, driver_version(installed) or version)
+        _resolved[key] = installed
+        return installed
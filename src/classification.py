@@ -0,0 +1,160 @@
+# src/classification.py
+import numpy as np
+
+# Schwellen in aufsteigender Reihenfolge; die Warnstufe einer Station ist die Position der
+# höchsten erreichten Schwelle (0 = unter MW, 5 = HW100 erreicht oder überschritten).
+THRESHOLD_KEYS = ("MW", "HW2", "HW20", "HW50", "HW100")
+LEVEL_NAMES = ("unter MW",) + THRESHOLD_KEYS
+LEVEL_HW2 = LEVEL_NAMES.index("HW2")
+LEVEL_HW100 = LEVEL_NAMES.index("HW100")
+
+
+def threshold_row(thresholds):
+    # Fehlende Schwellen werden nie erreicht
+    return [float(thresholds[key]) if thresholds.get(key) is not None else np.inf for key in THRESHOLD_KEYS]
+
+
+def level_for(current_value, thresholds):
+    """Warnstufe eines einzelnen Messwerts ohne Hysterese."""
+    level = 0
+    for index, limit in enumerate(threshold_row(thresholds), start=1):
+        if current_value >= limit:
+            level = index
+    return level
+
+
+def _highest_reached(values, limits):
+    # Index+1 der höchsten erreichten Schwelle je Zeile, 0 wenn keine erreicht ist.
+    # Fehlende Zwischenstufen (inf) verschieben die Stufe damit nicht.
+    reached = values[:, None] >= limits
+    highest = limits.shape[1] - np.argmax(reached[:, ::-1], axis=1)
+    return np.where(reached.any(axis=1), highest, 0).astype(np.int8)
+
+
+class ThresholdClassifier:
+    """
+    Ordnet die Messwerte eines ganzen Abrufs in einem NumPy-Durchlauf Warnstufen zu.
+
+    Die Schwellen aus config_threshold_map werden einmal pro Konfigurationsstand in ein
+    dichtes Array (Stationen x THRESHOLD_KEYS) überführt. Mit hysteresis_cm > 0 fällt eine
+    Station erst dann auf eine niedrigere Stufe zurück, wenn der Wert die Schwelle der
+    aktuellen Stufe um mindestens hysteresis_cm unterschreitet, damit Werte knapp an einer
+    Grenze nicht ständig zwischen zwei Stufen wechseln.
+    """
+
+    def __init__(self, config_threshold_map, hysteresis_cm=5):
+        self.hysteresis_cm = hysteresis_cm
+        self.threshold_map = None
+        self.station_index = {}
+        self.thresholds = np.empty((0, len(THRESHOLD_KEYS)))
+        self.levels = np.zeros(0, dtype=np.int8)
+        self.update_thresholds(config_threshold_map)
+
+    def update_thresholds(self, config_threshold_map):
+        """Baut das Schwellen-Array neu auf; die Stufen bestehender Stationen bleiben erhalten."""
+        names = list(config_threshold_map)
+        table = getattr(config_threshold_map, "thresholds", None)
+        if table is not None:
+            # ThresholdTable (config_snapshot): Tabelle direkt übernehmen, als beschreibbare Kopie
+            thresholds = np.array(table, dtype=float)
+        else:
+            thresholds = np.array([threshold_row(config_threshold_map[name]) for name in names], dtype=float)
+        levels = np.zeros(len(names), dtype=np.int8)
+        for row, name in enumerate(names):
+            old_row = self.station_index.get(name)
+            if old_row is not None:
+                levels[row] = self.levels[old_row]
+        self.threshold_map = config_threshold_map
+        self.station_index = {name: row for row, name in enumerate(names)}
+        self.thresholds = thresholds.reshape(len(names), len(THRESHOLD_KEYS))
+        self.levels = levels
+
+    def apply_diff(self, diff, config_threshold_map):
+        """
+        Übernimmt einen ConfigDiff (config_manager.diff_threshold_maps), ohne das Array neu
+        aufzubauen: geänderte Zeilen werden überschrieben, entfernte herausgenommen, neue
+        angehängt. Die Stufen aller übrigen Stationen bleiben unverändert.
+        """
+        for name in diff.changed:
+            row = self.station_index.get(name)
+            if row is not None:
+                self.thresholds[row] = threshold_row(config_threshold_map[name])
+
+        removed_rows = [self.station_index[name] for name in diff.removed if name in self.station_index]
+        if removed_rows:
+            keep = np.ones(len(self.levels), dtype=bool)
+            keep[removed_rows] = False
+            new_rows = np.cumsum(keep) - 1
+            self.thresholds = self.thresholds[keep]
+            self.levels = self.levels[keep]
+            self.station_index = {name: int(new_rows[row]) for name, row in self.station_index.items() if keep[row]}
+
+        added = []
+        for name in diff.added:
+            row = self.station_index.get(name)
+            if row is None:
+                added.append(name)
+            else:
+                self.thresholds[row] = threshold_row(config_threshold_map[name])
+        if added:
+            start = len(self.levels)
+            rows = np.array([threshold_row(config_threshold_map[name]) for name in added], dtype=float)
+            self.thresholds = np.vstack([self.thresholds, rows])
+            self.levels = np.concatenate([self.levels, np.zeros(len(added), dtype=np.int8)])
+            self.station_index.update((name, start + offset) for offset, name in enumerate(added))
+
+        self.threshold_map = config_threshold_map
+
+    def indices(self, station_names):
+        # Unbekannte Stationen erhalten -1 und damit Stufe 0
+        return np.fromiter((self.station_index.get(name, -1) for name in station_names), dtype=np.intp,
+                           count=len(station_names))
+
+    def levels_of(self, indices):
+        """Aktuelle Stufen zu indices (aus indices()); unbekannte Stationen haben Stufe 0."""
+        indices = np.asarray(indices, dtype=np.intp)
+        known = indices >= 0
+        result = np.zeros(len(indices), dtype=np.int8)
+        result[known] = self.levels[indices[known]]
+        return result
+
+    def limits_of(self, indices):
+        """Schwellen (Zeilen x THRESHOLD_KEYS) zu indices; unbekannte Stationen haben keine (inf)."""
+        indices = np.asarray(indices, dtype=np.intp)
+        known = indices >= 0
+        result = np.full((len(indices), len(THRESHOLD_KEYS)), np.inf)
+        result[known] = self.thresholds[indices[known]]
+        return result
+
+    def classify(self, station_names, values, indices=None):
+        """
+        Liefert ein Array der Warnstufen für station_names/values (None = kein Messwert).
+        Stationen ohne Messwert behalten ihre bisherige Stufe. indices kann aus einem früheren
+        Aufruf von indices() wiederverwendet werden.
+        """
+        if indices is None:
+            indices = self.indices(station_names)
+        values = np.array([np.nan if v is None else v for v in values], dtype=float)
+        known = indices >= 0
+        result = np.zeros(len(indices), dtype=np.int8)
+        if not known.any():
+            return result
+
+        rows = indices[known]
+        current = values[known]
+        limits = self.thresholds[rows]
+        previous = self.levels[rows]
+        valid = ~np.isnan(current)
+
+        raw = _highest_reached(current, limits)
+        if self.hysteresis_cm:
+            # Stufe, die bei um hysteresis_cm abgesenkten Schwellen erreicht wäre
+            lowered = _highest_reached(current, limits - self.hysteresis_cm)
+            level = np.where(raw >= previous, raw, np.minimum(previous, lowered))
+        else:
+            level = raw
+        level = np.where(valid, level, previous).astype(np.int8)
+
+        self.levels[rows] = level
+        result[known] = level
+        return result
@@ -1,6 +1,12 @@
 import json
 import os
 import time
+import hashlib
+import logging
+from collections import namedtuple
+
+# Ergebnis von diff_threshold_maps: Namen neuer, entfernter und geänderter Stationen
+ConfigDiff = namedtuple("ConfigDiff", ["added", "removed", "changed"])
 
 def load_config(config_path="config/water_level_config.json", retries=3, delay=1):
     for attempt in range(retries):
@@ -14,7 +20,7 @@ def load_config(config_path="config/water_level_config.json", retries=3, delay=1
             }
             return config, config_threshold_map
         except json.decoder.JSONDecodeError as e:
-            print(f"JSONDecodeError beim Laden der Konfiguration: {e}. Versuche es erneut in {delay} Sekunden...")
+            logging.warning("JSONDecodeError beim Laden der Konfiguration: %s. Versuche es erneut in %s Sekunden...", e, delay)
             time.sleep(delay)
     raise Exception("Konfigurationsdatei konnte nach mehreren Versuchen nicht geladen werden.")
 
@@ -32,3 +38,49 @@ def save_config(config, config_path="config/water_level_config.json"):
         json.dump(config, f, indent=4, ensure_ascii=False)
     os.replace(temp_path, config_path)
 
+
+def _indented(value, indent):
+    # json.dumps(indent=4) eines verschachtelten Werts, eingerückt wie in json.dump
+    return json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n" + " " * indent)
+
+
+def save_config_stream(water_stations, general_config, config_path="config/water_level_config.json"):
+    """
+    Wie save_config für {"water_stations": ..., "general_config": ...}, schreibt water_stations
+    (ein beliebiges Iterable, z. B. ein Generator) aber Station für Station, ohne die Liste
+    im Speicher zu halten. Die Datei entspricht json.dump(..., indent=4); liefert die Anzahl
+    der Stationen.
+    """
+    temp_path = config_path + ".tmp"
+    count = 0
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write('{\n    "water_stations": [')
+            for station in water_stations:
+                f.write(",\n        " if count else "\n        ")
+                f.write(_indented(station, 8))
+                count += 1
+            f.write("\n    ],\n" if count else "],\n")
+            f.write('    "general_config": ' + _indented(general_config, 4) + "\n}")
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, config_path)
+    return count
+
+
+def config_file_hash(config_path="config/water_level_config.json"):
+    """SHA-256 des Dateiinhalts; Grundlage dafür, ob ein Neuladen überhaupt nötig ist."""
+    with open(config_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def diff_threshold_maps(old_map, new_map):
+    """
+    Vergleicht zwei Schwellenwert-Mappings (Station -> waterThresholds) und liefert,
+    welche Stationen hinzugekommen, entfallen oder mit geänderten Schwellen vorhanden sind.
+    """
+    old_map = old_map or {}
+    added = [name for name in new_map if name not in old_map]
+    removed = [name for name in old_map if name not in new_map]
+    changed = [name for name in new_map if name in old_map and old_map[name] != new_map[name]]
+    return ConfigDiff(added, removed, changed)
@@ -0,0 +1,189 @@
+# src/config_snapshot.py
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import logging
+from collections.abc import Mapping
+import numpy as np
+
+from classification import THRESHOLD_KEYS
+from config_manager import load_config
+
+# Felder aus general_config, die der Dienst tatsächlich liest; alle übrigen werden nicht
+# in den Snapshot übernommen. Kommt ein neues Feld hinzu, muss es hier ergänzt werden –
+# die Prüfsumme der Liste steht im Kopf, ältere Snapshots gelten danach als veraltet.
+SERVICE_GENERAL_KEYS = (
+    "poll_interval_seconds", "min_poll_interval_seconds", "max_poll_interval_seconds",
+    "river_poll_intervals", "station_poll_intervals", "approach_cm", "poll_jitter",
+    "min_fetch_gap_seconds", "data_url", "selected_stations", "retriever", "http_api_url",
+    "http_timeout_seconds", "browser_profile", "blocked_url_patterns", "driver_pool_size",
+    "driver_max_page_loads", "driver_max_rss_mb", "store_path", "store_retention_days",
+    "hysteresis_cm", "stale_after_seconds", "metrics_enabled", "metrics_port", "metrics_host",
+    "api_port", "api_host", "subscriptions", "trend_horizon_hours", "alerts",
+    "cycle_deadline_seconds", "chromedriver_path", "chromedriver_version",
+)
+
+_MAGIC = b"WLCS"
+_VERSION = 1
+# Magic, Version, Schema-Prüfsumme, mtime_ns, Größe, SHA-256 der Quelle,
+# Stationszahl, Längen der Namens-, Fluss- und general_config-Blöcke (72 Bytes, 8-Byte-ausgerichtet)
+_HEADER = struct.Struct("<4sHxxqqI32sIIII")
+_SCHEMA = zlib.crc32("\0".join(SERVICE_GENERAL_KEYS + THRESHOLD_KEYS).encode("utf-8"))
+
+
+def snapshot_path_for(config_path):
+    return os.path.splitext(config_path)[0] + ".snapshot"
+
+
+class ThresholdTable(Mapping):
+    """
+    Schwellenwert-Mapping (Station -> waterThresholds) über einer dichten Tabelle
+    (Stationen x THRESHOLD_KEYS, fehlende Schwellen = inf), z. B. direkt aus dem Snapshot-mmap.
+    Verhält sich wie das Dictionary aus load_config; die Einträge werden erst beim Zugriff
+    erzeugt, ThresholdClassifier übernimmt die Tabelle ohne Umweg über Dictionaries.
+    """
+
+    def __init__(self, names, thresholds):
+        self.names = names
+        self.thresholds = thresholds
+        self._index = {name: row for row, name in enumerate(names)}
+
+    def __getitem__(self, name):
+        row = self.thresholds[self._index[name]]
+        return {
+            key: int(value) if value.is_integer() else value
+            for key, value in zip(THRESHOLD_KEYS, row.tolist())
+            if value != np.inf
+        }
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _source_key(config_path):
+    stat = os.stat(config_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_sha256(config_path):
+    with open(config_path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def compile_snapshot(config, config_path, snapshot_path=None, source=None):
+    """
+    Schreibt den Snapshot für die bereits geladene config atomar neben die Quelldatei.
+    source = (mtime_ns, size, sha256) der Quelle, wie sie vor dem Laden vorlag; ändert sich
+    die Datei zwischendurch, passt der Schlüssel nicht und der Snapshot gilt als veraltet.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(config_path)
+    if source is None:
+        source = _source_key(config_path) + (_file_sha256(config_path),)
+    mtime_ns, size, digest = source
+    stations = config.get("water_stations", [])
+    names = "\0".join(station["name"] for station in stations).encode("utf-8")
+    rivers = "\0".join(station.get("riverName") or "" for station in stations).encode("utf-8")
+    general_config = config.get("general_config", {})
+    general = json.dumps(
+        {key: general_config[key] for key in SERVICE_GENERAL_KEYS if key in general_config},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    table = np.array(
+        [[float(t[key]) if t.get(key) is not None else np.inf for key in THRESHOLD_KEYS]
+         for t in (station.get("waterThresholds") or {} for station in stations)],
+        dtype="<f8",
+    ).reshape(len(stations), len(THRESHOLD_KEYS))
+    header = _HEADER.pack(_MAGIC, _VERSION, _SCHEMA, mtime_ns, size, digest,
+                          len(stations), len(names), len(rivers), len(general))
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(table.tobytes())
+        f.write(names)
+        f.write(rivers)
+        f.write(general)
+    os.replace(temp_path, snapshot_path)
+
+
+def _split(blob, count):
+    # Interniert, damit Stationsnamen über Neuladen, Scheduler und Store hinweg geteilt werden
+    return [sys.intern(part) for part in blob.decode("utf-8").split("\0")] if count else []
+
+
+def _read_snapshot(config_path, snapshot_path):
+    """
+    Liefert (config, threshold_map) aus dem Snapshot oder None, wenn er fehlt oder nicht mehr
+    zur Quelldatei passt. Stimmen mtime und Größe, wird die Quelle nicht gelesen; sonst
+    entscheidet der SHA-256 (z. B. nach touch oder Kopieren mit gleichem Inhalt).
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < _HEADER.size:
+        return None
+    (magic, version, schema, mtime_ns, size, digest,
+     count, names_len, rivers_len, general_len) = _HEADER.unpack_from(mapped, 0)
+    if magic != _MAGIC or version != _VERSION or schema != _SCHEMA:
+        return None
+    if (mtime_ns, size) != _source_key(config_path) and digest != _file_sha256(config_path):
+        return None
+
+    offset = _HEADER.size
+    table_len = count * len(THRESHOLD_KEYS) * 8
+    if len(mapped) != offset + table_len + names_len + rivers_len + general_len:
+        return None
+    thresholds = np.frombuffer(mapped, dtype="<f8", count=count * len(THRESHOLD_KEYS), offset=offset)
+    thresholds = thresholds.reshape(count, len(THRESHOLD_KEYS))
+    offset += table_len
+    names = _split(mapped[offset:offset + names_len], count)
+    offset += names_len
+    rivers = _split(mapped[offset:offset + rivers_len], count)
+    offset += rivers_len
+    general_config = json.loads(mapped[offset:offset + general_len].decode("utf-8"))
+
+    config = {
+        "general_config": general_config,
+        "water_stations": [{"name": name, "riverName": river or None} for name, river in zip(names, rivers)],
+    }
+    return config, ThresholdTable(names, thresholds)
+
+
+def load_config_snapshot(config_path="config/water_level_config.json", snapshot_path=None):
+    """
+    Wie config_manager.load_config, aber über den kompilierten Snapshot: interniert Namen,
+    Schwellen als Tabelle (per mmap), aus general_config nur SERVICE_GENERAL_KEYS und aus
+    water_stations nur name und riverName. Ist der Snapshot veraltet oder unlesbar, wird
+    die JSON-Datei geladen und der Snapshot neu geschrieben.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(config_path)
+    try:
+        result = _read_snapshot(config_path, snapshot_path)
+    except Exception as e:
+        logging.warning("Konfigurations-Snapshot %s nicht lesbar: %s", snapshot_path, e)
+        result = None
+    if result is not None:
+        return result
+
+    source = _source_key(config_path) + (_file_sha256(config_path),)
+    config, config_threshold_map = load_config(config_path)
+    try:
+        # Unter Windows schlägt das Ersetzen fehl, solange ein älterer Snapshot gemappt ist;
+        # dann bleibt es bis zum nächsten Start bei der JSON-Konfiguration
+        compile_snapshot(config, config_path, snapshot_path, source)
+    except Exception as e:
+        logging.warning("Konfigurations-Snapshot konnte nicht geschrieben werden: %s", e)
+        return config, config_threshold_map
+    result = _read_snapshot(config_path, snapshot_path)
+    return result if result is not None else (config, config_threshold_map)
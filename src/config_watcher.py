@@ -1,34 +1,91 @@
 # src/config_watcher.py
 import os
 import logging
-import time
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import threading
+from config_manager import config_file_hash
+
+class ConfigFileHandler:
+    """
+    Löst update_callback aus, wenn sich der Inhalt der Konfigurationsdatei geändert hat.
+    Handler für einen watchdog-Observer; watchdog selbst wird erst in start_config_watcher geladen.
+
+    - Berücksichtigt nur Ereignisse für genau diese Datei, auch das Ersetzen per os.replace
+      (on_moved/on_created), nicht aber die .tmp-Datei von save_config.
+    - Fasst Ereignis-Schübe zusammen: Ausgelöst wird erst, wenn debounce_interval Sekunden
+      lang kein weiteres Ereignis kam, sodass immer der letzte Stand gelesen wird.
+    - Vergleicht den SHA-256 des Inhalts und ruft update_callback nur bei echten Änderungen auf.
+    """
 
-class ConfigFileHandler(FileSystemEventHandler):
     def __init__(self, config_path, update_callback, debounce_interval=2):
-        self.config_path = config_path
+        self.config_path = os.path.normcase(os.path.abspath(config_path))
         self.update_callback = update_callback
         self.debounce_interval = debounce_interval
-        self.last_modified = 0
+        self._lock = threading.Lock()
+        self._timer = None
+        try:
+            self.last_hash = config_file_hash(config_path)
+        except OSError:
+            self.last_hash = None
+
+    def dispatch(self, event):
+        # Wie watchdog.events.FileSystemEventHandler.dispatch: on_<event_type> aufrufen
+        handler = getattr(self, "on_" + event.event_type, None)
+        if handler is not None:
+            handler(event)
+
+    def _is_config(self, path):
+        return bool(path) and os.path.normcase(os.path.abspath(path)) == self.config_path
 
     def on_modified(self, event):
         # Prüfe, ob es sich um die Konfigurationsdatei handelt
-        if event.src_path.endswith(os.path.basename(self.config_path)):
-            current_time = time.time()
-            # Debounce: Nur auslösen, wenn seit dem letzten Trigger genügend Zeit vergangen ist
-            if current_time - self.last_modified < self.debounce_interval:
-                return
-            self.last_modified = current_time
-            logging.info("Konfigurationsdatei wurde geändert. Aktualisiere Konfiguration...")
-            try:
-                self.update_callback()
-            except Exception as e:
-                logging.error("Fehler beim Aktualisieren der Konfiguration: %s", e)
+        if not event.is_directory and self._is_config(event.src_path):
+            self._schedule()
+
+    def on_created(self, event):
+        if not event.is_directory and self._is_config(event.src_path):
+            self._schedule()
+
+    def on_moved(self, event):
+        # Atomares Ersetzen (save_config: .tmp -> Konfigurationsdatei)
+        if not event.is_directory and self._is_config(getattr(event, "dest_path", None)):
+            self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_interval, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+        try:
+            current_hash = config_file_hash(self.config_path)
+        except OSError as e:
+            logging.error("Konfigurationsdatei konnte nicht gelesen werden: %s", e)
+            return
+        if current_hash == self.last_hash:
+            logging.debug("Konfigurationsdatei unverändert (gleicher Inhalt), kein Neuladen.")
+            return
+        logging.info("Konfigurationsdatei wurde geändert. Aktualisiere Konfiguration...")
+        try:
+            self.update_callback()
+            self.last_hash = current_hash
+        except Exception as e:
+            logging.error("Fehler beim Aktualisieren der Konfiguration: %s", e)
+
+    def cancel(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
 
 def start_config_watcher(config_path, update_callback):
+    from watchdog.observers import Observer
     event_handler = ConfigFileHandler(config_path, update_callback)
     observer = Observer()
-    observer.schedule(event_handler, path=os.path.dirname(config_path), recursive=False)
+    observer.schedule(event_handler, path=os.path.dirname(os.path.abspath(config_path)), recursive=False)
     observer.start()
     return observer
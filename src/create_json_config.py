@@ -1,93 +1,181 @@
 import os
 import json
-from data_retriever import get_all_water_data
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-def get_station_thresholds(driver, station_href):
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from data_retriever import get_station_thresholds  # noqa: F401 (bisheriger Importpfad)
+from retriever import SeleniumRetriever, create_retriever
+from config_manager import load_config, save_config_stream
+from station_cache import StationCache
+
+def _log_progress(done, total, station_href):
+    if total is None:
+        logging.info("Schwellenwerte %d abgerufen (%s).", done, station_href)
+    else:
+        logging.info("Schwellenwerte %d/%d abgerufen (%s).", done, total, station_href)
+
+class _ThresholdHarvester:
     """
-    Öffnet den Detailbereich eines Gewässers (station_href) mit dem übergebenen driver,
-    hängt '#pegelkennwerte' an und extrahiert aus der Tabelle, die den Header 
-    "Wasserstandskennwerte" enthält, die Schwellenwerte für:
-      - HW 100
-      - HW 50
-      - HW 20
-      - HW 2
-      - MW
-      
-    Liefert ein Dictionary mit Schlüsseln ohne Leerzeichen (z. B. "HW100") und int-Werten.
+    Ruft die Schwellenwerte einzelner Stationen mit Wiederholungen ab. Jeder Worker-Thread
+    erhält über retriever_factory ein eigenes Abruf-Backend; close() schließt diese wieder,
+    sofern owns_retrievers gesetzt ist.
     """
-    BASE_URL = "https://hochwasser.rlp.de"
-    if station_href.startswith("http"):
-        station_url = station_href + "#pegelkennwerte"
-    else:
-        station_url = BASE_URL + station_href + "#pegelkennwerte"
-    
-    driver.get(station_url)
-    
-    try:
-        # Warte, bis mindestens eine Tabelle der gewünschten Klasse geladen ist
-        tables = WebDriverWait(driver, 15).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "table.MuiTable-root.m-detail-measurementsites__table-wrapper"))
-        )
-    except Exception as e:
-        print(f"Keine Tabelle gefunden für {station_url}: {e}")
-        return {}
-    
-    target_table = None
-    # Suche in allen gefundenen Tabellen nach dem Header "Wasserstandskennwerte"
-    for table in tables:
-        try:
-            thead = table.find_element(By.CSS_SELECTOR, "thead")
-            header_cells = thead.find_elements(By.TAG_NAME, "td")
-            for cell in header_cells:
-                if "Wasserstandskennwerte" in cell.text:
-                    target_table = table
-                    break
-            if target_table:
+
+    def __init__(self, retriever_factory, total=None, retries=2, backoff_seconds=1.0, progress=_log_progress,
+                 owns_retrievers=True):
+        self.retriever_factory = retriever_factory
+        self.total = total
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.progress = progress
+        self.owns_retrievers = owns_retrievers
+        self.done = 0
+        self._local = threading.local()
+        self._retrievers = []
+        self._lock = threading.Lock()
+
+    def _retriever(self):
+        if not hasattr(self._local, "retriever"):
+            self._local.retriever = self.retriever_factory()
+            with self._lock:
+                self._retrievers.append(self._local.retriever)
+        return self._local.retriever
+
+    def harvest(self, station_href):
+        for attempt in range(self.retries + 1):
+            try:
+                thresholds = self._retriever().get_station_thresholds(station_href)
+            except Exception as e:
+                logging.warning("Fehler beim Abruf der Schwellenwerte für %s: %s", station_href, e)
+                thresholds = {}
+            if thresholds:
                 break
-        except Exception as e:
-            continue
+            if attempt < self.retries:
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+        with self._lock:
+            self.done += 1
+            current = self.done
+        if self.progress is not None:
+            self.progress(current, self.total, station_href)
+        return thresholds
 
-    if not target_table:
-        print(f"Keine Tabelle mit 'Wasserstandskennwerte' gefunden für {station_url}.")
-        return {}
-    
-    thresholds = {}
+    def close(self):
+        if self.owns_retrievers:
+            for retriever in self._retrievers:
+                retriever.close()
+
+def harvest_thresholds(station_hrefs, retriever_factory, max_workers=4, retries=2, backoff_seconds=1.0,
+                       progress=_log_progress):
+    """
+    Ruft die Schwellenwerte mehrerer Stationen parallel ab. Jeder Worker-Thread erhält
+    über retriever_factory ein eigenes Abruf-Backend (z. B. einen eigenen WebDriver),
+    max_workers begrenzt die Anzahl gleichzeitiger Abrufe.
+
+    Schlägt ein Abruf fehl oder liefert er keine Werte, wird er bis zu retries-mal mit
+    exponentiell wachsender Wartezeit (backoff_seconds, 2*backoff_seconds, ...) wiederholt.
+    progress(done, total, station_href) wird nach jeder abgeschlossenen Station aufgerufen.
+
+    Liefert eine Liste von Dictionaries in derselben Reihenfolge wie station_hrefs.
+    """
+    harvester = _ThresholdHarvester(retriever_factory, len(station_hrefs), retries, backoff_seconds, progress)
     try:
-        tbody = target_table.find_element(By.CSS_SELECTOR, "tbody.MuiTableBody-root")
-        rows = tbody.find_elements(By.CSS_SELECTOR, "tr")
-        if not rows:
-            print(f"tbody gefunden, aber keine Zeilen in {station_url}. HTML: {tbody.get_attribute('innerHTML')}")
-        valid_keys = ["HW 100", "HW 50", "HW 20", "HW 2", "MW"]
-        valid_keys_nospace = [k.replace(" ", "") for k in valid_keys]
-        for row in rows:
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if len(cells) >= 2:
-                key_text = cells[0].text.strip()   # z. B. "HW 100" oder "HW100"
-                value_text = cells[1].text.strip()  # z. B. "143 cm"
-                print(f"DEBUG: Key cell: '{key_text}', Value cell: '{value_text}'")
-                if key_text in valid_keys or key_text.replace(" ", "") in valid_keys_nospace:
-                    key = key_text.replace(" ", "")
-                    try:
-                        value = int(value_text.replace(" cm", "").strip())
-                    except Exception:
-                        value = None
-                    thresholds[key] = value
-        if thresholds:
-            print(f"Schwellenwerte für {station_url}: {thresholds}")
-        else:
-            print(f"Keine gültigen Schwellenwerte gefunden für {station_url}.")
-    except Exception as e:
-        print("Fehler beim Extrahieren der Schwellenwerte:", e)
-    
-    return thresholds
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(harvester.harvest, station_hrefs))
+    finally:
+        harvester.close()
+
+def _detail_retriever_factory(retriever):
+    """
+    Backend für die Detailseiten, solange die Liste noch geblättert wird: (factory, eigene Backends).
+    Ein einzelner WebDriver ohne Pool ist dabei belegt; dann (None, False). Backends ohne
+    WebDriver (z. B. HttpRetriever mit seiner thread-sicheren HttpSession) nutzen alle Worker
+    gemeinsam.
+    """
+    if isinstance(retriever, SeleniumRetriever):
+        if retriever.pool is None or retriever.pool.size < 2:
+            return None, False
+        # Ein Driver blättert die Liste, die übrigen des Pools rufen die Detailseiten ab
+        return (lambda: SeleniumRetriever(pool=retriever.pool, owns_driver=False)), True
+    return (lambda: retriever), False
+
+def _water_pages(retriever, url, filter_names):
+    # Seitenweise, sofern das Backend es anbietet (retriever.Retriever), sonst als eine Seite
+    if hasattr(retriever, "iter_water_data"):
+        return retriever.iter_water_data(url, filter_names)
+    return iter([retriever.get_all_water_data(url, filter_names)])
+
+def _harvest_pages(pages, known_thresholds, harvester, workers, max_pending):
+    """
+    Liefert (entry, thresholds, abgerufen) für alle Einträge der Seiten in deren Reihenfolge.
+    Die Detailseiten einer Seite werden schon abgerufen, während die nächste Seite der Liste
+    lädt; sind mehr als max_pending Stationen offen, wird zuerst auf die älteste gewartet.
+    known_thresholds(entry) liefert bereits bekannte Schwellenwerte oder None.
+    """
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        for page in pages:
+            for entry in page:
+                known = known_thresholds(entry)
+                pending.append((entry, known, None if known is not None else executor.submit(harvester.harvest, entry[6])))
+            while pending and (len(pending) > max_pending or pending[0][2] is None or pending[0][2].done()):
+                entry, known, future = pending.popleft()
+                yield (entry, known, False) if future is None else (entry, future.result(), True)
+        while pending:
+            entry, known, future = pending.popleft()
+            yield (entry, known, False) if future is None else (entry, future.result(), True)
+    finally:
+        # Bei Abbruch (z. B. Schreibfehler) keine weiteren Detailseiten mehr abrufen
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _station_entry(entry, thresholds):
+    return {
+        "name": entry[0],
+        "riverName": entry[1],
+        "riverAreaName": entry[2],
+        "catchmentArea": entry[5],
+        "href": entry[6],
+        "waterThresholds": thresholds
+    }
+
+def _known_thresholds(entry, existing_by_name, cache, now):
+    """
+    Schwellenwerte einer Live-Station aus Cache oder bestehender Konfiguration, None, wenn sie
+    abgerufen werden müssen: neue Stationen, Stationen mit geändertem href, leere Einträge und
+    Einträge, deren Cache-TTL abgelaufen ist.
+    """
+    name, href = entry[0], entry[6]
+    cached = cache.get(href, now)
+    if cached:
+        return cached
+    existing = existing_by_name.get(name)
+    if existing and existing.get("waterThresholds"):
+        existing_href = existing.get("href")
+        if existing_href is None and href not in cache.entries:
+            # Alte Konfiguration ohne href: Werte übernehmen und den Cache damit vorbelegen
+            cache.put(href, existing["waterThresholds"], now)
+            return existing["waterThresholds"]
+    return None
+
+def _previous_thresholds(entry, existing_by_name, cache):
+    """
+    Zuletzt bekannte Schwellenwerte einer Station unabhängig von der Cache-TTL (Cache, sonst
+    bestehende Konfiguration mit gleichem href) oder None. Ersatz, wenn ein erneuter Abruf scheitert.
+    """
+    name, href = entry[0], entry[6]
+    cached = cache.entries.get(href)
+    if cached and cached.get("waterThresholds"):
+        return cached["waterThresholds"]
+    existing = existing_by_name.get(name)
+    if existing and existing.get("waterThresholds") and existing.get("href") in (None, href):
+        return existing["waterThresholds"]
+    return None
 
-def create_json_config(url, filter_names=None, output_filename="water_level_config.json", collect_thresholds=True):
+def create_json_config(url, filter_names=None, output_filename="water_level_config.json", collect_thresholds=True,
+                       retriever=None, backend="selenium", workers=1, incremental=False,
+                       cache_filename="station_cache.json", cache_ttl_seconds=30 * 24 * 3600, max_pending=None):
     """
     Ruft alle Stationen über get_all_water_data ab (erwartet 7-teilige Tupel) und ergänzt
     für jeden Eintrag (optional) die Schwellenwerte aus der Detailseite.
@@ -96,65 +184,120 @@ def create_json_config(url, filter_names=None, output_filename="water_level_conf
     
     Mit dem Parameter collect_thresholds kann gesteuert werden, ob für jede Station
     die zeitintensive Schwellenwert-Abfrage durchgeführt wird (True) oder nicht (False).
+
+    retriever ist ein bereits erzeugtes Abruf-Backend (siehe retriever.py); ohne Angabe wird
+    eines für backend ("selenium" oder "http") erzeugt und für Liste und Detailseiten
+    wiederverwendet.
+
+    Mit workers > 1 werden die Detailseiten parallel abgerufen; beim Selenium-Backend teilen
+    sich die Worker einen DriverPool mit workers Drivern (plus einem für die Liste).
+
+    Mit incremental=True wird die bestehende Konfiguration fortgeschrieben: Detailseiten werden
+    nur für neue Stationen, geänderte hrefs oder Cache-Einträge älter als cache_ttl_seconds
+    abgerufen, alles andere stammt aus dem Station-Cache (config/<cache_filename>).
+    general_config der bestehenden Datei bleibt dabei erhalten.
+
+    Die Liste wird seitenweise verarbeitet (Retriever.iter_water_data): Die Detailseiten einer
+    Seite werden abgerufen, während die nächste lädt, und jede Station wird geschrieben, sobald
+    ihre Schwellenwerte vorliegen. Höchstens max_pending (Standard 4 * workers + 100) Stationen
+    sind dabei gleichzeitig offen, der Speicherbedarf hängt damit nicht von der Stationsanzahl ab.
+    Nur ein einzelner WebDriver ohne Pool liest zuerst die ganze Liste.
     """
-    # data: Liste von Tupeln (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href)
-    data = get_all_water_data(url, filter_names)
-    
-    # Optional: Einmalig (und nur wenn collect_thresholds True ist) soll ein WebDriver erstellt werden,
-    # der für alle Detailseiten wiederverwendet wird.
-    if collect_thresholds:
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        options.add_argument("--log-level=3")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    else:
-        driver = None
-    
-    water_stations = []
-    for entry in data:
-        if collect_thresholds and driver is not None:
-            thresholds = get_station_thresholds(driver, entry[6])
-        else:
-            thresholds = {}  # Leeres Dict, wenn keine Schwellenwerte abgefragt werden sollen
-        station = {
-            "name": entry[0],
-            "riverName": entry[1],
-            "riverAreaName": entry[2],
-            "catchmentArea": entry[5],
-            "waterThresholds": thresholds
-        }
-        water_stations.append(station)
-        print(f"Station '{entry[0]}' wurde verarbeitet.")
-    
-    if driver is not None:
-        driver.quit()
-    
-    # Allgemeine Konfiguration: Hier kannst du weitere Parameter hinzufügen,
-    # wie polling-Intervall, Benachrichtigungseinstellungen etc.
-    general_config = {
-        "poll_interval_seconds": 300,
-        "data_url": url,
-        "selected_stations": filter_names or []
-    }
-    
-    json_config = {
-        "water_stations": water_stations,
-        "general_config": general_config
-    }
-    
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     output_path = os.path.join(base_dir, "config", output_filename)
+    cache = StationCache(os.path.join(base_dir, "config", cache_filename), ttl_seconds=cache_ttl_seconds)
+
+    existing_config = {}
+    if incremental and os.path.exists(output_path):
+        existing_config, _ = load_config(output_path)
+
+    # Allgemeine Konfiguration: Hier kannst du weitere Parameter hinzufügen,
+    # wie polling-Intervall, Benachrichtigungseinstellungen etc.
+    general_config = existing_config.get("general_config")
+    if general_config:
+        general_config["data_url"] = url
+    else:
+        general_config = {
+            "poll_interval_seconds": 300,
+            "data_url": url,
+            "selected_stations": filter_names or [],
+            "retriever": backend
+        }
+
+    own_retriever = retriever is None
+    if own_retriever:
+        pool_size = max(1, workers) + (1 if collect_thresholds else 0)
+        retriever = create_retriever({"retriever": backend, "driver_pool_size": pool_size})
+
+    now = time.time()
+    hrefs = set()
+    fetched = 0
+
+    def stations():
+        nonlocal fetched
+        # pages: Seiten mit Tupeln (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href)
+        pages = _water_pages(retriever, url, filter_names)
+        if not collect_thresholds:
+            # Leere Dicts, wenn keine Schwellenwerte abgefragt werden sollen
+            for page in pages:
+                for entry in page:
+                    yield _station_entry(entry, {})
+            return
+
+        if incremental:
+            existing_by_name = {station["name"]: station for station in existing_config.get("water_stations", [])}
+            known_thresholds = lambda entry: _known_thresholds(entry, existing_by_name, cache, now)
+            previous_thresholds = lambda entry: _previous_thresholds(entry, existing_by_name, cache)
+        else:
+            known_thresholds = previous_thresholds = lambda entry: None
+        factory, owns_retrievers = _detail_retriever_factory(retriever)
+        if factory is None:
+            # Der einzige Driver wird für die Liste gebraucht: erst blättern, dann Detailseiten
+            pages = [[entry for page in pages for entry in page]]
+            factory = lambda: retriever
+        harvester = _ThresholdHarvester(factory, owns_retrievers=owns_retrievers)
+        try:
+            for entry, thresholds, was_fetched in _harvest_pages(
+                    pages, known_thresholds, harvester, workers, max_pending or 4 * workers + 100):
+                hrefs.add(entry[6])
+                if was_fetched:
+                    fetched += 1
+                    if thresholds:
+                        cache.put(entry[6], thresholds, now)
+                    elif previous_thresholds(entry):
+                        # Abruf gescheitert: bekannte Werte (samt altem fetchedAt) behalten, statt
+                        # die Station ohne Schwellen und damit ohne Alarm zu schreiben
+                        logging.warning("Schwellenwerte für '%s' nicht abrufbar, behalte die bisherigen.", entry[0])
+                        thresholds = previous_thresholds(entry)
+                logging.debug("Station '%s' wurde verarbeitet.", entry[0])
+                yield _station_entry(entry, thresholds)
+        finally:
+            harvester.close()
+
+    try:
+        count = save_config_stream(stations(), general_config, output_path)
+    finally:
+        if own_retriever:
+            retriever.close()
+
+    if collect_thresholds:
+        if incremental:
+            logging.info("Inkrementelle Aktualisierung: %d von %d Stationen wurden abgerufen.", fetched, count)
+        cache.prune(hrefs)
+        cache.save()
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(json_config, f, indent=4, ensure_ascii=False)
-    
-    print(f"JSON-Konfiguration wurde in '{output_path}' gespeichert.")
+    logging.info("JSON-Konfiguration wurde in '%s' gespeichert.", output_path)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
     # Beispiel-Aufruf: Erstelle die initiale Konfiguration mit vollständiger Schwellenwertabfrage
     url = "https://hochwasser.rlp.de/pegelliste/land"
     # Hier können die vom Nutzer gewünschten Stationen als Liste übergeben werden; 
     # ist None, werden alle Stationen abgerufen.
     selected_stations = []
-    create_json_config(url, filter_names=selected_stations, collect_thresholds=True)
+    # Anzahl paralleler Detailseiten-Abrufe (Größe des WebDriver-Pools)
+    workers = 4
+    # True: nur neue/geänderte/abgelaufene Stationen abrufen, Rest aus dem Station-Cache
+    incremental = True
+    create_json_config(url, filter_names=selected_stations, collect_thresholds=True, workers=workers,
+                       incremental=incremental)
@@ -1,80 +1,511 @@
 # data_retriever.py
-import time
+import logging
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+import metrics
+from deadline import NO_DEADLINE
+from readings import ReadingBuilder, parse_value_cm
 
-def get_all_water_data(driver, url, filter_names=None):
+# Reihenfolge der Felder im Ergebnis-Tupel (ohne href, das aus dem Link der Namensspalte stammt)
+ROW_FIELDS = ("name", "riverName", "riverAreaName", "yLast", "xLast", "catchmentArea")
+
+_ROW_CLASS = "MuiDataGrid-row"
+_CELL_CONTENT_CLASS = "MuiDataGrid-cellContent"
+
+
+def _wait(driver, timeout):
+    # selenium.webdriver.support lädt den kompletten Remote-WebDriver nach, den der HTTP-Pfad
+    # nie braucht: erst beim ersten Warten importieren
+    from selenium.webdriver.support.ui import WebDriverWait
+    return WebDriverWait(driver, timeout)
+
+
+def _ec():
+    from selenium.webdriver.support import expected_conditions
+    return expected_conditions
+
+
+def _normalize_text(parts):
+    # Entspricht grob WebElement.text: Whitespace zusammenfassen, Ränder entfernen
+    return " ".join("".join(parts).split())
+
+
+class _GridRowParser(HTMLParser):
     """
-    Ruft alle Wasserstandsdaten von der Seite ab.
-    filter_names (Liste) bewirkt, dass nur Zeilen verarbeitet werden, deren Name in dieser Liste enthalten ist.
-    
-    Erwartet einen bereits initialisierten WebDriver (driver).
-    Liefert eine Liste von Tupeln:
-    (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href)
+    Liest alle Zeilen des MuiDataGrid in einem einzigen Durchlauf aus dem Seitenquelltext.
+    Gezählt wird nur die Verschachtelungstiefe von div-Elementen, damit nicht geschlossene
+    Inline- oder Void-Elemente (img, br, input, ...) die Zuordnung nicht durcheinanderbringen.
     """
-    driver.get(url)
-    time.sleep(1)  # Kurze Wartezeit, bis die Seite initial geladen ist
 
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._div_depth = 0
+        self._row_depth = None
+        self._cell_depth = None
+        self._cell_field = None
+        self._row = None
+        self._text = None
+        self._in_link = False
+        self._link_text = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a" and self._cell_field == "name" and self._row.get("href") is None:
+            attributes = dict(attrs)
+            self._row["href"] = attributes.get("href")
+            self._in_link = True
+            self._link_text = []
+            return
+        if tag != "div":
+            return
+        self._div_depth += 1
+        attributes = dict(attrs)
+        classes = (attributes.get("class") or "").split()
+        if self._row_depth is None:
+            if _ROW_CLASS in classes:
+                self._row_depth = self._div_depth
+                self._row = {}
+            return
+        field = attributes.get("data-field")
+        if self._cell_field is None and field in ROW_FIELDS:
+            self._cell_field = field
+            self._cell_depth = self._div_depth
+            self._text = []
+        elif self._cell_field == "riverAreaName" and _CELL_CONTENT_CLASS in classes:
+            self._row.setdefault("riverAreaTitle", attributes.get("title"))
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._in_link:
+            self._row["nameLink"] = _normalize_text(self._link_text)
+            self._in_link = False
+            return
+        if tag != "div":
+            return
+        if self._cell_field is not None and self._div_depth == self._cell_depth:
+            self._row.setdefault(self._cell_field, _normalize_text(self._text))
+            self._cell_field = None
+            self._cell_depth = None
+        if self._row_depth is not None and self._div_depth == self._row_depth:
+            self.rows.append(self._row)
+            self._row = None
+            self._row_depth = None
+        self._div_depth -= 1
+
+    def handle_data(self, data):
+        if self._cell_field is not None:
+            self._text.append(data)
+        if self._in_link:
+            self._link_text.append(data)
+
+
+def parse_water_rows(page_source, base_url=None, filter_names=None):
+    """
+    Extrahiert alle Zeilen einer Pegelliste-Seite aus dem HTML-Quelltext (z. B. driver.page_source).
+    Liefert dieselben Readings wie der DOM-basierte Abruf, als Tupel gelesen
+    (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href).
+    Relative Links werden gegen base_url aufgelöst, wie es WebElement.get_attribute("href") tut.
+    """
+    parser = _GridRowParser()
+    parser.feed(page_source)
+    parser.close()
+
+    if filter_names:
+        filter_names = set(filter_names)
+    builder = ReadingBuilder()
     water_data = []
+    for row in parser.rows:
+        name = row.get("nameLink")
+        if name is None:
+            # Ohne Link in der Namensspalte ist die Zeile unvollständig (wie beim DOM-Abruf)
+            logging.warning("Fehler beim Auslesen einer Zeile: kein Link in der Namensspalte")
+            metrics.inc("water_parse_failures_total")
+            continue
+        if filter_names and name not in filter_names:
+            continue
+        href = row.get("href")
+        if href is not None and base_url:
+            href = urljoin(base_url, href)
+        river_area = row.get("riverAreaTitle") or row.get("riverAreaName", "")
+        water_data.append(builder.build(
+            name,
+            row.get("riverName", ""),
+            river_area,
+            row.get("yLast", ""),
+            row.get("xLast", ""),
+            row.get("catchmentArea", ""),
+            href,
+        ))
+    return water_data
 
-    while True:
-        try:
-            # Warte, bis alle Zeilen sichtbar sind
-            WebDriverWait(driver, 10).until(
-                EC.visibility_of_all_elements_located((By.CLASS_NAME, "MuiDataGrid-row"))
-            )
-        except Exception as e:
-            print("Timeout oder Fehler beim Warten auf die Zeilen:", e)
-            break
 
+def extract_row_dom(row, filter_names=None):
+    """
+    Liest eine einzelne Zeile über WebDriver-Aufrufe aus (ein Roundtrip pro Feld).
+    Liefert ein Reading (als Tupel: name, riverName, riverAreaName, yLast, xLast, catchmentArea, href)
+    oder None, wenn der Name nicht in filter_names enthalten ist.
+    """
+    # 1. Name (mit Link)
+    name_elem = row.find_element(By.CSS_SELECTOR, 'div[data-field="name"] a')
+    name = name_elem.text
+    href = name_elem.get_attribute("href")  # Neuer Link als 7. Element
+
+    # Falls ein Filter angegeben wurde, überspringe Zeilen, die nicht passen.
+    if filter_names and name not in filter_names:
+        return None
+
+    # 2. riverName
+    river_name = row.find_element(By.CSS_SELECTOR, 'div[data-field="riverName"]').text
+    # 3. riverAreaName (verschachteltes Div; nutze title, falls vorhanden, sonst Text)
+    river_area_element = row.find_element(By.CSS_SELECTOR, 'div[data-field="riverAreaName"] div.MuiDataGrid-cellContent')
+    river_area = river_area_element.get_attribute("title") or river_area_element.text
+    # 4. yLast (letzter Messwert)
+    y_last = row.find_element(By.CSS_SELECTOR, 'div[data-field="yLast"]').text
+    # 5. xLast (Zeitstempel)
+    x_last = row.find_element(By.CSS_SELECTOR, 'div[data-field="xLast"]').text
+    # 6. catchmentArea (Einzugsgebiet)
+    catchment_area = row.find_element(By.CSS_SELECTOR, 'div[data-field="catchmentArea"]').text
+    return ReadingBuilder().build(name, river_name, river_area, y_last, x_last, catchment_area, href)
+
+
+def _read_page_dom(driver, filter_names, deadline=NO_DEADLINE):
+    # Alter Pfad: ca. sieben WebDriver-Roundtrips pro Zeile
+    with metrics.timer("wait_rows"):
+        _wait(driver, deadline.timeout(10)).until(
+            _ec().visibility_of_all_elements_located((By.CLASS_NAME, "MuiDataGrid-row"))
+        )
+    with metrics.timer("extract"):
         rows = driver.find_elements(By.CLASS_NAME, "MuiDataGrid-row")
+        page_data = []
         for row in rows:
             try:
-                # 1. Name (mit Link)
-                name_elem = row.find_element(By.CSS_SELECTOR, 'div[data-field="name"] a')
-                name = name_elem.text
-                href = name_elem.get_attribute("href")  # Neuer Link als 7. Element
-                
-                # Falls ein Filter angegeben wurde, überspringe Zeilen, die nicht passen.
-                if filter_names and name not in filter_names:
-                    continue
-
-                # 2. riverName
-                river_name = row.find_element(By.CSS_SELECTOR, 'div[data-field="riverName"]').text
-                # 3. riverAreaName (verschachteltes Div; nutze title, falls vorhanden, sonst Text)
-                river_area_element = row.find_element(By.CSS_SELECTOR, 'div[data-field="riverAreaName"] div.MuiDataGrid-cellContent')
-                river_area = river_area_element.get_attribute("title") or river_area_element.text
-                # 4. yLast (letzter Messwert)
-                y_last = row.find_element(By.CSS_SELECTOR, 'div[data-field="yLast"]').text
-                # 5. xLast (Zeitstempel)
-                x_last = row.find_element(By.CSS_SELECTOR, 'div[data-field="xLast"]').text
-                # 6. catchmentArea (Einzugsgebiet)
-                catchment_area = row.find_element(By.CSS_SELECTOR, 'div[data-field="catchmentArea"]').text
-
-                # Tupel mit 7 Elementen
-                water_data.append((name, river_name, river_area, y_last, x_last, catchment_area, href))
+                entry = extract_row_dom(row, filter_names)
+                if entry is not None:
+                    page_data.append(entry)
             except Exception as e:
-                print("Fehler beim Auslesen einer Zeile:", e)
+                logging.warning("Fehler beim Auslesen einer Zeile: %s", e)
+                metrics.inc("water_parse_failures_total")
+    return page_data, rows[0] if rows else None
+
+
+def _read_page_source(driver, filter_names, deadline=NO_DEADLINE):
+    # Neuer Pfad: ein Roundtrip für die erste Zeile (Staleness-Referenz), einer für page_source
+    with metrics.timer("wait_rows"):
+        first_row = _wait(driver, deadline.timeout(10)).until(
+            _ec().presence_of_element_located((By.CLASS_NAME, "MuiDataGrid-row"))
+        )
+    with metrics.timer("extract"):
+        page_data = parse_water_rows(driver.page_source, base_url=driver.current_url, filter_names=filter_names)
+    return page_data, first_row
+
+
+_QUICK_FILTER_INPUT = ".MuiDataGrid-toolbarQuickFilter input, .MuiDataGrid-root input[type='search']"
+
+
+def _rows_changed(first_row, row_count):
+    # Bedingung für WebDriverWait: Grid wurde neu gerendert (alte Zeile entfernt oder Anzahl geändert)
+    def condition(driver):
+        if first_row is not None and _ec().staleness_of(first_row)(driver):
+            return True
+        return len(driver.find_elements(By.CLASS_NAME, "MuiDataGrid-row")) != row_count
+    return condition
+
 
-        # Versuche, den "Nächste Seite"-Button zu finden und zu klicken
+def _apply_quick_filter(driver, name, deadline=NO_DEADLINE):
+    """
+    Trägt name in die Schnellsuche des Grids ein, sofern die Seite eine anbietet, damit nur
+    passende Zeilen (auf einer Seite) gerendert werden. Liefert True, wenn gefiltert wurde.
+    Die Suche filtert per Teilstring, die exakte Namensprüfung erfolgt weiterhin beim Auslesen.
+    """
+    inputs = driver.find_elements(By.CSS_SELECTOR, _QUICK_FILTER_INPUT)
+    if not inputs:
+        return False
+    rows = driver.find_elements(By.CLASS_NAME, "MuiDataGrid-row")
+    try:
+        inputs[0].clear()
+        inputs[0].send_keys(name)
+        _wait(driver, deadline.timeout(5)).until(_rows_changed(rows[0] if rows else None, len(rows)))
+    except Exception as e:
+        logging.warning("Schnellsuche des Grids nicht nutzbar: %s", e)
+    return True
+
+
+_NEXT_BUTTON_XPATH = "//*[@data-testid='KeyboardArrowRightIcon']/ancestor::*[self::button or self::a]"
+
+
+def _next_page_button(driver):
+    # Der Button existiert auch auf der letzten Seite, ist dort aber deaktiviert: sofort
+    # erkennen, statt bis zum Timeout auf element_to_be_clickable zu warten
+    try:
+        button = driver.find_element(By.XPATH, _NEXT_BUTTON_XPATH)
+    except NoSuchElementException:
+        return None
+    return button if button.is_enabled() else None
+
+
+def iter_water_pages(driver, url, filter_names=None, parse_mode="source", deadline=NO_DEADLINE):
+    """
+    Liefert die Readings der Pegelliste Seite für Seite (eine Liste pro Seite), sobald die
+    Seite ausgelesen ist. Alle Wartezeiten sind durch deadline (deadline.Deadline) begrenzt;
+    ist die Frist abgelaufen, endet der Generator nach der zuletzt vollständig gelesenen Seite.
+    Parameter wie bei get_all_water_data.
+    """
+    read_page = _read_page_dom if parse_mode == "dom" else _read_page_source
+    # Menge statt Liste: O(1)-Lookup pro Zeile und Abbruch, sobald alle Namen gefunden sind
+    wanted = set(filter_names) if filter_names else None
+
+    # Keine feste Wartezeit: read_page wartet gezielt, bis die Zeilen des Grids vorhanden sind
+    with metrics.timer("navigate"):
+        driver.get(url)
+
+    if wanted and len(wanted) == 1:
         try:
-            next_svg = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//*[@data-testid='KeyboardArrowRightIcon']"))
-            )
-            next_button = next_svg.find_element(By.XPATH, "ancestor::*[self::button or self::a]")
-            WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//*[@data-testid='KeyboardArrowRightIcon']/ancestor::*[self::button or self::a]"))
-            )
-            next_button.click()
-            WebDriverWait(driver, 10).until(EC.staleness_of(rows[0]))
+            with metrics.timer("quick_filter"):
+                _wait(driver, deadline.timeout(10)).until(_ec().presence_of_element_located((By.CLASS_NAME, "MuiDataGrid-row")))
+                _apply_quick_filter(driver, next(iter(wanted)), deadline)
         except Exception as e:
-            #print("Pagination abgeschlossen oder Next-Button nicht mehr vorhanden:", e)
-            break
+            if isinstance(e, TimeoutException):
+                metrics.inc("water_timeouts_total")
+            logging.warning("Timeout oder Fehler beim Warten auf die Zeilen: %s", e)
+
+    found = set()
+    pages = 0
+
+    while True:
+        if deadline.expired():
+            metrics.inc("water_deadline_exceeded_total")
+            logging.warning("Frist des Abrufs abgelaufen nach %d Seite(n), Ergebnis ist unvollständig.", pages)
+            return
+        try:
+            page_data, first_row = read_page(driver, wanted, deadline)
+        except Exception as e:
+            if isinstance(e, TimeoutException):
+                metrics.inc("water_timeouts_total")
+            logging.warning("Timeout oder Fehler beim Warten auf die Zeilen: %s", e)
+            return
+        pages += 1
+        metrics.inc("water_pages_visited_total")
+        metrics.inc("water_rows_parsed_total", len(page_data))
+        yield page_data
+
+        # Alle gesuchten Stationen gefunden: keine weiteren Seiten laden
+        if wanted:
+            found.update(entry[0] for entry in page_data)
+            if found >= wanted:
+                return
+
+        # "Nächste Seite" klicken, sofern vorhanden und aktiv, und auf das neue Grid warten
+        try:
+            with metrics.timer("paginate"):
+                next_button = _next_page_button(driver)
+                if next_button is None:
+                    return
+                next_button.click()
+                _wait(driver, deadline.timeout(10)).until(_ec().staleness_of(first_row))
+        except Exception as e:
+            if isinstance(e, TimeoutException):
+                metrics.inc("water_timeouts_total")
+            logging.warning("Blättern fehlgeschlagen, Abruf endet nach %d Seite(n): %s", pages, e)
+            return
+
+
+def get_all_water_data(driver, url, filter_names=None, parse_mode="source", deadline=NO_DEADLINE):
+    """
+    Ruft alle Wasserstandsdaten von der Seite ab.
+    filter_names (Liste) bewirkt, dass nur Zeilen verarbeitet werden, deren Name in dieser Liste enthalten ist.
+    Sobald alle gesuchten Namen gefunden wurden, wird nicht weiter geblättert; bei genau einem
+    Namen wird zusätzlich die Schnellsuche des Grids genutzt, sofern vorhanden.
 
+    Erwartet einen bereits initialisierten WebDriver (driver).
+    parse_mode "source" liest jede Seite mit einem einzigen page_source-Abruf aus,
+    "dom" nutzt den bisherigen Weg über einzelne find_element-Aufrufe pro Zelle.
+    deadline begrenzt den gesamten Abruf; bei Ablauf werden die bis dahin gelesenen Seiten geliefert.
+    Liefert eine Liste von Readings (readings.Reading), die sich wie die bisherigen Tupel
+    (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href) lesen lassen.
+    """
+    water_data = []
+    for page_data in iter_water_pages(driver, url, filter_names, parse_mode, deadline):
+        water_data.extend(page_data)
     return water_data
 
 
+BASE_URL = "https://hochwasser.rlp.de"
+THRESHOLD_KEYS = ["HW 100", "HW 50", "HW 20", "HW 2", "MW"]
+
+
+def station_detail_url(station_href):
+    # Detailseite einer Station inkl. Anker auf die Pegelkennwerte
+    if station_href.startswith("http"):
+        return station_href + "#pegelkennwerte"
+    return BASE_URL + station_href + "#pegelkennwerte"
+
+
+def thresholds_from_rows(rows, station_url):
+    """
+    Wandelt die Zeilen (key_text, value_text) der Tabelle "Wasserstandskennwerte" in ein
+    Dictionary mit Schlüsseln ohne Leerzeichen (z. B. "HW100") und int-Werten um.
+    """
+    thresholds = {}
+    valid_keys_nospace = [k.replace(" ", "") for k in THRESHOLD_KEYS]
+    for key_text, value_text in rows:
+        logging.debug("Key cell: '%s', Value cell: '%s'", key_text, value_text)
+        if key_text in THRESHOLD_KEYS or key_text.replace(" ", "") in valid_keys_nospace:
+            key = key_text.replace(" ", "")
+            thresholds[key] = parse_value_cm(value_text)
+    if thresholds:
+        logging.debug("Schwellenwerte für %s: %s", station_url, thresholds)
+    else:
+        logging.warning("Keine gültigen Schwellenwerte gefunden für %s.", station_url)
+    return thresholds
+
+
+class _ThresholdTableParser(HTMLParser):
+    """
+    Sammelt aus dem Quelltext einer Detailseite alle Tabellen der Klasse
+    "m-detail-measurementsites__table-wrapper" mit ihren Kopf- und Datenzellen.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._table = None
+        self._table_depth = 0
+        self._section = None
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._table is not None:
+                self._table_depth += 1
+                return
+            classes = (dict(attrs).get("class") or "").split()
+            if "m-detail-measurementsites__table-wrapper" in classes:
+                self._table = {"header": [], "rows": []}
+                self._table_depth = 1
+            return
+        if self._table is None or self._table_depth != 1:
+            return
+        if tag in ("thead", "tbody"):
+            self._section = tag
+        elif tag == "tr":
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self._table is None:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self.tables.append(self._table)
+                self._table = None
+            return
+        if self._table_depth != 1:
+            return
+        if tag in ("td", "th") and self._cell is not None:
+            self._row.append(_normalize_text(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._section == "thead":
+                self._table["header"].extend(self._row)
+            elif self._section == "tbody":
+                self._table["rows"].append(self._row)
+            self._row = None
+        elif tag in ("thead", "tbody"):
+            self._section = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_station_thresholds(page_source, station_url=""):
+    """
+    Liest die Schwellenwerte aus dem HTML-Quelltext einer Detailseite (ohne WebDriver).
+    Liefert dasselbe Dictionary wie get_station_thresholds.
+    """
+    parser = _ThresholdTableParser()
+    parser.feed(page_source)
+    parser.close()
+    for table in parser.tables:
+        if any("Wasserstandskennwerte" in cell for cell in table["header"]):
+            rows = [(cells[0], cells[1]) for cells in table["rows"] if len(cells) >= 2]
+            return thresholds_from_rows(rows, station_url)
+    logging.warning("Keine Tabelle mit 'Wasserstandskennwerte' gefunden für %s.", station_url)
+    return {}
+
+
+def get_station_thresholds(driver, station_href):
+    """
+    Öffnet den Detailbereich eines Gewässers (station_href) mit dem übergebenen driver,
+    hängt '#pegelkennwerte' an und extrahiert aus der Tabelle, die den Header 
+    "Wasserstandskennwerte" enthält, die Schwellenwerte für:
+      - HW 100
+      - HW 50
+      - HW 20
+      - HW 2
+      - MW
+      
+    Liefert ein Dictionary mit Schlüsseln ohne Leerzeichen (z. B. "HW100") und int-Werten.
+    """
+    station_url = station_detail_url(station_href)
+    
+    with metrics.timer("detail_navigate"):
+        driver.get(station_url)
+    
+    try:
+        # Warte, bis mindestens eine Tabelle der gewünschten Klasse geladen ist
+        with metrics.timer("detail_wait"):
+            tables = _wait(driver, 15).until(
+                _ec().presence_of_all_elements_located((By.CSS_SELECTOR, "table.MuiTable-root.m-detail-measurementsites__table-wrapper"))
+            )
+    except Exception as e:
+        if isinstance(e, TimeoutException):
+            metrics.inc("water_timeouts_total")
+        logging.warning("Keine Tabelle gefunden für %s: %s", station_url, e)
+        return {}
+    
+    target_table = None
+    # Suche in allen gefundenen Tabellen nach dem Header "Wasserstandskennwerte"
+    for table in tables:
+        try:
+            thead = table.find_element(By.CSS_SELECTOR, "thead")
+            header_cells = thead.find_elements(By.TAG_NAME, "td")
+            for cell in header_cells:
+                if "Wasserstandskennwerte" in cell.text:
+                    target_table = table
+                    break
+            if target_table:
+                break
+        except Exception as e:
+            continue
+
+    if not target_table:
+        logging.warning("Keine Tabelle mit 'Wasserstandskennwerte' gefunden für %s.", station_url)
+        return {}
+    
+    thresholds = {}
+    try:
+        tbody = target_table.find_element(By.CSS_SELECTOR, "tbody.MuiTableBody-root")
+        rows = tbody.find_elements(By.CSS_SELECTOR, "tr")
+        if not rows:
+            logging.warning("tbody gefunden, aber keine Zeilen in %s. HTML: %s", station_url, tbody.get_attribute('innerHTML'))
+        row_texts = []
+        for row in rows:
+            cells = row.find_elements(By.TAG_NAME, "td")
+            if len(cells) >= 2:
+                # z. B. "HW 100" oder "HW100" und "143 cm"
+                row_texts.append((cells[0].text.strip(), cells[1].text.strip()))
+        thresholds = thresholds_from_rows(row_texts, station_url)
+    except Exception as e:
+        logging.error("Fehler beim Extrahieren der Schwellenwerte: %s", e)
+    
+    return thresholds
+
+
 if __name__ == "__main__":
     url = "https://hochwasser.rlp.de/pegelliste/land"  # URL der ersten Seite
 
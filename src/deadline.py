@@ -0,0 +1,31 @@
+# src/deadline.py
+import time
+
+
+class Deadline:
+    """
+    Frist eines Abrufzyklus auf der monotonen Uhr. Wartende Stellen begrenzen ihre Timeouts mit
+    timeout(), sodass ein hängendes Warten den Zyklus nicht über die Frist hinaus verlängert.
+    seconds=None bedeutet keine Frist.
+    """
+
+    def __init__(self, seconds=None, clock=time.monotonic):
+        self.clock = clock
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else clock() + seconds
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self):
+        return self.expires_at is not None and self.clock() >= self.expires_at
+
+    def timeout(self, default):
+        """Timeout für ein einzelnes Warten: default, höchstens aber die verbleibende Zeit."""
+        return min(default, self.remaining())
+
+
+# Platzhalter für Aufrufer ohne Frist
+NO_DEADLINE = Deadline()
@@ -1,12 +1,288 @@
 # src/driver_manager.py
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
 from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchWindowException, SessionNotCreatedException, WebDriverException,
+)
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from chromedriver import resolve_chromedriver
 
-def get_web_driver():
+# URL-Muster, die im "lean"-Profil per CDP (Network.setBlockedURLs) blockiert werden:
+# Bilder, Schriften und Stylesheets werden für das Auslesen der Tabellen nicht benötigt.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.svg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+
+def build_chrome_options(profile="lean"):
+    """
+    Chrome-Optionen für alle WebDriver des Projekts.
+    profile "full" lädt die Seiten vollständig wie bisher, "lean" wartet nur auf
+    DOMContentLoaded (pageLoadStrategy eager) und deaktiviert Bilder und Erweiterungen.
+    """
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_experimental_option("excludeSwitches", ["enable-logging"])
     options.add_argument("--log-level=3")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if profile == "lean":
+        options.page_load_strategy = "eager"
+        options.add_argument("--disable-extensions")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+def get_web_driver(profile="lean", blocked_urls=None, driver_path=None, driver_version=None):
+    """
+    Startet einen headless Chrome. Im "lean"-Profil werden zusätzlich die Anfragen auf
+    blocked_urls (Standard: LEAN_BLOCKED_URLS) über das DevTools-Protokoll unterbunden.
+    Der chromedriver kommt aus chromedriver.resolve_chromedriver (driver_path bzw. lokaler
+    Cache vor dem Netz, driver_version pinnt die Version).
+    """
+    options = build_chrome_options(profile)
+    try:
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver(driver_version, driver_path)), options=options)
+    except SessionNotCreatedException as e:
+        if driver_path or driver_version:
+            raise
+        # Chrome wurde aktualisiert und passt nicht mehr zum gecachten chromedriver
+        logging.warning("chromedriver passt nicht zu Chrome (%s), löse neu auf.", e.msg)
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver(refresh=True)), options=options)
+    if profile == "lean":
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls or LEAN_BLOCKED_URLS})
+        except Exception as e:
+            logging.warning("Ressourcen-Blockierung per CDP nicht möglich: %s", e)
     return driver
+
+# Meldungen, an denen sich eine abgestürzte oder getrennte Browser-Session erkennen lässt
+_SESSION_ERROR_MARKERS = ("invalid session id", "session deleted", "disconnected", "chrome not reachable", "no such window")
+
+def is_session_error(error):
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        return any(marker in message for marker in _SESSION_ERROR_MARKERS)
+    return False
+
+def driver_rss_bytes(driver):
+    """
+    Speicherbedarf (RSS) von chromedriver und allen Browser-Kindprozessen.
+    Liefert None, wenn psutil nicht installiert ist oder der Prozess nicht ermittelt werden kann.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes)
+    except Exception:
+        return None
+
+
+class _PooledDriver:
+    def __init__(self, driver, created_at):
+        self.driver = driver
+        self.created_at = created_at
+        self.page_loads = 0
+        # Seitenaufrufe zählen, nicht Ausleihen: get() dieser Driver-Instanz umhüllen
+        load = getattr(driver, "get", None)
+        if load is not None:
+            def get(url, *args, **kwargs):
+                self.page_loads += 1
+                return load(url, *args, **kwargs)
+            driver.get = get
+
+
+class DriverPool:
+    """
+    Verwaltet eine feste Anzahl vorgestarteter WebDriver.
+
+    - Vor jeder Ausgabe wird geprüft, ob die Session noch lebt; tote Driver werden ersetzt.
+    - Nach max_page_loads Seitenaufrufen (driver.get) oder wenn der RSS-Speicher max_rss_mb
+      übersteigt, wird ein Driver bei der Rückgabe beendet und durch einen neuen ersetzt.
+    - Scheitert der Start eines Ersatz-Drivers, bleibt der Platz frei und wird bei der nächsten
+      Ausgabe neu besetzt.
+    - run() wiederholt einen Aufruf nach einem Session-Fehler einmal mit frischem Driver.
+    - stats() liefert Kennzahlen zu Wartezeiten bei der Ausgabe und zum Alter der Driver.
+    """
+
+    def __init__(self, size=1, driver_factory=get_web_driver, max_page_loads=500, max_rss_mb=None,
+                 checkout_timeout=None, clock=time.monotonic):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_page_loads = max_page_loads
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+        self.clock = clock
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recycled = 0
+        self._replaced = 0
+        self._missing = 0
+        for _ in range(size):
+            self._idle.put(self._create())
+
+    def _create(self):
+        pooled = _PooledDriver(self.driver_factory(), self.clock())
+        with self._lock:
+            self._all.append(pooled)
+        return pooled
+
+    def _refill(self):
+        # Neuer Driver für einen frei gebliebenen Platz; scheitert er, bleibt der Platz frei
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self._missing += 1
+            raise
+
+    def _discard(self, pooled):
+        with self._lock:
+            if pooled in self._all:
+                self._all.remove(pooled)
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.debug("Fehler beim Beenden eines WebDrivers: %s", e)
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycling(self, pooled):
+        if self.max_page_loads and pooled.page_loads >= self.max_page_loads:
+            return True
+        if self.max_rss_mb:
+            rss = driver_rss_bytes(pooled.driver)
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                logging.info("WebDriver überschreitet %s MB RSS und wird neu gestartet.", self.max_rss_mb)
+                return True
+        return False
+
+    def checkout(self):
+        if self._closed:
+            raise Exception("DriverPool wurde bereits geschlossen.")
+        start = self.clock()
+        with self._lock:
+            refill = self._missing > 0 and self._idle.empty()
+            if refill:
+                self._missing -= 1
+        if refill:
+            pooled = self._refill()
+        else:
+            try:
+                pooled = self._idle.get(timeout=self.checkout_timeout)
+            except queue.Empty:
+                raise Exception("Kein WebDriver innerhalb des Timeouts verfügbar.")
+        wait = self.clock() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        if not self._is_alive(pooled.driver):
+            logging.warning("WebDriver-Session reagiert nicht mehr und wird ersetzt.")
+            self._discard(pooled)
+            pooled = self._refill()
+            with self._lock:
+                self._replaced += 1
+        return pooled
+
+    def checkin(self, pooled, broken=False):
+        # Läuft im finally von driver(): darf die ursprüngliche Exception nicht überdecken
+        if broken or self._closed:
+            self._discard(pooled)
+            if self._closed:
+                return
+            recycled = False
+        elif self._needs_recycling(pooled):
+            self._discard(pooled)
+            recycled = True
+        else:
+            self._idle.put(pooled)
+            return
+        try:
+            pooled = self._create()
+        except Exception as e:
+            logging.error("Ersatz-WebDriver konnte nicht gestartet werden, neuer Versuch bei der nächsten Ausgabe: %s", e)
+            with self._lock:
+                self._missing += 1
+            return
+        with self._lock:
+            if recycled:
+                self._recycled += 1
+            else:
+                self._replaced += 1
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self):
+        pooled = self.checkout()
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception as e:
+            broken = is_session_error(e)
+            raise
+        finally:
+            self.checkin(pooled, broken=broken)
+
+    def run(self, func, retries=1):
+        """Führt func(driver) aus; nach einem Session-Fehler wird mit einem neuen Driver wiederholt."""
+        for attempt in range(retries + 1):
+            try:
+                with self.driver() as driver:
+                    return func(driver)
+            except Exception as e:
+                if attempt < retries and is_session_error(e):
+                    logging.warning("Session-Fehler (%s), wiederhole mit neuem WebDriver.", e)
+                    continue
+                raise
+
+    def stats(self):
+        now = self.clock()
+        with self._lock:
+            ages = [now - pooled.created_at for pooled in self._all]
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "checkout_wait_avg_seconds": self._wait_total / self._checkouts if self._checkouts else 0.0,
+                "checkout_wait_max_seconds": self._wait_max,
+                "driver_age_max_seconds": max(ages) if ages else 0.0,
+                "driver_age_avg_seconds": sum(ages) / len(ages) if ages else 0.0,
+                "recycled": self._recycled,
+                "missing": self._missing,
+                "replaced": self._replaced,
+            }
+
+    def memory(self):
+        """RSS in Bytes je Driver des Pools (None, wo nicht ermittelbar)."""
+        with self._lock:
+            drivers = [pooled.driver for pooled in self._all]
+        return [driver_rss_bytes(driver) for driver in drivers]
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+        for pooled in drivers:
+            self._discard(pooled)
@@ -0,0 +1,239 @@
+# src/latest_readings.py
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from classification import LEVEL_NAMES
+from readings import to_readings
+
+# Antworten ab dieser Größe werden komprimiert, sofern der Client gzip annimmt
+_GZIP_MIN_BYTES = 1024
+
+
+def _record(reading, level):
+    station = reading.station
+    return {
+        "name": station.name,
+        "riverName": station.river,
+        "riverAreaName": station.river_area,
+        "valueCm": reading.value_cm,
+        "timestamp": reading.timestamp,
+        "measuredAt": reading.datetime.isoformat() if reading.timestamp is not None else None,
+        "level": LEVEL_NAMES[level],
+        "levelIndex": int(level),
+        "catchmentKm2": station.catchment_km2,
+    }
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ReadingsSnapshot:
+    """
+    Unveränderlicher Stand nach einem Abruf: Datensätze je Station, Indizes nach Fluss und
+    Flussgebiet sowie der fertig serialisierte (und komprimierte) Gesamtbestand mit ETag.
+    Leser greifen nur lesend darauf zu; ein neuer Abruf erzeugt einen neuen Snapshot.
+    """
+
+    def __init__(self, records, modified):
+        self.records = records
+        self.modified = modified
+        self.by_river = {}
+        self.by_area = {}
+        for name, record in records.items():
+            self.by_river.setdefault(record["riverName"], []).append(name)
+            self.by_area.setdefault(record["riverAreaName"], []).append(name)
+        self.last_modified = formatdate(modified, usegmt=True)
+        self.body = _encode({"lastModified": self.last_modified, "stations": list(records.values())})
+        self.body_gzip = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    def select(self, stations=None, rivers=None, areas=None, min_level=0):
+        """Datensätze nach Stationsnamen, Flüssen bzw. Flussgebieten und Mindeststufe."""
+        names = None
+        for wanted, index in ((rivers, self.by_river), (areas, self.by_area)):
+            if wanted:
+                matched = {name for key in wanted for name in index.get(key, ())}
+                names = matched if names is None else names & matched
+        if stations:
+            names = set(stations) if names is None else names & set(stations)
+        records = self.records.values() if names is None else (
+            self.records[name] for name in self.records if name in names)
+        return [record for record in records if record["levelIndex"] >= min_level]
+
+
+class LatestReadings:
+    """
+    Hält den zuletzt gemessenen Stand aller Stationen für die Lese-API. update() übernimmt die
+    bewerteten Stationen eines Abrufs (die Pipeline liefert nur Stationen mit neuer Messung)
+    und ersetzt den Snapshot in einem Schritt; Leser nehmen sich snapshot ohne Lock und
+    lösen nie einen Abruf aus.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._records = {}
+        self._lock = threading.Lock()
+        self.snapshot = ReadingsSnapshot({}, clock())
+
+    def update(self, data, levels):
+        """data: Readings (oder 7-teilige Tupel) eines Abrufs, levels: deren Warnstufen."""
+        if not len(data):
+            return
+        with self._lock:
+            records = dict(self._records)
+            for reading, level in zip(to_readings(data), levels):
+                records[reading.station.name] = _record(reading, level)
+            self._publish(records)
+
+    def mark_stale(self, stale_ages, station_names):
+        """
+        Kennzeichnet die Stationen eines Abrufs: Stationen aus stale_ages (Name -> Sekunden) wurden
+        nicht erreicht und tragen das Alter ihres Stands als staleSeconds, die übrigen aus
+        station_names verlieren die Kennzeichnung wieder.
+        """
+        with self._lock:
+            records = None
+            for name in station_names:
+                record = self._records.get(name)
+                if record is None:
+                    continue
+                age = stale_ages.get(name)
+                if age is None and "staleSeconds" not in record:
+                    continue
+                if records is None:
+                    records = dict(self._records)
+                record = dict(record)
+                if age is None:
+                    del record["staleSeconds"]
+                else:
+                    record["staleSeconds"] = int(age)
+                records[name] = record
+            if records is not None:
+                self._publish(records)
+
+    def remove(self, station_names):
+        # Aus der Konfiguration entfernte Stationen nicht weiter ausliefern
+        with self._lock:
+            removed = set(station_names)
+            if removed.isdisjoint(self._records):
+                return
+            records = {name: record for name, record in self._records.items() if name not in removed}
+            self._publish(records)
+
+    def _publish(self, records):
+        if records == self._records:
+            return
+        self._records = records
+        self.snapshot = ReadingsSnapshot(records, self.clock())
+
+
+def _not_modified(headers, snapshot):
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or snapshot.etag in tags or "W/" + snapshot.etag in tags
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return int(snapshot.modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _list_param(query, name):
+    # ?river=Nahe&river=Glan oder ?river=Nahe,Glan
+    return [part for value in query.get(name, ()) for part in value.split(",") if part]
+
+
+def start_http_server(latest, port, host="127.0.0.1"):
+    """
+    Stellt den Stand aus latest (LatestReadings) lesend bereit:
+
+    - GET /readings: alle Stationen (vorab serialisiert), Filter über station, river, area
+      (mehrfach oder kommagetrennt) und min_level (z. B. HW2)
+    - GET /readings/<station>: eine Station, 404 wenn unbekannt
+
+    Jede Antwort trägt ETag und Last-Modified des Snapshots; passende If-None-Match- bzw.
+    If-Modified-Since-Header werden mit 304 ohne Inhalt beantwortet. Liefert den Server;
+    shutdown() und server_close() beenden ihn.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            snapshot = latest.snapshot
+            parts = urlsplit(self.path)
+            path = parts.path.rstrip("/")
+            if path == "/readings":
+                station = None
+            elif path.startswith("/readings/"):
+                station = unquote(path[len("/readings/"):])
+            else:
+                self._send(404, _encode({"error": "unbekannter Pfad"}), snapshot)
+                return
+
+            if _not_modified(self.headers, snapshot):
+                self._send(304, b"", snapshot)
+                return
+
+            if station is not None:
+                record = snapshot.records.get(station)
+                if record is None:
+                    self._send(404, _encode({"error": f"unbekannte Station: {station}"}), snapshot)
+                else:
+                    self._send(200, _encode(record), snapshot)
+                return
+
+            query = parse_qs(parts.query)
+            stations = _list_param(query, "station")
+            rivers = _list_param(query, "river")
+            areas = _list_param(query, "area")
+            min_level = query.get("min_level", [None])[0]
+            if not (stations or rivers or areas or min_level):
+                self._send(200, snapshot.body, snapshot, snapshot.body_gzip)
+                return
+            if min_level is not None and min_level not in LEVEL_NAMES:
+                self._send(400, _encode({"error": f"unbekannte Stufe: {min_level}"}), snapshot)
+                return
+            records = snapshot.select(stations, rivers, areas,
+                                      LEVEL_NAMES.index(min_level) if min_level else 0)
+            self._send(200, _encode({"lastModified": snapshot.last_modified, "stations": records}), snapshot)
+
+        def _send(self, status, body, snapshot, body_gzip=None):
+            gzip_ok = "gzip" in (self.headers.get("Accept-Encoding") or "")
+            if status == 200 and gzip_ok and (body_gzip is not None or len(body) >= _GZIP_MIN_BYTES):
+                body = body_gzip if body_gzip is not None else gzip.compress(body, compresslevel=6, mtime=0)
+                encoding = "gzip"
+            else:
+                encoding = None
+            self.send_response(status)
+            if status in (200, 304):
+                self.send_header("ETag", snapshot.etag)
+                self.send_header("Last-Modified", snapshot.last_modified)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug("Lese-API: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="readings-http", daemon=True).start()
+    return server
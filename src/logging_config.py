@@ -1,31 +1,147 @@
 # src/logging_config.py
 import os
+import json
+import time
+import queue
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import threading
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 
-def setup_logging(log_dir="error_logging", log_file="service.log", level=logging.INFO):
+# Von setup_logging installierte Handler und Listener, damit ein erneuter Aufruf sie ersetzt
+# statt weitere hinzuzufügen
+_installed_handlers = []
+_listener = None
+# Vom Listener bediente Handler (Konsole, Datei), die nach dessen Ende geschlossen werden
+_listener_handlers = []
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lässt identische Meldungen (gleiche Stufe, gleicher Text) ab min_level höchstens einmal
+    pro interval_seconds durch. Die nächste durchgelassene Meldung nennt die Anzahl der
+    zwischenzeitlich unterdrückten Wiederholungen.
+    """
+
+    def __init__(self, interval_seconds=300, min_level=logging.WARNING, clock=time.monotonic):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self.min_level = min_level
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._last = {}
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        message = record.getMessage()
+        key = (record.levelno, message)
+        now = self.clock()
+        with self._lock:
+            state = self._last.get(key)
+            if state is not None and now - state[0] < self.interval_seconds:
+                state[1] += 1
+                return False
+            suppressed = state[1] if state is not None else 0
+            self._last[key] = [now, 0]
+            if len(self._last) > 10000:
+                # Alte Einträge verwerfen, damit wechselnde Texte den Speicher nicht füllen
+                cutoff = now - self.interval_seconds
+                self._last = {k: v for k, v in self._last.items() if v[0] >= cutoff}
+        if suppressed:
+            record.msg = f"{message} ({suppressed} gleiche Meldungen unterdrückt)"
+            record.args = None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Meldung; Felder aus extra={...} werden mit ausgegeben."""
+
+    _STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._STANDARD:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_dir="error_logging", log_file="service.log", level=logging.INFO, use_queue=False,
+                  json_lines=False, rate_limit_seconds=None, when="M", interval=10, backup_count=6):
+    """
+    Richtet Konsolen- und Datei-Logging ein.
+
+    - use_queue: Die Aufrufer legen Meldungen nur in eine Warteschlange (QueueHandler), Formatieren
+      und Schreiben übernimmt ein eigener Thread (QueueListener), sodass der Abruf nicht auf I/O wartet.
+    - json_lines: Die Datei wird im JSON-Lines-Format geschrieben (eine Meldung pro Zeile).
+    - rate_limit_seconds: Wiederholte gleiche Warnungen/Fehler höchstens einmal pro Intervall.
+    - when/interval/backup_count: Rotation der Logdatei (TimedRotatingFileHandler).
+
+    Ein erneuter Aufruf ersetzt die zuvor eingerichteten Handler.
+    """
+    global _listener
     # Erstelle den Log-Ordner, falls er nicht existiert
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
+
     log_path = os.path.join(log_dir, log_file)
-    
+
     logger = logging.getLogger()
     logger.setLevel(level)
-    
+    shutdown_logging()
+
     formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
-    
+
     # Konsolen-Handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # FileHandler: TimedRotatingFileHandler rotiert alle 10 Minuten
-    file_handler = TimedRotatingFileHandler(log_path, when="M", interval=10, backupCount=6, encoding="utf-8")
+
+    # FileHandler: TimedRotatingFileHandler rotiert standardmäßig alle 10 Minuten
+    file_handler = TimedRotatingFileHandler(log_path, when=when, interval=interval, backupCount=backup_count,
+                                            encoding="utf-8")
     file_handler.setLevel(level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+
+    handlers = [console_handler, file_handler]
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_handlers.extend(handlers)
+        handlers = [QueueHandler(log_queue)]
+
+    for handler in handlers:
+        if rate_limit_seconds:
+            # Vor der Warteschlange filtern, damit unterdrückte Meldungen gar nicht erst anfallen
+            handler.addFilter(RateLimitFilter(rate_limit_seconds))
+        logger.addHandler(handler)
+        _installed_handlers.append(handler)
+
     return logger
 
+
+def shutdown_logging():
+    """Entfernt die von setup_logging eingerichteten Handler; der Listener schreibt noch ausstehende Meldungen."""
+    global _listener
+    logger = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    while _listener_handlers:
+        _listener_handlers.pop().close()
+    while _installed_handlers:
+        handler = _installed_handlers.pop()
+        logger.removeHandler(handler)
+        handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,319 @@
+# src/metrics.py
+import time
+import logging
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Obergrenzen der Histogramm-Buckets in Sekunden (Stufen und ganze Zyklen)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+HELP = {
+    "water_stage_seconds": "Dauer einzelner Abruf- und Verarbeitungsstufen",
+    "water_cycle_duration_seconds": "Dauer eines Abrufzyklus vom Abruf bis zur Bewertung",
+    "water_cycles_total": "Abgeschlossene Abrufzyklen",
+    "water_rows_parsed_total": "Ausgelesene Zeilen der Pegelliste",
+    "water_parse_failures_total": "Zeilen, die nicht ausgelesen werden konnten",
+    "water_pages_visited_total": "Besuchte Seiten der Pegelliste",
+    "water_timeouts_total": "Zeitüberschreitungen beim Warten auf die Seite",
+    "water_deadline_exceeded_total": "Abrufe, die wegen ihrer Frist vorzeitig beendet wurden",
+    "water_driver_rss_bytes": "Speicherbedarf (RSS) je WebDriver inkl. Browser-Prozessen",
+    "water_driver_pool_idle": "Freie WebDriver im Pool",
+    "water_driver_pool_recycled_total": "Wegen Alter oder Speicher ersetzte WebDriver",
+    "water_driver_pool_replaced_total": "Wegen Session-Fehlern ersetzte WebDriver",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Zähler, Messwerte (Gauges) und Histogramme mit Labels; Ausgabe im Prometheus-Textformat."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_counter(self, name, value, **labels):
+        # Zähler, dessen Gesamtstand anderswo geführt wird (z. B. DriverPool.stats())
+        with self._lock:
+            self.counters[(name, _label_key(labels))] = value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, ([*h[0]], h[1], h[2])) for key, h in self.histograms.items())
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, key), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        for (name, key), value in gauges:
+            header(name, "gauge")
+            lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        for (name, key), (counts, total, count) in histograms:
+            header(name, "histogram")
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class CycleStats:
+    """Stufenzeiten und Zähler eines einzelnen Abrufzyklus (für die Zusammenfassung im Log)."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.stages = {}
+        self.counters = {}
+
+    def summary(self, duration):
+        stages = ", ".join(f"{stage} {seconds:.2f} s" for stage, seconds in self.stages.items())
+        counters = self.counters
+        return (
+            f"Zyklus: {duration:.2f} s ({stages or 'keine Stufen'}); "
+            f"{counters.get('water_rows_parsed_total', 0)} Zeilen, "
+            f"{counters.get('water_parse_failures_total', 0)} Fehler, "
+            f"{counters.get('water_pages_visited_total', 0)} Seiten, "
+            f"{counters.get('water_timeouts_total', 0)} Timeouts"
+        )
+
+
+# Ohne enable() bleibt _registry None: Alle Funktionen kehren dann sofort zurück,
+# timer() liefert einen gemeinsamen No-op-Kontextmanager.
+_registry = None
+_local = threading.local()
+
+
+def enable(registry=None):
+    global _registry
+    _registry = registry or MetricsRegistry()
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
+
+
+def enabled():
+    return _registry is not None
+
+
+def registry():
+    return _registry
+
+
+def _current_cycle():
+    return getattr(_local, "cycle", None)
+
+
+def inc(name, value=1, **labels):
+    if _registry is None:
+        return
+    _registry.inc(name, value, **labels)
+    cycle = _current_cycle()
+    if cycle is not None:
+        cycle.counters[name] = cycle.counters.get(name, 0) + value
+
+
+def set_counter(name, value, **labels):
+    if _registry is None:
+        return
+    _registry.set_counter(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    if _registry is None:
+        return
+    _registry.set_gauge(name, value, **labels)
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.monotonic() - self.start
+        registry = _registry
+        if registry is not None:
+            registry.observe("water_stage_seconds", elapsed, stage=self.stage)
+        cycle = _current_cycle()
+        if cycle is not None:
+            cycle.stages[self.stage] = cycle.stages.get(self.stage, 0.0) + elapsed
+        return False
+
+
+def timer(stage):
+    """Kontextmanager, der die Dauer einer Stufe misst (monotone Uhr)."""
+    if _registry is None:
+        return _NULL
+    return _StageTimer(stage)
+
+
+def timed(stage):
+    """Decorator-Variante von timer() für ganze Funktionen oder Methoden."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _registry is None:
+                return func(*args, **kwargs)
+            with _StageTimer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_cycle():
+    """Beginnt einen Zyklus; None, wenn die Instrumentierung ausgeschaltet ist."""
+    if _registry is None:
+        return None
+    return CycleStats()
+
+
+class _CycleBinding:
+    __slots__ = ("cycle", "previous")
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+
+    def __enter__(self):
+        self.previous = _current_cycle()
+        _local.cycle = self.cycle
+        return self.cycle
+
+    def __exit__(self, *exc):
+        _local.cycle = self.previous
+        return False
+
+
+def bind(cycle):
+    """
+    Ordnet Zeitmessungen und Zähler im aktuellen Thread dem Zyklus cycle zu. Die Stufen eines
+    Zyklus laufen im Dienstkern in verschiedenen Threads, daher wird pro Stufe gebunden.
+    """
+    if cycle is None:
+        return _NULL
+    return _CycleBinding(cycle)
+
+
+def finish_cycle(cycle):
+    """Erfasst die Zyklusdauer im Histogramm und schreibt eine Zusammenfassung ins Log."""
+    if cycle is None or _registry is None:
+        return
+    duration = cycle.clock() - cycle.started
+    _registry.observe("water_cycle_duration_seconds", duration)
+    _registry.inc("water_cycles_total")
+    logging.info(cycle.summary(duration))
+
+
+def record_driver_pool(pool):
+    """
+    Übernimmt Pool-Kennzahlen: freie Driver und Speicherbedarf je Driver als Gauges, die
+    Gesamtzahl ersetzter Driver als Zähler.
+    """
+    if _registry is None:
+        return
+    stats = pool.stats()
+    set_gauge("water_driver_pool_idle", stats["idle"])
+    set_counter("water_driver_pool_recycled_total", stats["recycled"])
+    set_counter("water_driver_pool_replaced_total", stats["replaced"])
+    for index, rss in enumerate(pool.memory()):
+        if rss is not None:
+            set_gauge("water_driver_rss_bytes", rss, driver=index)
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """
+    Stellt die Kennzahlen unter http://host:port/metrics im Prometheus-Textformat bereit.
+    Liefert den Server; shutdown() und server_close() beenden ihn.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = (_registry.render() if _registry is not None else "").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,288 @@
+# src/pipeline.py
+import time
+import logging
+import metrics
+from deadline import Deadline
+from retriever import as_retriever
+from readings import timestamp_of, value_of
+from classification import LEVEL_HW2, LEVEL_HW100, LEVEL_NAMES, THRESHOLD_KEYS, ThresholdClassifier
+from trend import TrendEngine
+from change_detection import ChangeDetector
+from alerts import Alert
+
+
+class StationPipeline:
+    """
+    Die Verarbeitungsschritte eines Abrufs, einzeln aufrufbar, damit sie sowohl nacheinander
+    (process) als auch als getrennte Stufen des asynchronen Dienstkerns laufen können:
+    fetch -> select (Änderungserkennung) -> parse -> evaluate -> persist.
+
+    Hält den Zustand, der über Abrufe hinweg bestehen bleibt: Klassifikator (Hysterese),
+    Index der zuletzt gesehenen Messungen und der letzte erfolgreich abgerufene Stand je Station.
+    """
+
+    def __init__(self, store=None, scheduler=None, alerts=None, clock=time.time):
+        self.store = store
+        self.scheduler = scheduler
+        # alerts.AlertDispatcher: Warnungen eines Abrufs werden dort gesammelt eingereiht
+        self.alerts = alerts
+        self.classifier = None
+        self.change_detector = ChangeDetector()
+        # Stationen, die nach einer Konfigurationsänderung einmal neu bewertet werden müssen
+        self._reevaluate = set()
+        # Warnstufen des letzten evaluate-Aufrufs (nachher/vorher), z. B. für Abonnements
+        self.levels = None
+        self.previous_levels = None
+        # Anstieg je Station; slopes (cm/h) und eta (Sekunden bis zu jeder Schwelle,
+        # Zeilen x THRESHOLD_KEYS) beziehen sich ebenfalls auf den letzten evaluate-Aufruf
+        self.trend = TrendEngine()
+        self.slopes = None
+        self.eta = None
+        # Station -> Schwelle, auf die sie laut Trend zusteigt (nur einmal melden)
+        self._approaching = {}
+        # Letzter erfolgreich abgerufener Stand: Station -> (Reading, Abrufzeit); stale_ages nennt
+        # die im letzten fetch daraus ergänzten Stationen mit dem Alter ihres Stands in Sekunden
+        self.clock = clock
+        self.last_good = {}
+        self.stale_ages = {}
+
+    def get_classifier(self, config_threshold_map, hysteresis_cm=5):
+        # Wird bei jedem neuen config_threshold_map aktualisiert, die Hysterese-Zustände
+        # der Stationen bleiben dabei erhalten.
+        if self.classifier is None:
+            self.classifier = ThresholdClassifier(config_threshold_map, hysteresis_cm)
+        elif self.classifier.threshold_map is not config_threshold_map:
+            if self.classifier.threshold_map == config_threshold_map:
+                # Neu geladen, aber inhaltlich gleich: kein Neuaufbau nötig
+                self.classifier.threshold_map = config_threshold_map
+            else:
+                self.classifier.update_thresholds(config_threshold_map)
+        self.classifier.hysteresis_cm = hysteresis_cm
+        return self.classifier
+
+    def apply_config_diff(self, diff, config_threshold_map):
+        """
+        Übernimmt eine neu geladene Konfiguration anhand ihres Diffs: Der Klassifikator wird
+        gepatcht statt neu aufgebaut, und nur neue oder geänderte Stationen werden im nächsten
+        Abruf unabhängig von der Änderungserkennung neu bewertet.
+        """
+        if self.classifier is not None:
+            self.classifier.apply_diff(diff, config_threshold_map)
+        self._reevaluate.update(diff.added)
+        self._reevaluate.update(diff.changed)
+        self._reevaluate.difference_update(diff.removed)
+        for station_name in diff.removed:
+            self.change_detector.forget(station_name)
+
+    @metrics.timed("fetch")
+    def fetch(self, config, retriever, stations=None, deadline=None):
+        """
+        Ruft die Stationen innerhalb einer Frist ab (deadline bzw. cycle_deadline_seconds,
+        standardmäßig poll_interval_seconds). Endet der Abruf wegen der Frist vorzeitig, werden
+        die nicht erreichten Stationen aus dem letzten erfolgreich abgerufenen Stand ergänzt;
+        ihr Alter steht danach in stale_ages.
+        """
+        return [entry for page in self.fetch_pages(config, retriever, stations, deadline) for entry in page]
+
+    def fetch_pages(self, config, retriever, stations=None, deadline=None):
+        """
+        Wie fetch, aber als Generator: liefert die Einträge Seite für Seite, sobald der Retriever
+        sie gelesen hat, die aus dem letzten Stand ergänzten Stationen zuletzt als eigene Seite.
+        """
+        general_config = config.get("general_config", {})
+        selected_stations = general_config.get("selected_stations", None)
+        if stations is not None:
+            selected_stations = stations
+        if deadline is None:
+            deadline = Deadline(general_config.get("cycle_deadline_seconds",
+                                                   general_config.get("poll_interval_seconds", 300)))
+        last_good = self.last_good
+        reached = set()
+        self.stale_ages = {}
+        try:
+            for page in as_retriever(retriever).iter_water_data(
+                    general_config.get("data_url"), filter_names=selected_stations, deadline=deadline):
+                fetched_at = self.clock()
+                for entry in page:
+                    last_good[entry[0]] = (entry, fetched_at)
+                    reached.add(entry[0])
+                yield page
+        except OSError as e:
+            # Z. B. das durch die Frist begrenzte Socket-Timeout des HTTP-Backends: wie ein
+            # vorzeitiges Ende behandeln und unten aus dem letzten Stand ergänzen
+            if not deadline.expired():
+                raise
+            metrics.inc("water_deadline_exceeded_total")
+            logging.warning("Abruf nach Ablauf der Frist abgebrochen: %s", e)
+        pool = getattr(retriever, "pool", None)
+        if pool is not None:
+            logging.debug("WebDriver-Pool: %s", pool.stats())
+            metrics.record_driver_pool(pool)
+        if deadline.expired():
+            fallback = self._fill_from_last_good(selected_stations, reached, self.clock())
+            if fallback:
+                yield fallback
+
+    def _fill_from_last_good(self, selected_stations, reached, now):
+        last_good = self.last_good
+        wanted = selected_stations if selected_stations else list(last_good)
+        missing = [name for name in wanted if name not in reached and name in last_good]
+        if not missing:
+            return []
+        fallback = []
+        for name in missing:
+            entry, fetched_at = last_good[name]
+            fallback.append(entry)
+            self.stale_ages[name] = now - fetched_at
+        logging.warning("Abruf unvollständig: %d Station(en) aus dem letzten Stand ergänzt (ältester vor %.0f s).",
+                        len(missing), max(self.stale_ages.values()))
+        return fallback
+
+    @metrics.timed("select")
+    def select(self, config, config_threshold_map, data, log_summary=True):
+        """
+        Nur Stationen mit neuer Messung weiterverarbeiten. Nach einer über apply_config_diff
+        übernommenen Änderung kommen die betroffenen Stationen hinzu; wurde das Mapping ohne Diff
+        ausgetauscht und unterscheidet es sich, werden alle Stationen einmal neu bewertet.
+
+        Bei seitenweisem Abruf wird select je Seite mit log_summary=False aufgerufen; die Zähler
+        der Seiten (change_detector.counters) summiert der Aufrufer und übergibt sie am Ende
+        log_fetch_summary().
+        """
+        detector = self.change_detector
+        detector.stale_after_seconds = config.get("general_config", {}).get("stale_after_seconds", 3600)
+        delta = detector.update(data)
+        thresholds_changed = self.classifier is None or (
+            self.classifier.threshold_map is not config_threshold_map
+            and self.classifier.threshold_map != config_threshold_map
+        )
+        if log_summary:
+            self.log_fetch_summary(detector.counters)
+        for station_name in delta.stale:
+            logging.warning(f"Station {station_name} liefert seit über {detector.stale_after_seconds} Sekunden keinen neuen Messwert.")
+        if thresholds_changed:
+            self._reevaluate.clear()
+            return data
+        selected = delta.new + delta.changed
+        if self._reevaluate:
+            selected_names = {entry[0] for entry in selected}
+            for entry in data:
+                if entry[0] in self._reevaluate:
+                    self._reevaluate.discard(entry[0])
+                    if entry[0] not in selected_names:
+                        selected.append(entry)
+        return selected
+
+    def log_fetch_summary(self, counters):
+        logging.info(
+            "Abruf: %(total)s Stationen, %(new)s neu, %(changed)s geändert, %(unchanged)s unverändert, %(stale)s veraltet",
+            counters,
+        )
+
+    @metrics.timed("parse")
+    def parse(self, data):
+        # Readings bringen Name und Wert bereits ausgewertet mit, Tupel werden hier geparst
+        return [entry[0] for entry in data], [value_of(entry) for entry in data]
+
+    @metrics.timed("evaluate")
+    def evaluate(self, config, config_threshold_map, data, station_names, values):
+        """
+        Stuft alle Stationen in einem Durchlauf ein (MW, HW2, HW20, HW50, HW100) und liefert die
+        zu speichernden Messwerte [(name, ts, value_cm), ...]. Eine Zeile pro Station wird nur
+        bei einem Stufenwechsel geschrieben, dazu eine Zusammenfassung pro Abruf.
+
+        Zusätzlich wird der Anstieg je Station fortgeschrieben: Erreicht eine Station laut Trend
+        die nächste Warnschwelle (ab HW2) innerhalb von trend_horizon_hours, wird das einmal gemeldet.
+
+        Mit alerts werden Erreichen und Verlassen des Warnbereichs (ab HW2) sowie die Trendwarnungen
+        am Ende als ein Stapel an den AlertDispatcher übergeben, der sie ohne zu blockieren einreiht.
+        """
+        general_config = config.get("general_config", {})
+        hysteresis_cm = general_config.get("hysteresis_cm", 5)
+        horizon = general_config.get("trend_horizon_hours", 3) * 3600
+        classifier = self.get_classifier(config_threshold_map, hysteresis_cm)
+        indices = classifier.indices(station_names)
+        previous = classifier.levels_of(indices)
+        levels = classifier.classify(station_names, values, indices)
+        self.levels, self.previous_levels = levels, previous
+
+        timestamps = [timestamp_of(entry) for entry in data]
+        rows = self.trend.update(station_names, timestamps, values)
+        self.slopes = self.trend.slopes(rows)
+        self.eta = self.trend.time_to_thresholds(rows, classifier.limits_of(indices))
+
+        readings = []
+        changes = 0
+        critical = []
+        elevated = 0
+        alerts = []
+        for i, (station_name, current_value, level, previous_level) in enumerate(zip(station_names, values, levels, previous)):
+            if current_value is not None:
+                if level >= LEVEL_HW100:
+                    critical.append(station_name)
+                if level >= LEVEL_HW2:
+                    elevated += 1
+                if level != previous_level:
+                    changes += 1
+                    if level > previous_level and level >= LEVEL_HW100:
+                        logging.warning(f"WARNUNG: Station {station_name} überschreitet kritischen Wert: {current_value} cm")
+                    elif level > previous_level and level >= LEVEL_HW2:
+                        logging.warning(f"WARNUNG: Station {station_name} hat {LEVEL_NAMES[level]} erreicht: {current_value} cm")
+                    else:
+                        logging.info(f"Station {station_name}: {LEVEL_NAMES[previous_level]} -> {LEVEL_NAMES[level]} ({current_value} cm)")
+                    if max(level, previous_level) >= LEVEL_HW2:
+                        alerts.append(Alert(station_name, "level", int(level), int(previous_level),
+                                            current_value, timestamps[i], None))
+                target = self._check_approach(station_name, current_value, level, self.slopes[i], self.eta[i], horizon)
+                if target is not None:
+                    # target ist ein Index in THRESHOLD_KEYS, Alert.level eine Stufe aus LEVEL_NAMES
+                    alerts.append(Alert(station_name, "trend", target + 1, int(level), current_value,
+                                        timestamps[i], float(self.eta[i][target])))
+                readings.append((station_name, timestamps[i], current_value))
+            if self.scheduler is not None:
+                self.scheduler.observe(station_name, current_value, level, config_threshold_map.get(station_name))
+        logging.info(
+            "Bewertung: %d Stationen, %d Stufenwechsel, %d ab HW2, %d ab HW100%s, %d steigen auf eine Warnschwelle zu",
+            len(station_names), changes, elevated, len(critical),
+            f" ({', '.join(critical)})" if critical else "", len(self._approaching),
+        )
+        if alerts and self.alerts is not None:
+            self.alerts.publish(alerts)
+        return readings
+
+    def _check_approach(self, station_name, current_value, level, slope, eta, horizon):
+        # Nächste Warnschwelle oberhalb der aktuellen Stufe (mindestens HW2); liefert sie zurück,
+        # wenn sie neu gemeldet wurde
+        target = max(int(level), LEVEL_HW2 - 1)
+        if target < len(THRESHOLD_KEYS) and 0 < eta[target] <= horizon:
+            if self._approaching.get(station_name) != target:
+                self._approaching[station_name] = target
+                logging.warning(
+                    f"WARNUNG: Station {station_name} steigt um {slope:.0f} cm/h, {THRESHOLD_KEYS[target]} "
+                    f"voraussichtlich in {eta[target] / 60:.0f} min ({current_value} cm)"
+                )
+                return target
+        else:
+            self._approaching.pop(station_name, None)
+        return None
+
+    @metrics.timed("persist")
+    def persist(self, readings):
+        # Alle Werte des Abrufs in einer Transaktion speichern (unveränderte xLast werden übersprungen)
+        if self.store is None:
+            return
+        try:
+            self.store.append_cycle(readings)
+        except Exception as e:
+            logging.error("Fehler beim Speichern der Messwerte: %s", e)
+
+    def process(self, config, config_threshold_map, retriever, stations=None, deadline=None):
+        cycle = metrics.start_cycle()
+        with metrics.bind(cycle):
+            data = self.fetch(config, retriever, stations, deadline)
+            data = self.select(config, config_threshold_map, data)
+            station_names, values = self.parse(data)
+            readings = self.evaluate(config, config_threshold_map, data, station_names, values)
+            self.persist(readings)
+        metrics.finish_cycle(cycle)
+        return readings
@@ -0,0 +1,171 @@
+# src/reading_store.py
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+try:
+    from zoneinfo import ZoneInfo
+    _BERLIN = ZoneInfo("Europe/Berlin")
+except Exception:
+    # Ohne tz-Datenbank (z. B. Windows ohne tzdata) wird die lokale Zeit des Rechners verwendet
+    _BERLIN = None
+
+_TIMESTAMP_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y, %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%y %H:%M")
+
+
+def parse_x_last(x_last):
+    """
+    Wandelt den Zeitstempel der Pegelliste (z. B. "18.10.2026 14:15" oder "18.10.2026, 14:15 Uhr")
+    in Unix-Sekunden um. Liefert None, wenn der Text nicht interpretiert werden kann.
+    """
+    text = (x_last or "").replace("Uhr", "").strip()
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if _BERLIN is not None:
+            return int(parsed.replace(tzinfo=_BERLIN).timestamp())
+        return int(time.mktime(parsed.timetuple()))
+    return None
+
+
+class ReadingStore:
+    """
+    Eingebettete Zeitreihen-Ablage (SQLite im WAL-Modus) für (Station, Zeitstempel, Wert in cm).
+
+    - Stationsnamen werden auf kleine Integer-IDs abgebildet, die Messwerte liegen in einer
+      WITHOUT-ROWID-Tabelle mit Primärschlüssel (station_id, ts) und damit nach Station und Zeit sortiert.
+    - append_cycle schreibt alle Werte eines Abrufs in einer Transaktion; ein unveränderter
+      Zeitstempel (xLast) wird dabei nicht erneut gespeichert.
+    - retention_days begrenzt den Plattenbedarf: ältere Werte werden einmal täglich gelöscht
+      und der freie Platz per incremental_vacuum zurückgegeben.
+    """
+
+    def __init__(self, path, retention_days=None, clock=time.time):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.retention_days = retention_days
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # auto_vacuum muss vor dem Anlegen der ersten Tabelle gesetzt werden
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stations (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            "station_id INTEGER NOT NULL, ts INTEGER NOT NULL, value_cm INTEGER, "
+            "PRIMARY KEY (station_id, ts)) WITHOUT ROWID"
+        )
+        self._station_ids = dict((name, sid) for sid, name in self._conn.execute("SELECT id, name FROM stations"))
+        # Letzter gespeicherter Zeitstempel je Station, erspart Inserts für unveränderte Werte
+        self._last_ts = dict(self._conn.execute("SELECT station_id, MAX(ts) FROM readings GROUP BY station_id"))
+        self._last_prune = 0
+
+    def _station_id(self, name):
+        sid = self._station_ids.get(name)
+        if sid is None:
+            self._conn.execute("INSERT OR IGNORE INTO stations (name) VALUES (?)", (name,))
+            sid = self._conn.execute("SELECT id FROM stations WHERE name = ?", (name,)).fetchone()[0]
+            self._station_ids[name] = sid
+        return sid
+
+    def append_cycle(self, readings):
+        """
+        Speichert alle Messwerte eines Abrufs in einer Transaktion.
+        readings: Iterable von (station_name, ts, value_cm) mit ts in Unix-Sekunden.
+        Liefert die Anzahl neu gespeicherter Werte.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = []
+                for name, ts, value_cm in readings:
+                    if ts is None:
+                        continue
+                    sid = self._station_id(name)
+                    if self._last_ts.get(sid) == ts:
+                        continue
+                    rows.append((sid, ts, value_cm))
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO readings (station_id, ts, value_cm) VALUES (?, ?, ?)", rows
+                )
+                inserted = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # Im Rollback verworfene Stations-IDs nicht weiterverwenden
+                self._station_ids = dict((name, sid) for sid, name in self._conn.execute("SELECT id, name FROM stations"))
+                raise
+            for sid, ts, _ in rows:
+                if ts > self._last_ts.get(sid, 0):
+                    self._last_ts[sid] = ts
+        self._maybe_prune()
+        return inserted
+
+    def range(self, station, start=None, end=None):
+        """Liefert [(ts, value_cm), ...] einer Station im Intervall [start, end], aufsteigend sortiert."""
+        sid = self._station_ids.get(station)
+        if sid is None:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ts, value_cm FROM readings WHERE station_id = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (sid, start if start is not None else 0, end if end is not None else 2 ** 62),
+            ).fetchall()
+
+    def downsample(self, station, bucket_seconds, start=None, end=None):
+        """
+        Fasst die Werte einer Station in Zeitfenstern von bucket_seconds zusammen.
+        Liefert [(bucket_start, avg, min, max, count), ...].
+        """
+        sid = self._station_ids.get(station)
+        if sid is None:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT (ts / ?) * ? AS bucket, AVG(value_cm), MIN(value_cm), MAX(value_cm), COUNT(*) "
+                "FROM readings WHERE station_id = ? AND ts >= ? AND ts <= ? GROUP BY bucket ORDER BY bucket",
+                (bucket_seconds, bucket_seconds, sid,
+                 start if start is not None else 0, end if end is not None else 2 ** 62),
+            ).fetchall()
+
+    def prune(self, older_than):
+        """Löscht alle Werte mit ts < older_than und gibt den Platz an das Dateisystem zurück."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM readings WHERE ts < ?", (older_than,)).rowcount
+            self._conn.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    def _maybe_prune(self):
+        if not self.retention_days:
+            return
+        now = self.clock()
+        if now - self._last_prune < 24 * 3600:
+            return
+        self._last_prune = now
+        deleted = self.prune(now - self.retention_days * 24 * 3600)
+        if deleted:
+            logging.info("Zeitreihen-Ablage: %s Werte älter als %s Tage gelöscht.", deleted, self.retention_days)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_reading_store(general_config):
+    """Öffnet die Ablage aus general_config["store_path"]; ohne Pfad wird nichts gespeichert (None)."""
+    path = (general_config or {}).get("store_path")
+    if not path:
+        return None
+    return ReadingStore(path, retention_days=general_config.get("store_retention_days", 730))
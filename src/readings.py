@@ -0,0 +1,217 @@
+# src/readings.py
+import sys
+import time
+import weakref
+import functools
+from datetime import datetime
+from reading_store import parse_x_last, _BERLIN
+
+# Reihenfolge der Felder im bisherigen 7-teiligen Tupel
+TUPLE_FIELDS = ("name", "riverName", "riverAreaName", "yLast", "xLast", "catchmentArea", "href")
+
+
+def _format_number_de(value):
+    # 1088.17 -> "1.088,17"
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def parse_value_cm(y_last):
+    # "143 cm" -> 143, "1.204 cm" -> 1204 (Tausenderpunkt), None wenn kein Messwert vorliegt
+    try:
+        return int(y_last.replace(" cm", "").strip().replace(".", ""))
+    except Exception:
+        return None
+
+
+def parse_catchment_km2(catchment_area):
+    # "1.088,17 km²" -> 1088.17, None wenn leer oder nicht lesbar
+    try:
+        return float(catchment_area.replace("km²", "").strip().replace(".", "").replace(",", "."))
+    except Exception:
+        return None
+
+
+def format_value_cm(value_cm):
+    return "" if value_cm is None else f"{value_cm} cm"
+
+
+@functools.lru_cache(maxsize=1024)
+def format_timestamp(timestamp):
+    # Unix-Sekunden -> "18.10.2026 14:15" (Ortszeit Europe/Berlin wie auf der Pegelliste)
+    if timestamp is None:
+        return ""
+    if _BERLIN is not None:
+        return datetime.fromtimestamp(timestamp, _BERLIN).strftime("%d.%m.%Y %H:%M")
+    return time.strftime("%d.%m.%Y %H:%M", time.localtime(timestamp))
+
+
+class Station:
+    """
+    Stammdaten einer Station aus der Pegelliste. Wird von allen Messwerten der Station geteilt
+    und über intern_station wiederverwendet, solange noch ein Messwert darauf verweist.
+    name, river und river_area sind internierte Strings (name dient als Stations-ID).
+    """
+
+    __slots__ = ("name", "river", "river_area", "catchment_km2", "catchment_text", "href", "__weakref__")
+
+    def __init__(self, name, river, river_area, catchment_km2, catchment_text, href):
+        self.name = name
+        self.river = river
+        self.river_area = river_area
+        self.catchment_km2 = catchment_km2
+        self.catchment_text = catchment_text
+        self.href = href
+
+    def __repr__(self):
+        return f"Station({self.name!r}, river={self.river!r}, catchment_km2={self.catchment_km2!r})"
+
+
+_stations = weakref.WeakValueDictionary()
+
+
+def _intern(text):
+    return sys.intern(text) if type(text) is str else text
+
+
+def intern_station(name, river, river_area, catchment_area, href):
+    """
+    Liefert die gemeinsame Station zu diesen Stammdaten. catchment_area ist der Text der
+    Tabelle ("1.088,17 km²") oder eine Zahl aus der JSON-Schnittstelle; geparst wird nur beim
+    ersten Auftreten.
+    """
+    key = (name, river, river_area, catchment_area, href)
+    station = _stations.get(key)
+    if station is not None:
+        return station
+    if isinstance(catchment_area, (int, float)):
+        catchment_km2 = float(catchment_area)
+        catchment_text = f"{_format_number_de(catchment_area)} km²"
+    else:
+        catchment_km2 = parse_catchment_km2(catchment_area or "")
+        catchment_text = catchment_area
+    station = Station(_intern(name), _intern(river), _intern(river_area), catchment_km2, catchment_text, href)
+    _stations[key] = station
+    return station
+
+
+class Reading:
+    """
+    Ein Messwert der Pegelliste: Station, Wert in cm (int, None ohne Messwert) und Zeitpunkt
+    der Messung in Unix-Sekunden (None, wenn nicht lesbar).
+
+    Verhält sich zusätzlich wie das bisherige 7-teilige Tupel
+    (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href): Indexzugriff, Entpacken
+    und Vergleich mit Tupeln funktionieren weiter. yLast und xLast werden dabei aus den Werten
+    erzeugt; nur wenn der Originaltext davon abweicht (z. B. "-- cm"), wird er in raw mitgeführt.
+    """
+
+    __slots__ = ("station", "value_cm", "timestamp", "raw")
+
+    def __init__(self, station, value_cm, timestamp, raw=None):
+        self.station = station
+        self.value_cm = value_cm
+        self.timestamp = timestamp
+        self.raw = raw
+
+    @property
+    def name(self):
+        return self.station.name
+
+    @property
+    def datetime(self):
+        # Zeitzonenbewusster Zeitpunkt der Messung
+        if self.timestamp is None:
+            return None
+        return datetime.fromtimestamp(self.timestamp, _BERLIN) if _BERLIN is not None else datetime.fromtimestamp(self.timestamp).astimezone()
+
+    @property
+    def y_last(self):
+        return self.raw[0] if self.raw is not None else format_value_cm(self.value_cm)
+
+    @property
+    def x_last(self):
+        return self.raw[1] if self.raw is not None else format_timestamp(self.timestamp)
+
+    def as_tuple(self):
+        station = self.station
+        return (station.name, station.river, station.river_area, self.y_last, self.x_last,
+                station.catchment_text, station.href)
+
+    def __len__(self):
+        return len(TUPLE_FIELDS)
+
+    def __getitem__(self, index):
+        if index == 0:
+            return self.station.name
+        return self.as_tuple()[index]
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __eq__(self, other):
+        if isinstance(other, (Reading, tuple)):
+            return self.as_tuple() == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"Reading({self.station.name!r}, value_cm={self.value_cm!r}, timestamp={self.timestamp!r})"
+
+
+class ReadingBuilder:
+    """
+    Erzeugt Readings für einen Abruf. Zeitstempel und Messwerttexte wiederholen sich innerhalb
+    eines Abrufs stark (alle Stationen melden zum selben Viertelstundentakt), daher wird jeder
+    unterschiedliche Text nur einmal ausgewertet; gleiche Zeitstempel teilen sich ein int-Objekt.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._timestamps = {}
+
+    def _value(self, y_last):
+        parsed = self._values.get(y_last)
+        if parsed is None:
+            if isinstance(y_last, (int, float)):
+                value = int(round(y_last))
+                parsed = (value, True)
+            else:
+                value = parse_value_cm(y_last or "")
+                parsed = (value, format_value_cm(value) == (y_last or ""))
+            self._values[y_last] = parsed
+        return parsed
+
+    def _timestamp(self, x_last):
+        parsed = self._timestamps.get(x_last)
+        if parsed is None:
+            timestamp = parse_x_last(x_last)
+            parsed = (timestamp, format_timestamp(timestamp) == (x_last or ""))
+            self._timestamps[x_last] = parsed
+        return parsed
+
+    def build(self, name, river, river_area, y_last, x_last, catchment_area, href):
+        """y_last und catchment_area dürfen Texte der Tabelle oder Zahlen (JSON) sein."""
+        value_cm, value_exact = self._value(y_last)
+        timestamp, timestamp_exact = self._timestamp(x_last)
+        raw = None
+        if not (value_exact and timestamp_exact):
+            raw = (y_last if isinstance(y_last, str) else format_value_cm(value_cm), x_last or "")
+        return Reading(intern_station(name, river, river_area, catchment_area, href), value_cm, timestamp, raw)
+
+
+def to_readings(entries):
+    """Wandelt 7-teilige Tupel in Readings um; vorhandene Readings werden übernommen."""
+    builder = ReadingBuilder()
+    return [entry if type(entry) is Reading else builder.build(*entry) for entry in entries]
+
+
+def value_of(entry):
+    # Messwert in cm eines Readings oder eines 7-teiligen Tupels
+    return entry.value_cm if type(entry) is Reading else parse_value_cm(entry[3])
+
+
+def timestamp_of(entry):
+    # Zeitpunkt der Messung (Unix-Sekunden) eines Readings oder eines 7-teiligen Tupels
+    return entry.timestamp if type(entry) is Reading else parse_x_last(entry[4])
@@ -0,0 +1,307 @@
+# src/retriever.py
+import gzip
+import json
+import logging
+import threading
+import http.client
+from abc import ABC, abstractmethod
+from urllib.parse import urljoin, urlsplit
+from data_retriever import (
+    get_all_water_data,
+    get_station_thresholds,
+    iter_water_pages,
+    parse_water_rows,
+    parse_station_thresholds,
+    station_detail_url,
+    thresholds_from_rows,
+)
+from readings import ReadingBuilder
+from deadline import NO_DEADLINE
+
+
+class Retriever(ABC):
+    """
+    Gemeinsame Schnittstelle für alle Abruf-Backends.
+    get_all_water_data liefert Readings (readings.Reading), die sich auch wie die 7-teiligen
+    Tupel (name, riverName, riverAreaName, yLast, xLast, catchmentArea, href) verhalten,
+    get_station_thresholds ein Dictionary wie {"HW100": 143, ...}.
+    deadline (deadline.Deadline) begrenzt den Abruf; bei Ablauf wird das bis dahin Gelesene geliefert.
+    iter_water_data liefert dieselben Readings seitenweise, sobald eine Seite gelesen ist.
+    Ein Backend ohne get_all_water_data oder get_station_thresholds lässt sich nicht erzeugen.
+    """
+
+    @abstractmethod
+    def get_all_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        raise NotImplementedError
+
+    def iter_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        # Backends ohne Seiten liefern alles als eine Seite
+        yield self.get_all_water_data(url, filter_names, deadline=deadline)
+
+    @abstractmethod
+    def get_station_thresholds(self, station_href):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SeleniumRetriever(Retriever):
+    """
+    Abruf über einen (headless) Chrome-WebDriver. Entweder mit einem festen driver oder
+    mit einem DriverPool (driver_manager), aus dem für jeden Abruf ein Driver entliehen wird.
+    """
+
+    def __init__(self, driver=None, owns_driver=True, pool=None):
+        self.driver = driver
+        self.owns_driver = owns_driver
+        self.pool = pool
+
+    def _run(self, func):
+        if self.pool is not None:
+            return self.pool.run(func)
+        return func(self.driver)
+
+    def get_all_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        return self._run(lambda driver: get_all_water_data(driver, url, filter_names, deadline=deadline))
+
+    def iter_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        # Der Driver bleibt entliehen, bis der Generator erschöpft oder geschlossen ist
+        if self.pool is None:
+            yield from iter_water_pages(self.driver, url, filter_names, deadline=deadline)
+            return
+        with self.pool.driver() as driver:
+            yield from iter_water_pages(driver, url, filter_names, deadline=deadline)
+
+    def get_station_thresholds(self, station_href):
+        return self._run(lambda driver: get_station_thresholds(driver, station_href))
+
+    def close(self):
+        if not self.owns_driver:
+            return
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+class HttpSession:
+    """
+    Hält pro Host eine begrenzte Anzahl Keep-Alive-Verbindungen vor und fordert
+    komprimierte Antworten an. Kann von mehreren Threads gleichzeitig genutzt werden.
+    """
+
+    def __init__(self, timeout=15, max_idle_per_host=4, user_agent="service_for_water_levels"):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.user_agent = user_agent
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _checkin(self, scheme, netloc, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url, timeout=None):
+        """
+        Liefert (Content-Type, Body als bytes) oder wirft eine Exception bei HTTP-Fehlern.
+        timeout ersetzt für diese Anfrage den Timeout der Session (z. B. Rest einer Frist).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+            "User-Agent": self.user_agent,
+        }
+        while True:
+            conn, reused = self._checkout(parts.scheme, parts.netloc)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # Eine wiederverwendete Verbindung kann serverseitig bereits geschlossen sein
+                if reused:
+                    continue
+                raise
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(parts.scheme, parts.netloc, conn)
+
+        if response.status >= 400:
+            raise Exception(f"HTTP {response.status} beim Abruf von {url}")
+        if (response.getheader("Content-Encoding") or "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return response.getheader("Content-Type") or "", body
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+def _json_rows(payload):
+    if isinstance(payload, dict):
+        for key in ("data", "rows", "items", "stations"):
+            if isinstance(payload.get(key), list):
+                return payload[key]
+        return []
+    return payload
+
+
+def _json_row_to_reading(row, base_url, builder):
+    """
+    Wandelt einen Datensatz der JSON-Schnittstelle in ein Reading um. Die Feldnamen
+    entsprechen den data-field-Attributen der Pegelliste; Zahlen werden direkt übernommen,
+    als Tupel gelesen erscheinen sie so, wie sie in der Tabelle angezeigt werden.
+    """
+    href = row.get("href")
+    if href:
+        href = urljoin(base_url, href)
+    return builder.build(
+        row.get("name", ""),
+        row.get("riverName", ""),
+        row.get("riverAreaName", ""),
+        row.get("yLast", ""),
+        row.get("xLast", ""),
+        row.get("catchmentArea", ""),
+        href,
+    )
+
+
+def _json_threshold_rows(payload):
+    # Unterstützt {"waterThresholds": {"HW 100": 143, ...}}, {"HW 100": 143, ...}
+    # und [{"name": "HW 100", "value": 143}, ...]
+    if isinstance(payload, dict):
+        payload = payload.get("waterThresholds", payload)
+        return [(str(key).strip(), str(value).strip()) for key, value in payload.items()]
+    return [(str(item.get("name", "")).strip(), str(item.get("value", "")).strip()) for item in payload]
+
+
+class HttpRetriever(Retriever):
+    """
+    Abruf ohne Browser über einfache HTTP-Anfragen. Antworten werden je nach Content-Type
+    als JSON oder als HTML (mit den Parsern aus data_retriever) ausgewertet.
+    api_url ersetzt optional die URL der Pegelliste, z. B. durch den JSON-Endpunkt des Frontends.
+    """
+
+    page_size = 500
+
+    def __init__(self, api_url=None, timeout=15, session=None):
+        self.api_url = api_url
+        self.session = session or HttpSession(timeout=timeout)
+
+    def _get(self, url, timeout=None):
+        content_type, body = self.session.get(url, timeout)
+        text = body.decode("utf-8")
+        if "json" in content_type:
+            return json.loads(text), True
+        return text, False
+
+    def get_all_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        return [reading for page in self.iter_water_data(url, filter_names, deadline) for reading in page]
+
+    def iter_water_data(self, url, filter_names=None, deadline=NO_DEADLINE):
+        # Die Antwort kommt in einem Stück; JSON-Zeilen werden in Seiten zu page_size umgewandelt
+        source_url = self.api_url or url
+        if deadline.expired():
+            logging.warning("Frist des Abrufs bereits abgelaufen, %s wird nicht abgerufen.", source_url)
+            return
+        # Eine einzige Anfrage: ihr Timeout ist höchstens die verbleibende Frist
+        payload, is_json = self._get(source_url, deadline.timeout(self.session.timeout))
+        if not is_json:
+            yield parse_water_rows(payload, base_url=source_url, filter_names=filter_names)
+            return
+        wanted = set(filter_names) if filter_names else None
+        builder = ReadingBuilder()
+        page = []
+        for row in _json_rows(payload):
+            if wanted and row.get("name", "") not in wanted:
+                continue
+            page.append(_json_row_to_reading(row, source_url, builder))
+            if len(page) == self.page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def get_station_thresholds(self, station_href):
+        station_url = station_detail_url(station_href)
+        try:
+            payload, is_json = self._get(station_url.split("#", 1)[0])
+        except Exception as e:
+            logging.warning("Fehler beim Abruf von %s: %s", station_url, e)
+            return {}
+        if is_json:
+            return thresholds_from_rows(_json_threshold_rows(payload), station_url)
+        return parse_station_thresholds(payload, station_url)
+
+    def close(self):
+        self.session.close()
+
+
+def as_retriever(driver_or_retriever):
+    # Erlaubt weiterhin die Übergabe eines nackten WebDrivers
+    if isinstance(driver_or_retriever, Retriever):
+        return driver_or_retriever
+    return SeleniumRetriever(driver_or_retriever, owns_driver=False)
+
+
+def create_retriever(general_config=None):
+    """
+    Erzeugt das in general_config["retriever"] gewählte Backend ("selenium" oder "http").
+    Das Selenium-Backend nutzt einen DriverPool mit driver_pool_size vorgestarteten Drivern,
+    die nach driver_max_page_loads Seitenaufrufen bzw. über driver_max_rss_mb neu gestartet werden.
+    browser_profile ("lean" oder "full") und blocked_url_patterns steuern get_web_driver,
+    chromedriver_path und chromedriver_version die Auswahl des chromedriver.
+    """
+    general_config = general_config or {}
+    backend = general_config.get("retriever", "selenium")
+    if backend == "http":
+        return HttpRetriever(
+            api_url=general_config.get("http_api_url"),
+            timeout=general_config.get("http_timeout_seconds", 15),
+        )
+    if backend == "selenium":
+        from driver_manager import DriverPool, get_web_driver
+        profile = general_config.get("browser_profile", "lean")
+        blocked_urls = general_config.get("blocked_url_patterns")
+        driver_path = general_config.get("chromedriver_path")
+        driver_version = general_config.get("chromedriver_version")
+        pool = DriverPool(
+            size=general_config.get("driver_pool_size", 1),
+            driver_factory=lambda: get_web_driver(profile=profile, blocked_urls=blocked_urls,
+                                                  driver_path=driver_path, driver_version=driver_version),
+            max_page_loads=general_config.get("driver_max_page_loads", 500),
+            max_rss_mb=general_config.get("driver_max_rss_mb"),
+        )
+        return SeleniumRetriever(pool=pool)
+    raise ValueError(f"Unbekanntes Abruf-Backend: {backend}")
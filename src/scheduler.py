@@ -0,0 +1,184 @@
+# src/scheduler.py
+import time
+import heapq
+import random
+
+from classification import LEVEL_HW2, threshold_row, THRESHOLD_KEYS
+
+
+class PollScheduler:
+    """
+    Plant die Abrufe pro Station über eine Prioritätswarteschlange (Heap nach Fälligkeit).
+
+    - Basisintervall pro Station: station_intervals, sonst river_intervals[riverName], sonst base_interval.
+    - Steigt eine Station auf HW2/HW20 zu (weniger als approach_cm entfernt) oder hat sie HW2
+      erreicht, wird sie mit min_interval abgefragt; liegt sie ohne Anstieg unter MW, verdoppelt
+      sich das Intervall bis max_interval.
+    - Die nächste Fälligkeit wird vom geplanten, nicht vom tatsächlichen Zeitpunkt aus berechnet,
+      damit langsame Abrufe den Takt nicht verschieben (Drift-Korrektur).
+    - jitter streut die Fälligkeiten um +/- jitter * Intervall, min_fetch_gap begrenzt die
+      Abrufrate gegenüber der Quelle. Stationen, die innerhalb von batch_window fällig werden
+      (Standard: die Jitter-Spanne des Basisintervalls), werden in denselben Abruf übernommen.
+
+    clock, sleep und rng sind für Tests austauschbar.
+    """
+
+    def __init__(self, stations=(), base_interval=300, min_interval=60, max_interval=900,
+                 river_intervals=None, station_intervals=None, approach_cm=50, jitter=0.1,
+                 min_fetch_gap=10, batch_window=None, clock=time.monotonic, rng=None):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.river_intervals = river_intervals or {}
+        self.station_intervals = station_intervals or {}
+        self.approach_cm = approach_cm
+        self.jitter = jitter
+        self.min_fetch_gap = min_fetch_gap
+        if batch_window is None:
+            batch_window = max(min_fetch_gap, 2 * jitter * base_interval)
+        self.batch_window = batch_window
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._heap = []
+        # name -> {"anchor", "interval", "river", "value", "rising", "level", "thresholds"}
+        self._stations = {}
+        self._last_fetch = None
+        self.sync(stations)
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        general = config.get("general_config", {})
+        scheduler = cls(
+            base_interval=general.get("poll_interval_seconds", 300),
+            min_interval=general.get("min_poll_interval_seconds", 60),
+            max_interval=general.get("max_poll_interval_seconds", 900),
+            river_intervals=general.get("river_poll_intervals"),
+            station_intervals=general.get("station_poll_intervals"),
+            approach_cm=general.get("approach_cm", 50),
+            jitter=general.get("poll_jitter", 0.1),
+            min_fetch_gap=general.get("min_fetch_gap_seconds", 10),
+            **kwargs
+        )
+        scheduler.sync(scheduled_stations(config))
+        return scheduler
+
+    def sync(self, stations):
+        """
+        Gleicht die geplanten Stationen mit stations ab ([(name, riverName), ...]).
+        Neue Stationen sind sofort fällig, entfernte werden nicht mehr abgefragt.
+        """
+        now = self.clock()
+        wanted = dict(stations)
+        for name in list(self._stations):
+            if name not in wanted:
+                del self._stations[name]
+        for name, river in wanted.items():
+            state = self._stations.get(name)
+            if state is None:
+                state = {"anchor": now, "interval": None, "river": river, "value": None,
+                         "rising": False, "level": 0, "thresholds": {}}
+                self._stations[name] = state
+                state["interval"] = self._base_for(name)
+                heapq.heappush(self._heap, (now, name))
+            else:
+                state["river"] = river
+        # Einträge entfernter Stationen bleiben im Heap und werden beim Entnehmen verworfen
+
+    def _base_for(self, name):
+        if name in self.station_intervals:
+            return self.station_intervals[name]
+        river = self._stations[name]["river"]
+        return self.river_intervals.get(river, self.base_interval)
+
+    def observe(self, name, value_cm, level, thresholds=None):
+        """Übernimmt einen neuen Messwert samt Warnstufe für die Intervallberechnung."""
+        state = self._stations.get(name)
+        if state is None or value_cm is None:
+            return
+        state["rising"] = state["value"] is not None and value_cm > state["value"]
+        state["value"] = value_cm
+        state["level"] = int(level)
+        if thresholds is not None:
+            state["thresholds"] = thresholds
+
+    def interval_for(self, name):
+        state = self._stations[name]
+        base = self._base_for(name)
+        value = state["value"]
+        if value is None:
+            return base
+        fast = min(self.min_interval, base)
+        if state["level"] >= LEVEL_HW2:
+            return fast
+        if state["rising"]:
+            limits = threshold_row(state["thresholds"])
+            # Abstand zur nächsten Warnschwelle (HW2 bzw. HW20)
+            for key in ("HW2", "HW20"):
+                limit = limits[THRESHOLD_KEYS.index(key)]
+                if value < limit:
+                    if limit - value <= self.approach_cm:
+                        return fast
+                    break
+            return min(base, state["interval"] or base)
+        if state["level"] == 0:
+            # Unter MW und nicht steigend: schrittweise seltener abfragen
+            return min(self.max_interval, max(base, (state["interval"] or base) * 2))
+        return base
+
+    def next_delay(self):
+        """Sekunden bis zum nächsten erlaubten Abruf (0, wenn sofort abgerufen werden darf)."""
+        self._drop_removed()
+        if not self._heap:
+            return self.base_interval
+        now = self.clock()
+        due_at = self._heap[0][0]
+        if self._last_fetch is not None:
+            due_at = max(due_at, self._last_fetch + self.min_fetch_gap)
+        return max(0.0, due_at - now)
+
+    def _drop_removed(self):
+        while self._heap and self._heap[0][1] not in self._stations:
+            heapq.heappop(self._heap)
+
+    def pop_due(self):
+        """Entnimmt alle fälligen (oder innerhalb von batch_window fälligen) Stationen."""
+        now = self.clock()
+        if self._last_fetch is not None and now < self._last_fetch + self.min_fetch_gap:
+            return []
+        due = []
+        horizon = now + self.batch_window
+        while self._heap and self._heap[0][0] <= horizon:
+            _, name = heapq.heappop(self._heap)
+            if name in self._stations and name not in due:
+                due.append(name)
+        if due:
+            self._last_fetch = now
+        return due
+
+    def complete(self, names):
+        """Plant die abgerufenen Stationen anhand ihres neuen Intervalls wieder ein."""
+        now = self.clock()
+        for name in names:
+            state = self._stations.get(name)
+            if state is None:
+                continue
+            interval = self.interval_for(name)
+            state["interval"] = interval
+            anchor = state["anchor"] + interval
+            if anchor < now:
+                # Zu weit im Rückstand: nicht nachholen, sondern ab jetzt neu takten
+                anchor = now
+            state["anchor"] = anchor
+            offset = self.rng.uniform(-self.jitter, self.jitter) * interval if self.jitter else 0.0
+            heapq.heappush(self._heap, (anchor + offset, name))
+
+
+def scheduled_stations(config, subscribed=None):
+    """
+    Stationen, die der Dienst abfragt: selected_stations oder (leer) alle aus water_stations.
+    Stationen aus Abonnements (subscribed) kommen hinzu, jede Station nur einmal.
+    """
+    rivers = {station["name"]: station.get("riverName") for station in config.get("water_stations", [])}
+    selected = config.get("general_config", {}).get("selected_stations") or list(rivers)
+    selected = list(dict.fromkeys(list(selected) + list(subscribed or [])))
+    return [(name, rivers.get(name)) for name in selected]
@@ -0,0 +1,369 @@
+# src/service_core.py
+import asyncio
+import logging
+import metrics
+import latest_readings
+from alerts import AlertDispatcher
+from concurrent.futures import ThreadPoolExecutor
+from config_manager import diff_threshold_maps
+from config_snapshot import load_config_snapshot
+from retriever import create_retriever
+from reading_store import open_reading_store
+from scheduler import PollScheduler, scheduled_stations
+from pipeline import StationPipeline
+from subscriptions import SubscriptionPlan, subscriptions_from_config
+
+CONFIG_PATH = "config/water_level_config.json"
+
+# Markiert das Ende des Datenstroms beim Herunterfahren
+_END = object()
+# Ausgabe, die die Messwerte speichert; ihre Abrufe werden nie verworfen
+_STORE_SINK = "store"
+
+
+class ServiceCore:
+    """
+    Asynchroner Dienstkern: Abruf, Aufbereitung, Bewertung und Ausgabe laufen als getrennte
+    Stufen, die über begrenzte Warteschlangen verbunden sind.
+
+    - Der blockierende Abruf (Selenium/HTTP) läuft in einem eigenen Thread-Executor und reicht
+      jede Seite weiter, sobald sie gelesen ist; bewertet wird, wenn der Abruf vollständig ist.
+    - Jede Ausgabe (sink) hat eine eigene Warteschlange und einen eigenen Executor; ist sie voll,
+      wird der älteste Eintrag verworfen, sodass eine langsame Ausgabe nie den nächsten Abruf
+      verzögert. Nur beim Speichern geht nichts verloren: Dort werden die ausstehenden Abrufe
+      zu einem zusammengefasst.
+    - stop() ist thread-sicher (z. B. aus SvcStop) und fährt die Stufen geordnet herunter:
+      laufende Abrufe werden beendet, bereits abgerufene Daten noch verarbeitet.
+    - Konfigurationsänderungen des Watchers werden über update_config() in die Ereignisschleife
+      übergeben, ein Lock ist dafür nicht nötig. Dort wird der Unterschied zur bisherigen
+      Konfiguration bestimmt und an die Pipeline weitergegeben, die nur die betroffenen
+      Stationen nachzieht.
+    - latest hält den Stand des letzten Abrufs je Station für die Lese-API (api_port), die
+      damit beliebig viele Abnehmer bedient, ohne selbst einen Abruf auszulösen.
+    - Abonnements (subscribe() bzw. general_config["subscriptions"]) werden zu einem
+      SubscriptionPlan zusammengeführt: ein gemeinsamer Abruf für alle ihre Stationen, die
+      Ergebnisse werden über den Index Station -> Abonnenten verteilt.
+    - Warnungen gehen über einen AlertDispatcher (general_config["alerts"]) an Webhooks o. ä.;
+      die Zustellung läuft in dessen Threads, die Bewertung reiht sie nur ein.
+    """
+
+    def __init__(self, config_path=CONFIG_PATH, queue_size=2, retriever_factory=create_retriever,
+                 store_factory=open_reading_store, watch_config=True, scheduler_options=None):
+        self.config_path = config_path
+        self.queue_size = queue_size
+        self.retriever_factory = retriever_factory
+        self.store_factory = store_factory
+        self.watch_config = watch_config
+        self.scheduler_options = scheduler_options or {}
+        self.config = None
+        self.threshold_map = None
+        self.pipeline = None
+        self.scheduler = None
+        self.sinks = []
+        self.latest = latest_readings.LatestReadings()
+        self.subscriptions = []
+        self.plan = SubscriptionPlan()
+        self._scheduled = []
+        self.cycles = 0
+        self._loop = None
+        self._stop = None
+        self._stop_requested = False
+        self._wake = None
+        self._fetch_executor = None
+
+    def add_sink(self, name, func):
+        """
+        Registriert eine Ausgabe: func(cycle) wird für jeden bewerteten Abruf in einem eigenen
+        Thread aufgerufen. cycle ist ein Dictionary mit config, data, station_names, values, readings,
+        levels und previous_levels (Warnstufen nach/vor der Bewertung), plan (SubscriptionPlan) und
+        stale (wegen der Frist aus dem letzten Stand ergänzte Stationen -> Alter in Sekunden).
+        """
+        self.sinks.append((name, func))
+
+    def subscribe(self, subscription):
+        """Fügt ein Abonnement hinzu (thread-sicher); wirkt ab dem nächsten Abruf."""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._add_subscription, subscription)
+        else:
+            self._add_subscription(subscription)
+
+    def _add_subscription(self, subscription):
+        self.subscriptions.append(subscription)
+        if self.config is not None:
+            self._rebuild_plan()
+
+    def _rebuild_plan(self):
+        # Abrufplan aus den Abonnements neu aufbauen (nur bei Änderungen, nicht pro Abruf)
+        self.plan = SubscriptionPlan(self.subscriptions + subscriptions_from_config(self.config), self.config)
+        self._scheduled = scheduled_stations(self.config, self.plan.stations)
+        if self.scheduler is not None:
+            intervals = dict(self.config.get("general_config", {}).get("station_poll_intervals") or {})
+            for name, interval in self.plan.station_intervals.items():
+                intervals[name] = min(intervals.get(name, interval), interval)
+            self.scheduler.station_intervals = intervals
+        if self._wake is not None:
+            self._wake.set()
+
+    def update_config(self, config, threshold_map):
+        # Thread-sicher: aus dem Watcher-Thread in die Ereignisschleife übergeben
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._apply_config, config, threshold_map)
+        else:
+            self._apply_config(config, threshold_map)
+
+    def _apply_config(self, config, threshold_map):
+        diff = diff_threshold_maps(self.threshold_map, threshold_map)
+        self.config = config
+        self.threshold_map = threshold_map
+        if self.pipeline is not None:
+            self.pipeline.apply_config_diff(diff, threshold_map)
+        if diff.removed:
+            self.latest.remove(diff.removed)
+        self._rebuild_plan()
+        logging.info(
+            "Konfiguration wurde aktualisiert: %d Stationen neu, %d entfernt, %d mit geänderten Schwellen.",
+            len(diff.added), len(diff.removed), len(diff.changed),
+        )
+        if self._wake is not None:
+            self._wake.set()
+
+    def reload_config(self):
+        # Callback für den Konfig-Watcher
+        config, threshold_map = load_config_snapshot(self.config_path)
+        self.update_config(config, threshold_map)
+
+    def stop(self):
+        self._stop_requested = True
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _sleep(self, delay):
+        # Wartet bis zum Timeout, bis stop() oder bis die Planung sich geändert hat
+        waiters = [asyncio.ensure_future(self._stop.wait()), asyncio.ensure_future(self._wake.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _fetch_stage(self, retriever, out_queue):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            self.scheduler.sync(self._scheduled)
+            delay = self.scheduler.next_delay()
+            if delay > 0:
+                self._wake.clear()
+                await self._sleep(delay)
+                continue
+            due = self.scheduler.pop_due()
+            if not due:
+                continue
+            config, threshold_map = self.config, self.threshold_map
+            cycle = metrics.start_cycle()
+            # Seiten weiterreichen, sobald sie gelesen sind: Auswahl und Aufbereitung beginnen
+            # mit Seite 1, während Seite 2 noch lädt
+            pages = self.pipeline.fetch_pages(config, retriever, due)
+            sent = 0
+            try:
+                while True:
+                    if self._stop.is_set():
+                        await loop.run_in_executor(self._fetch_executor, pages.close)
+                        break
+                    page = await loop.run_in_executor(self._fetch_executor, self._next_page, cycle, pages)
+                    if page is None:
+                        break
+                    await out_queue.put((config, threshold_map, due, page, None, cycle))
+                    sent += 1
+            except Exception as e:
+                logging.error("Fehler beim Abruf der Stationen: %s", e)
+                if not sent:
+                    self.scheduler.complete(due)
+                    continue
+            # Ende des Abrufs, mit den aus dem letzten Stand ergänzten Stationen samt Alter
+            await out_queue.put((config, threshold_map, due, None, dict(self.pipeline.stale_ages), cycle))
+        await out_queue.put(_END)
+
+    def _next_page(self, cycle, pages):
+        # Läuft im Abruf-Thread; Zeitmessungen dort gehören zum Zyklus cycle
+        with metrics.bind(cycle), metrics.timer("fetch"):
+            return next(pages, None)
+
+    async def _parse_stage(self, in_queue, out_queue):
+        # Auswahl (Änderungserkennung) und Aufbereitung je Seite; an die Bewertung geht der
+        # ganze Abruf, damit Zusammenfassung und Alarme je Abruf entstehen
+        data, station_names, values, counters = [], [], [], {}
+        while True:
+            item = await in_queue.get()
+            if item is _END:
+                await out_queue.put(_END)
+                return
+            config, _, due, page, stale, cycle = item
+            # Immer mit dem aktuellen Mapping bewerten: Der Klassifikator wurde bei einer
+            # Konfigurationsänderung bereits per Diff angepasst
+            threshold_map = self.threshold_map
+            with metrics.bind(cycle):
+                if page is not None:
+                    selected = self.pipeline.select(config, threshold_map, page, log_summary=False)
+                    names, page_values = self.pipeline.parse(selected)
+                    data += selected
+                    station_names += names
+                    values += page_values
+                    for key, count in self.pipeline.change_detector.counters.items():
+                        counters[key] = counters.get(key, 0) + count
+                    continue
+                self.pipeline.log_fetch_summary(
+                    {key: counters.get(key, 0) for key in ("total", "new", "changed", "unchanged", "stale")})
+            await out_queue.put((config, threshold_map, due, data, stale, station_names, values, cycle))
+            data, station_names, values, counters = [], [], [], {}
+
+    async def _evaluate_stage(self, in_queue, sink_queues):
+        while True:
+            item = await in_queue.get()
+            if item is _END:
+                for queue in sink_queues:
+                    await queue.put(_END)
+                return
+            config, _, due, data, stale, station_names, values, cycle = item
+            threshold_map = self.threshold_map
+            try:
+                with metrics.bind(cycle):
+                    readings = self.pipeline.evaluate(config, threshold_map, data, station_names, values)
+                levels, previous_levels = self.pipeline.levels, self.pipeline.previous_levels
+                self.latest.update(data, levels)
+                self.latest.mark_stale(stale, due)
+            except Exception as e:
+                logging.error("Fehler bei der Bewertung der Stationen: %s", e)
+                readings, levels, previous_levels = [], (), ()
+            metrics.finish_cycle(cycle)
+            self.scheduler.complete(due)
+            self._wake.set()
+            self.cycles += 1
+            cycle = {"config": config, "data": data, "station_names": station_names, "values": values,
+                     "readings": readings, "levels": levels, "previous_levels": previous_levels,
+                     "plan": self.plan, "stale": stale}
+            for (name, _), queue in zip(self.sinks, sink_queues):
+                if queue.full() and name == _STORE_SINK:
+                    # Die Änderungserkennung hat die Messwerte bereits verbraucht: nichts verwerfen,
+                    # sondern die ausstehenden Abrufe zu einem zusammenfassen
+                    pending = [queue.get_nowait() for _ in range(queue.qsize())]
+                    logging.warning("Ausgabe '%s' kommt nicht hinterher, %d Abrufe werden zusammen gespeichert.",
+                                    name, len(pending) + 1)
+                    queue.put_nowait({**cycle, "readings": [
+                        reading for item in pending + [cycle] for reading in item["readings"]]})
+                    continue
+                if queue.full():
+                    queue.get_nowait()
+                    logging.warning("Ausgabe '%s' kommt nicht hinterher, ältester Abruf wird verworfen.", name)
+                queue.put_nowait(cycle)
+
+    async def _sink_stage(self, name, func, in_queue):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{name}") as executor:
+            while True:
+                cycle = await in_queue.get()
+                if cycle is _END:
+                    return
+                try:
+                    await loop.run_in_executor(executor, func, cycle)
+                except Exception as e:
+                    logging.error("Fehler in Ausgabe '%s': %s", name, e)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        if self._stop_requested:
+            self._stop.set()
+
+        logging.info("Lade initiale Konfiguration...")
+        self.config, self.threshold_map = load_config_snapshot(self.config_path)
+        general_config = self.config.get("general_config", {})
+
+        metrics_server = None
+        if general_config.get("metrics_enabled") or general_config.get("metrics_port"):
+            metrics.enable()
+            port = general_config.get("metrics_port")
+            if port:
+                try:
+                    metrics_server = metrics.start_http_server(port, general_config.get("metrics_host", "127.0.0.1"))
+                    logging.info("Kennzahlen unter http://%s:%s/metrics", general_config.get("metrics_host", "127.0.0.1"), port)
+                except OSError as e:
+                    logging.error("Kennzahlen-Endpunkt konnte nicht gestartet werden: %s", e)
+
+        api_server = None
+        if general_config.get("api_port"):
+            host = general_config.get("api_host", "127.0.0.1")
+            try:
+                api_server = latest_readings.start_http_server(self.latest, general_config["api_port"], host)
+                logging.info("Aktuelle Messwerte unter http://%s:%s/readings", host, general_config["api_port"])
+            except OSError as e:
+                logging.error("Lese-API konnte nicht gestartet werden: %s", e)
+
+        observer = None
+        if self.watch_config:
+            try:
+                from config_watcher import start_config_watcher
+                logging.info("Starte Konfig-Watcher...")
+                observer = start_config_watcher(self.config_path, self.reload_config)
+            except Exception as e:
+                logging.error("Fehler beim Starten des Konfig-Watchers: %s", e)
+
+        self._fetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch")
+        retriever = None
+        store = None
+        alerts = None
+        try:
+            logging.info("Initialisiere Abruf-Backend...")
+            retriever = await self._loop.run_in_executor(self._fetch_executor, self.retriever_factory, general_config)
+            store = self.store_factory(general_config)
+            self.scheduler = PollScheduler.from_config(self.config, **self.scheduler_options)
+            self._rebuild_plan()
+            if general_config.get("alerts"):
+                alerts = AlertDispatcher.from_config(general_config["alerts"])
+            self.pipeline = StationPipeline(store=store, scheduler=self.scheduler, alerts=alerts)
+            # Abonnements bekommen eine eigene Ausgabe, damit langsame Abnehmer den Abruf nicht bremsen
+            self.sinks.insert(0, ("subscriptions", lambda cycle: cycle["plan"].dispatch(
+                cycle["data"], cycle["levels"], cycle["previous_levels"])))
+            if store is not None:
+                self.sinks.insert(0, (_STORE_SINK, lambda cycle: self.pipeline.persist(cycle["readings"])))
+
+            raw_queue = asyncio.Queue(maxsize=self.queue_size)
+            parsed_queue = asyncio.Queue(maxsize=self.queue_size)
+            sink_queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.sinks]
+            tasks = [
+                asyncio.ensure_future(self._fetch_stage(retriever, raw_queue)),
+                asyncio.ensure_future(self._parse_stage(raw_queue, parsed_queue)),
+                asyncio.ensure_future(self._evaluate_stage(parsed_queue, sink_queues)),
+            ]
+            tasks += [
+                asyncio.ensure_future(self._sink_stage(name, func, queue))
+                for (name, func), queue in zip(self.sinks, sink_queues)
+            ]
+            await asyncio.gather(*tasks)
+        finally:
+            logging.info("Dienst wird beendet...")
+            if retriever is not None:
+                await self._loop.run_in_executor(self._fetch_executor, retriever.close)
+            self._fetch_executor.shutdown(wait=True)
+            if store is not None:
+                store.close()
+            if alerts is not None:
+                alerts.close()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+            if api_server is not None:
+                api_server.shutdown()
+                api_server.server_close()
+
+
+def run_core(config_path=CONFIG_PATH):
+    """Startet den Dienstkern im Vordergrund; Strg+C beendet ihn geordnet."""
+    core = ServiceCore(config_path)
+    try:
+        asyncio.run(core.run())
+    except KeyboardInterrupt:
+        logging.info("Service wird beendet...")
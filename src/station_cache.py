@@ -0,0 +1,54 @@
+# src/station_cache.py
+import os
+import json
+import time
+import logging
+
+
+class StationCache:
+    """
+    Persistenter Cache der Stationsdetails (Schwellenwerte), geschlüsselt nach dem href der
+    Station. Jeder Eintrag merkt sich den Abrufzeitpunkt, damit create_json_config im
+    inkrementellen Modus nur abgelaufene Einträge erneut abruft.
+    """
+
+    def __init__(self, path, ttl_seconds=30 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.decoder.JSONDecodeError) as e:
+                logging.warning("Station-Cache %s konnte nicht gelesen werden (%s), starte mit leerem Cache.", path, e)
+
+    def get(self, station_href, now=None):
+        """Liefert die gecachten Schwellenwerte oder None, wenn kein gültiger Eintrag existiert."""
+        entry = self.entries.get(station_href)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        if now - entry.get("fetchedAt", 0) > self.ttl_seconds:
+            return None
+        return entry.get("waterThresholds")
+
+    def put(self, station_href, thresholds, fetched_at=None):
+        self.entries[station_href] = {
+            "waterThresholds": thresholds,
+            "fetchedAt": time.time() if fetched_at is None else fetched_at,
+        }
+
+    def prune(self, station_hrefs):
+        # Entfernt Einträge von Stationen, die in der Liste nicht mehr vorkommen
+        keep = set(station_hrefs)
+        self.entries = {href: entry for href, entry in self.entries.items() if href in keep}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, self.path)
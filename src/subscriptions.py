@@ -0,0 +1,158 @@
+# src/subscriptions.py
+import json
+import logging
+import threading
+from collections import namedtuple
+from classification import LEVEL_NAMES
+from readings import to_readings
+
+# Eine an einen Abonnenten ausgelieferte Messung
+Notification = namedtuple("Notification", ["station", "river", "value_cm", "timestamp", "level", "previous_level"])
+
+
+class Subscription:
+    """
+    Ein Abnehmer von Messwerten: welche Stationen (einzeln oder alle eines Flusses), wie oft
+    sie mindestens abgefragt werden sollen, welche Messungen ihn interessieren (Regeln) und
+    wohin sie gehen (sinks: Aufrufbare sink(subscription, notifications)).
+
+    Regeln: min_level (z. B. "HW2") liefert nur Stationen ab dieser Stufe, changes_only nur
+    Stationen, deren Stufe sich geändert hat. Ohne Regeln wird jede neue Messung ausgeliefert.
+    """
+
+    def __init__(self, name, stations=(), rivers=(), poll_interval=None, min_level=None, changes_only=False,
+                 sinks=()):
+        self.name = name
+        self.stations = tuple(stations)
+        self.rivers = tuple(rivers)
+        self.poll_interval = poll_interval
+        self.min_level = LEVEL_NAMES.index(min_level) if min_level else 0
+        self.changes_only = changes_only
+        self.sinks = list(sinks)
+
+    @classmethod
+    def from_dict(cls, entry):
+        """
+        Aus einem Eintrag von general_config["subscriptions"], z. B.
+        {"name": "nahe", "rivers": ["Nahe"], "poll_interval_seconds": 120, "min_level": "HW2",
+         "changes_only": true, "sinks": ["log", {"type": "jsonl", "path": "data/nahe.jsonl"}]}
+        """
+        return cls(
+            entry["name"],
+            stations=entry.get("stations", ()),
+            rivers=entry.get("rivers", ()),
+            poll_interval=entry.get("poll_interval_seconds"),
+            min_level=entry.get("min_level"),
+            changes_only=entry.get("changes_only", False),
+            sinks=[sink_from_config(sink) for sink in entry.get("sinks", ["log"])],
+        )
+
+    def accepts(self, level, previous_level):
+        if level < self.min_level:
+            return False
+        return not self.changes_only or level != previous_level
+
+    def __repr__(self):
+        return f"Subscription({self.name!r}, stations={len(self.stations)}, rivers={self.rivers!r})"
+
+
+def log_sink(subscription, notifications):
+    for n in notifications:
+        logging.info("Abo %s: Station %s %s cm (%s)", subscription.name, n.station, n.value_cm, LEVEL_NAMES[n.level])
+
+
+class JsonLinesSink:
+    """Hängt jede Meldung als JSON-Zeile an path an."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, subscription, notifications):
+        lines = "".join(
+            json.dumps({"subscription": subscription.name, **n._asdict(), "level": LEVEL_NAMES[n.level],
+                        "previous_level": LEVEL_NAMES[n.previous_level]}, ensure_ascii=False) + "\n"
+            for n in notifications
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def sink_from_config(entry):
+    if callable(entry):
+        return entry
+    if entry == "log":
+        return log_sink
+    if isinstance(entry, dict) and entry.get("type") == "jsonl":
+        return JsonLinesSink(entry["path"])
+    raise ValueError(f"Unbekannte Ausgabe für Abonnement: {entry}")
+
+
+class SubscriptionPlan:
+    """
+    Fasst alle Abonnements zu einem Abrufplan zusammen: die Vereinigung ihrer Stationen (jede
+    nur einmal), das kürzeste gewünschte Intervall je Station und einen Index
+    Station -> Abonnenten, über den die Ergebnisse eines Abrufs verteilt werden. Wird bei jeder
+    Änderung der Abonnements oder der Konfiguration neu aufgebaut, nicht pro Abruf.
+    """
+
+    def __init__(self, subscriptions=(), config=None):
+        self.subscriptions = list(subscriptions)
+        water_stations = (config or {}).get("water_stations", [])
+        by_river = {}
+        for station in water_stations:
+            by_river.setdefault(station.get("riverName"), []).append(station["name"])
+
+        index = {}
+        intervals = {}
+        for subscription in self.subscriptions:
+            names = list(subscription.stations)
+            for river in subscription.rivers:
+                names.extend(by_river.get(river, ()))
+            for name in dict.fromkeys(names):
+                index.setdefault(name, []).append(subscription)
+                if subscription.poll_interval is not None:
+                    intervals[name] = min(intervals.get(name, subscription.poll_interval), subscription.poll_interval)
+        self.index = {name: tuple(subscribers) for name, subscribers in index.items()}
+        self.stations = list(self.index)
+        self.station_intervals = intervals
+
+    def __bool__(self):
+        return bool(self.subscriptions)
+
+    def route(self, data, levels, previous_levels):
+        """
+        Ordnet die bewerteten Stationen eines Abrufs den Abonnenten zu, deren Regeln sie
+        erfüllen. Liefert [(subscription, [Notification, ...]), ...] in Reihenfolge der Abonnements.
+        """
+        if not self.index:
+            return []
+        batches = {}
+        for reading, level, previous_level in zip(to_readings(data), levels, previous_levels):
+            if reading.value_cm is None:
+                continue
+            subscribers = self.index.get(reading.station.name)
+            if not subscribers:
+                continue
+            notification = None
+            for subscription in subscribers:
+                if not subscription.accepts(level, previous_level):
+                    continue
+                if notification is None:
+                    notification = Notification(reading.station.name, reading.station.river, reading.value_cm,
+                                                reading.timestamp, int(level), int(previous_level))
+                batches.setdefault(id(subscription), []).append(notification)
+        return [(s, batches[id(s)]) for s in self.subscriptions if id(s) in batches]
+
+    def dispatch(self, data, levels, previous_levels):
+        """Verteilt einen Abruf an die Ausgaben der Abonnenten; Fehler einer Ausgabe betreffen nur diese."""
+        for subscription, notifications in self.route(data, levels, previous_levels):
+            for sink in subscription.sinks:
+                try:
+                    sink(subscription, notifications)
+                except Exception as e:
+                    logging.error("Fehler in Ausgabe von Abo '%s': %s", subscription.name, e)
+
+
+def subscriptions_from_config(config):
+    return [Subscription.from_dict(entry) for entry in config.get("general_config", {}).get("subscriptions") or []]
@@ -0,0 +1,141 @@
+# src/trend.py
+import numpy as np
+
+# Spalten der Zustandsmatrix je Station: Schreibposition und Füllstand des Ringpuffers,
+# letzte Messung (Zeit, Wert), geglättete Steigung und die laufenden Summen der Regression
+_HEAD, _COUNT, _LAST_T, _LAST_V, _SLOPE, _N, _ST, _SV, _STT, _STV = range(10)
+_EMPTY = (0.0, 0.0, -np.inf, np.nan, np.nan, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+class TrendEngine:
+    """
+    Anstiegsrate und voraussichtliche Zeit bis zu den Schwellen je Station, fortlaufend aus
+    den letzten Messungen.
+
+    - Pro Station ein Ringpuffer fester Größe (capacity) mit (Zeit, Wert); alle Stationen
+      liegen in gemeinsamen NumPy-Arrays, der übrige Zustand in einer Matrix (Stationen x Spalten),
+      die pro Abruf einmal gelesen und einmal zurückgeschrieben wird.
+    - Die Regressionsgerade über den Puffer wird aus laufenden Summen (n, Σt, Σv, Σt², Σtv)
+      berechnet: Eine neue Messung addiert ihren Beitrag und zieht den der verdrängten ab,
+      ohne die Historie erneut zu lesen. Beim Umlauf des Puffers werden die Summen einmal
+      aus dem Puffer neu gebildet, damit sich Rundungsfehler nicht aufsummieren.
+    - Die Steigung (cm/h) wird exponentiell geglättet (alpha = Gewicht der neuesten Steigung).
+    - Nach einer Lücke über max_gap_seconds beginnt der Puffer der Station von vorn.
+
+    update() verarbeitet alle Stationen eines Abrufs in einem Durchlauf; jede Station darf darin
+    höchstens einmal vorkommen.
+    """
+
+    def __init__(self, capacity=8, alpha=0.5, max_gap_seconds=3 * 3600, min_slope_cm_per_hour=0.5):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.max_gap_hours = max_gap_seconds / 3600
+        self.min_slope = min_slope_cm_per_hour
+        self.station_index = {}
+        # Zeiten in Stunden seit epoch (erste Messung), damit die Summen klein bleiben
+        self.epoch = None
+        self._state = np.zeros((0, len(_EMPTY)))
+        self._ring_t = np.zeros((0, capacity))
+        self._ring_v = np.zeros((0, capacity))
+
+    def _grow(self, size):
+        state = np.tile(np.array(_EMPTY), (size, 1))
+        state[:len(self._state)] = self._state
+        ring_t = np.zeros((size, self.capacity))
+        ring_v = np.zeros((size, self.capacity))
+        ring_t[:len(self._ring_t)] = self._ring_t
+        ring_v[:len(self._ring_v)] = self._ring_v
+        self._state, self._ring_t, self._ring_v = state, ring_t, ring_v
+
+    def rows(self, station_names):
+        """Zeilen der Stationen in den Arrays; neue Stationen werden angelegt."""
+        index = self.station_index
+        try:
+            return np.array([index[name] for name in station_names], dtype=np.intp)
+        except KeyError:
+            pass
+        for name in station_names:
+            if name not in index:
+                index[name] = len(index)
+        if len(index) > len(self._state):
+            self._grow(max(len(index), 2 * len(self._state), 16))
+        return np.array([index[name] for name in station_names], dtype=np.intp)
+
+    def update(self, station_names, timestamps, values):
+        """
+        Übernimmt die Messungen eines Abrufs (timestamps in Unix-Sekunden, None = keine Messung).
+        Nur Messungen, die neuer sind als die letzte der Station, fließen ein. Liefert die Zeilen
+        der Stationen für slopes() und time_to_thresholds().
+        """
+        rows = self.rows(station_names)
+        times = np.array([np.nan if t is None else t for t in timestamps], dtype=float)
+        current = np.array([np.nan if v is None else v for v in values], dtype=float)
+        if self.epoch is None:
+            if np.isnan(times).all():
+                return rows
+            self.epoch = np.nanmin(times)
+        t = (times - self.epoch) / 3600
+        state = self._state[rows]
+        fresh = (t > state[:, _LAST_T]) & ~np.isnan(current)
+        r, v = rows, current
+        if not fresh.all():
+            if not fresh.any():
+                return rows
+            r, t, v, state = rows[fresh], t[fresh], current[fresh], state[fresh]
+
+        # Lücke: Station beginnt neu
+        gap = (state[:, _COUNT] > 0) & (t - state[:, _LAST_T] > self.max_gap_hours)
+        if gap.any():
+            state[gap] = _EMPTY
+
+        pos = state[:, _HEAD].astype(np.intp)
+        full = state[:, _COUNT] == self.capacity
+        old_t = np.where(full, self._ring_t[r, pos], 0.0)
+        old_v = np.where(full, self._ring_v[r, pos], 0.0)
+        self._ring_t[r, pos] = t
+        self._ring_v[r, pos] = v
+        state[:, _N] += ~full
+        state[:, _ST] += t - old_t
+        state[:, _SV] += v - old_v
+        state[:, _STT] += t * t - old_t * old_t
+        state[:, _STV] += t * v - old_t * old_v
+        head = (pos + 1) % self.capacity
+        state[:, _HEAD] = head
+        state[:, _COUNT] = np.minimum(state[:, _COUNT] + 1, self.capacity)
+        state[:, _LAST_T] = t
+        state[:, _LAST_V] = v
+
+        wrapped = head == 0
+        if wrapped.any():
+            # Ein voller Umlauf: Summen exakt aus dem Puffer neu bilden
+            bt, bv = self._ring_t[r[wrapped]], self._ring_v[r[wrapped]]
+            state[wrapped, _ST:] = np.column_stack((bt.sum(1), bv.sum(1), (bt * bt).sum(1), (bt * bv).sum(1)))
+
+        n, st, sv, stt, stv = state[:, _N], state[:, _ST], state[:, _SV], state[:, _STT], state[:, _STV]
+        denominator = n * stt - st * st
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raw = np.where((n >= 2) & (denominator > 1e-9), (n * stv - st * sv) / denominator, np.nan)
+        previous = state[:, _SLOPE]
+        smoothed = np.where(np.isnan(previous), raw, self.alpha * raw + (1 - self.alpha) * previous)
+        state[:, _SLOPE] = np.where(np.isnan(raw), previous, smoothed)
+        self._state[r] = state
+        return rows
+
+    def slopes(self, rows):
+        """Geglättete Anstiegsrate in cm/h (nan, solange weniger als zwei Messungen vorliegen)."""
+        return self._state[rows, _SLOPE]
+
+    def time_to_thresholds(self, rows, limits):
+        """
+        Voraussichtliche Sekunden bis zum Erreichen jeder Schwelle (limits: Zeilen x Schwellen,
+        inf = keine Schwelle) ab dem letzten Messwert: 0, wenn bereits erreicht, inf, wenn die
+        Station nicht merklich steigt oder die Schwelle fehlt.
+        """
+        state = self._state[rows]
+        slope = state[:, _SLOPE, None]
+        remaining = limits - state[:, _LAST_V, None]
+        rising = slope > self.min_slope
+        with np.errstate(invalid="ignore", divide="ignore"):
+            eta = np.where(rising, remaining / slope * 3600, np.inf)
+        eta = np.where(remaining <= 0, 0.0, eta)
+        return np.where(np.isnan(remaining), np.inf, eta)
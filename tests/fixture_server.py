@@ -0,0 +1,91 @@
+# tests/fixture_server.py
+import os
+import gzip
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".css": "text/css",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".woff2": "font/woff2",
+}
+
+
+class FixtureServer:
+    """
+    Lokaler Ersatz für hochwasser.rlp.de, der aufgezeichnete Antworten aus tests/fixtures
+    ausliefert. routes bildet einen Pfad (ohne Query) auf einen Dateinamen oder direkt auf
+    einen Antwortinhalt (bytes) ab, bytes_sent zählt die übertragenen Bytes je Pfad,
+    latency verzögert jede Antwort um die angegebene Anzahl Sekunden.
+    """
+
+    def __init__(self, routes, latency=0.0):
+        self.routes = dict(routes)
+        self.latency = latency
+        self.requests = []
+        self.connections = 0
+        self.bytes_sent = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Kopf und Inhalt werden getrennt geschrieben; ohne TCP_NODELAY kosten Keep-Alive-
+            # Anfragen durch Nagle + verzögertes ACK jeweils ~40 ms zusätzlich
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                server.requests.append(path)
+                if server.latency:
+                    time.sleep(server.latency)
+                route = server.routes.get(path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if isinstance(route, bytes):
+                    body, extension = route, os.path.splitext(path)[1]
+                else:
+                    with open(os.path.join(FIXTURE_DIR, route), "rb") as f:
+                        body = f.read()
+                    extension = os.path.splitext(route)[1]
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPES.get(extension, "application/octet-stream"))
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.bytes_sent[path] = server.bytes_sent.get(path, 0) + len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
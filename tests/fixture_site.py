@@ -0,0 +1,262 @@
+# tests/fixture_site.py
+import os
+import re
+import json
+import time
+import xml.etree.ElementTree as ET
+from html import escape
+from urllib.parse import urljoin
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from fixture_server import FIXTURE_DIR
+from retriever import HttpSession
+from readings import _format_number_de
+
+LIST_PATH = "/pegelliste/land"
+API_PATH = "/api/pegelliste/land.json"
+
+# Aufbau von Pegelliste und Detailseiten wie in pegelliste_page.html / station_detail.html
+_ROW = (
+    '<div class="MuiDataGrid-row" data-id="{id}" data-rowindex="{index}" role="row">\n'
+    '<div class="MuiDataGrid-cell MuiDataGrid-cell--textLeft" data-field="name" role="cell"><a class="m-link" href="{href}">{name}</a></div>\n'
+    '<div class="MuiDataGrid-cell" data-field="riverName" role="cell"><div class="MuiDataGrid-cellContent" title="{river}">{river}</div></div>\n'
+    '<div class="MuiDataGrid-cell" data-field="riverAreaName" role="cell"><div class="MuiDataGrid-cellContent" title="{area}">{area}</div></div>\n'
+    '<div class="MuiDataGrid-cell MuiDataGrid-cell--textRight" data-field="yLast" role="cell"><span class="m-value">{y_last}</span> cm</div>\n'
+    '<div class="MuiDataGrid-cell" data-field="xLast" role="cell"><div class="MuiDataGrid-cellContent" title="{x_last}">{x_last}</div></div>\n'
+    '<div class="MuiDataGrid-cell MuiDataGrid-cell--textRight" data-field="catchmentArea" role="cell"><div class="MuiDataGrid-cellContent">{catchment}</div></div>\n'
+    '</div>\n'
+)
+_PAGE = (
+    '<!DOCTYPE html>\n<html lang="de">\n<head>\n<meta charset="utf-8" />\n'
+    '<title>Pegelliste | Hochwasser Rheinland-Pfalz</title>\n</head>\n<body>\n<div id="root">\n'
+    '<div class="MuiDataGrid-root MuiDataGrid-root--densityStandard" role="grid">\n'
+    '<div class="MuiDataGrid-virtualScrollerRenderZone" role="rowgroup">\n{rows}</div>\n'
+    '<div class="MuiDataGrid-footerContainer"><div class="MuiTablePagination-actions">\n'
+    '<button class="MuiIconButton-root" type="button"{disabled} data-href="{next_href}">'
+    '<svg class="MuiSvgIcon-root" data-testid="KeyboardArrowRightIcon"></svg></button>\n'
+    '</div></div>\n</div>\n</div>\n</body>\n</html>\n'
+)
+_DETAIL = (
+    '<!DOCTYPE html>\n<html lang="de">\n<head><meta charset="utf-8" /><title>{name} | Hochwasser Rheinland-Pfalz</title></head>\n'
+    '<body>\n<div id="root">\n<section id="pegelkennwerte">\n'
+    '<table class="MuiTable-root m-detail-measurementsites__table-wrapper">\n'
+    '<thead class="MuiTableHead-root"><tr class="MuiTableRow-root"><td class="MuiTableCell-root">Stammdaten</td><td class="MuiTableCell-root"></td></tr></thead>\n'
+    '<tbody class="MuiTableBody-root">\n'
+    '<tr class="MuiTableRow-root"><td class="MuiTableCell-root">Gewässer</td><td class="MuiTableCell-root">{river}</td></tr>\n'
+    '</tbody>\n</table>\n{thresholds}</section>\n</div>\n</body>\n</html>\n'
+)
+_THRESHOLD_TABLE = (
+    '<table class="MuiTable-root m-detail-measurementsites__table-wrapper">\n'
+    '<thead class="MuiTableHead-root"><tr class="MuiTableRow-root"><td class="MuiTableCell-root">Wasserstandskennwerte</td><td class="MuiTableCell-root">Wert</td></tr></thead>\n'
+    '<tbody class="MuiTableBody-root">\n{rows}</tbody>\n</table>\n'
+)
+_THRESHOLD_ROW = '<tr class="MuiTableRow-root"><td class="MuiTableCell-root">{key}</td><td class="MuiTableCell-root">{value} cm</td></tr>\n'
+
+
+def load_stations(filename="pegelliste_land.json"):
+    """Die aufgezeichneten 244 Stationen der Pegelliste (Stand 18.10.2026) inkl. Schwellenwerten."""
+    with open(os.path.join(FIXTURE_DIR, filename), encoding="utf-8") as f:
+        return json.load(f)["data"]
+
+
+def synthetic_stations(count, stations=None):
+    """
+    count Stationen nach dem Vorbild der aufgezeichneten (ids, Namen und hrefs durchnummeriert).
+    Ein Generator, damit auch große Fixtures (z. B. 50 000 Zeilen) nicht vorab im Speicher liegen.
+    """
+    stations = load_stations() if stations is None else stations
+    for i in range(count):
+        station = stations[i % len(stations)]
+        yield dict(station, id=station["id"] + i, name=f"{station['name']} {i}",
+                   href=f"{station['href']}-{i}", yLast=station["yLast"] + i % 7)
+
+
+def _page_path(page):
+    return LIST_PATH if page == 0 else f"{LIST_PATH}/seite-{page + 1}"
+
+
+def render_list_pages(stations, page_size=25):
+    pages = []
+    chunks = [stations[i:i + page_size] for i in range(0, len(stations), page_size)] or [[]]
+    for page, chunk in enumerate(chunks):
+        rows = "".join(
+            _ROW.format(
+                id=station["id"], index=page * page_size + offset, href=escape(station["href"]),
+                name=escape(station["name"]), river=escape(station["riverName"] or ""),
+                area=escape(station["riverAreaName"] or ""), y_last=station["yLast"],
+                x_last=station["xLast"],
+                catchment=f"{_format_number_de(station['catchmentArea'])} km²" if station["catchmentArea"] is not None else "",
+            )
+            for offset, station in enumerate(chunk)
+        )
+        last = page == len(chunks) - 1
+        pages.append(_PAGE.format(
+            rows=rows, disabled=' disabled=""' if last else "", next_href="" if last else _page_path(page + 1),
+        ).encode("utf-8"))
+    return pages
+
+
+def render_detail_page(station):
+    rows = "".join(
+        _THRESHOLD_ROW.format(key=key, value=value)
+        for key, value in station["waterThresholds"].items() if value is not None
+    )
+    thresholds = _THRESHOLD_TABLE.format(rows=rows) if rows else ""
+    return _DETAIL.format(name=escape(station["name"]), river=escape(station["riverName"] or ""),
+                          thresholds=thresholds).encode("utf-8")
+
+
+def site_routes(stations=None, page_size=25):
+    """
+    Routen für FixtureServer: mehrseitige Pegelliste unter LIST_PATH (Folgeseiten über den
+    Next-Button), dieselben Daten als JSON unter API_PATH und je Station die Detailseite.
+    """
+    stations = load_stations() if stations is None else stations
+    routes = {_page_path(page): body for page, body in enumerate(render_list_pages(stations, page_size))}
+    api_rows = [
+        {key: value for key, value in station.items() if key != "waterThresholds" and value is not None}
+        for station in stations
+    ]
+    routes[API_PATH] = json.dumps({"data": api_rows}, ensure_ascii=False).encode("utf-8")
+    for station in stations:
+        routes[station["href"]] = render_detail_page(station)
+    return routes
+
+
+_COMPOUND = re.compile(r"^(\w+)?((?:\.[\w-]+)*)((?:\[[\w-]+=['\"][^'\"]*['\"]\])*)$")
+_ATTRIBUTE = re.compile(r"\[([\w-]+)=['\"]([^'\"]*)['\"]\]")
+_TESTID_XPATH = re.compile(r"^//\*\[@data-testid='([^']+)'\](/ancestor::\*\[self::button or self::a\])?$")
+_ANCESTOR_XPATH = "ancestor::*[self::button or self::a]"
+
+
+class FixtureElement:
+    """WebElement-Ersatz über ElementTree mit dem CSS-/XPath-Umfang, den data_retriever nutzt."""
+
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+        self.generation = driver.generation
+
+    def _check(self):
+        if self.generation != self.driver.generation:
+            raise StaleElementReferenceException("Seite wurde neu geladen")
+
+    @staticmethod
+    def _matches(node, compound):
+        tag, classes, attributes = _COMPOUND.match(compound).groups()
+        if tag and node.tag != tag:
+            return False
+        node_classes = (node.get("class") or "").split()
+        if any(cls not in node_classes for cls in classes.split(".")[1:]):
+            return False
+        return all(node.get(name) == value for name, value in _ATTRIBUTE.findall(attributes))
+
+    def _select(self, compounds, node):
+        for child in node.iter():
+            if child is node or not self._matches(child, compounds[0]):
+                continue
+            if len(compounds) == 1:
+                yield child
+            else:
+                yield from self._select(compounds[1:], child)
+
+    def find_elements(self, by, selector):
+        self._check()
+        if by == By.XPATH:
+            if selector == _ANCESTOR_XPATH:
+                node = self.driver.parents.get(self.node)
+                while node is not None and node.tag not in ("button", "a"):
+                    node = self.driver.parents.get(node)
+                return [] if node is None else [FixtureElement(self.driver, node)]
+            match = _TESTID_XPATH.match(selector)
+            if not match:
+                raise NotImplementedError(selector)
+            nodes = [node for node in self.node.iter() if node.get("data-testid") == match.group(1)]
+            elements = [FixtureElement(self.driver, node) for node in nodes]
+            if match.group(2):
+                elements = [ancestor for element in elements for ancestor in element.find_elements(By.XPATH, _ANCESTOR_XPATH)]
+            return elements
+        if by == By.CLASS_NAME:
+            selector = "." + selector
+        matches = []
+        for alternative in selector.split(","):
+            matches.extend(self._select(alternative.split(), self.node))
+        return [FixtureElement(self.driver, node) for node in dict.fromkeys(matches)]
+
+    def find_element(self, by, selector):
+        matches = self.find_elements(by, selector)
+        if not matches:
+            raise NoSuchElementException(selector)
+        return matches[0]
+
+    @property
+    def text(self):
+        self._check()
+        return " ".join("".join(self.node.itertext()).split())
+
+    def get_attribute(self, name):
+        self._check()
+        value = self.node.get(name)
+        if name == "href" and value is not None:
+            return urljoin(self.driver.current_url, value)
+        return value
+
+    def is_displayed(self):
+        self._check()
+        return True
+
+    def is_enabled(self):
+        self._check()
+        return self.node.get("disabled") is None
+
+    def click(self):
+        self._check()
+        next_href = self.node.get("data-href")
+        if next_href:
+            self.driver.get(urljoin(self.driver.current_url, next_href))
+
+
+class FixtureDriver:
+    """
+    Offline-Ersatz für den Chrome-WebDriver: lädt Seiten per HTTP vom FixtureServer
+    (inkl. dessen Latenz) und stellt sie über FixtureElement bereit. navigation_seconds und
+    page_loads erlauben es, Laden und Auswerten getrennt zu messen.
+    """
+
+    def __init__(self, session=None):
+        self.session = session or HttpSession(timeout=15)
+        self.current_url = None
+        self.page_source = ""
+        self.generation = 0
+        self.root = None
+        self.parents = {}
+        self.page_loads = 0
+        self.navigation_seconds = 0.0
+
+    def get(self, url):
+        start = time.perf_counter()
+        _, body = self.session.get(url.split("#", 1)[0])
+        self.navigation_seconds += time.perf_counter() - start
+        self.page_loads += 1
+        self.current_url = url
+        self.page_source = body.decode("utf-8")
+        self.generation += 1
+        self.root = ET.fromstring(self.page_source.replace("<!DOCTYPE html>", ""))
+        self.parents = {child: parent for parent in self.root.iter() for child in parent}
+
+    def find_elements(self, by, selector):
+        return FixtureElement(self, self.root).find_elements(by, selector)
+
+    def find_element(self, by, selector):
+        return FixtureElement(self, self.root).find_element(by, selector)
+
+    def quit(self):
+        self.session.close()
+
+
+def list_url(base_url):
+    return base_url + LIST_PATH
+
+
+def api_url(base_url):
+    return base_url + API_PATH
@@ -0,0 +1,178 @@
+# tests/test_alerts.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from alerts import Alert, AlertDispatcher, WebhookSink, alert_to_dict, format_batch
+from classification import LEVEL_HW2
+from pipeline import StationPipeline
+
+
+class StubReceiver:
+    """Lokaler Webhook-Empfänger: antwortet mit status (änderbar) und merkt sich die Stapel."""
+
+    def __init__(self, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.batches = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(receiver.delay)
+                if receiver.status == 200:
+                    receiver.batches.append(json.loads(body))
+                self.send_response(receiver.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def wait(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while len(self.batches) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.batches
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def alert(station, level=2, previous=1, value=450):
+    return Alert(station, "level", level, previous, value, 1_792_000_000, None)
+
+
+class TestAlertDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.receiver = StubReceiver()
+
+    def tearDown(self):
+        self.receiver.close()
+        shutil.rmtree(self.spool_dir)
+
+    def dispatcher(self, **options):
+        options.setdefault("backoff_seconds", 0.01)
+        return AlertDispatcher([WebhookSink(self.receiver.url, timeout=2)], spool_dir=self.spool_dir, **options)
+
+    def test_one_batch_per_cycle_and_duplicates_suppressed(self):
+        now = [0.0]
+        dispatcher = self.dispatcher(renotify_seconds=600, clock=lambda: now[0])
+        dispatcher.publish([alert("Kirn"), alert("Boos")])
+        dispatcher.publish([alert("Kirn"), alert("Boos", level=3, previous=2)])
+        now[0] = 601
+        dispatcher.publish([alert("Kirn")])
+        batches = self.receiver.wait(3)
+        dispatcher.close()
+        self.assertEqual([[a["station"] for a in b["alerts"]] for b in batches], [["Kirn", "Boos"], ["Boos"], ["Kirn"]])
+        self.assertEqual(batches[1]["alerts"][0]["level"], "HW20")
+        self.assertIn("Kirn: MW -> HW2 (450 cm)", batches[0]["text"])
+
+    def test_enqueue_does_not_wait_for_slow_receiver(self):
+        self.receiver.delay = 0.5
+        dispatcher = self.dispatcher(renotify_seconds=0)
+        timings = []
+        for i in range(20):
+            start = time.perf_counter()
+            dispatcher.publish([alert(f"Station {i}")])
+            timings.append(time.perf_counter() - start)
+        self.assertLess(sorted(timings)[10], 0.001)
+        dispatcher.close(timeout=0.1)
+
+    def test_failed_delivery_is_retried_then_spooled_and_resent(self):
+        self.receiver.status = 500
+        dispatcher = self.dispatcher(max_attempts=2)
+        dispatcher.publish([alert("Kirn")])
+        worker = dispatcher.workers[0]
+        deadline = time.monotonic() + 5
+        while worker.spooled == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(worker.spooled, 1)
+        dispatcher.close()
+        self.assertEqual(os.listdir(self.spool_dir), ["0_webhook.jsonl"])
+
+        # Nach dem Neustart wird der Spool zuerst zugestellt
+        self.receiver.status = 200
+        dispatcher = self.dispatcher()
+        dispatcher.publish([alert("Boos")])
+        batches = self.receiver.wait(2)
+        dispatcher.close()
+        self.assertEqual([b["alerts"][0]["station"] for b in batches], ["Kirn", "Boos"])
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_full_queue_spools_oldest_batch(self):
+        self.receiver.delay = 0.3
+        dispatcher = self.dispatcher(renotify_seconds=0, queue_size=1)
+        for i in range(4):
+            dispatcher.publish([alert(f"Station {i}")])
+        self.assertGreaterEqual(dispatcher.workers[0].spooled, 2)
+        dispatcher.close()
+        # Gespoolte Stapel werden nach der nächsten erfolgreichen Zustellung nachgereicht;
+        # keiner geht verloren
+        spool = os.path.join(self.spool_dir, "0_webhook.jsonl")
+        spooled = []
+        if os.path.exists(spool):
+            with open(spool, encoding="utf-8") as f:
+                spooled = [json.loads(line)[0]["station"] for line in f]
+        delivered = [b["alerts"][0]["station"] for b in self.receiver.batches]
+        self.assertEqual(sorted(spooled + delivered), [f"Station {i}" for i in range(4)])
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, alerts):
+        self.published.append(alerts)
+
+
+class TestPipelineAlerts(unittest.TestCase):
+    def test_evaluate_publishes_one_batch_per_cycle(self):
+        dispatcher = RecordingDispatcher()
+        pipeline = StationPipeline(alerts=dispatcher)
+        threshold_map = {name: {"MW": 100, "HW2": 300, "HW100": 500} for name in ("Kirn", "Boos", "Odenbach")}
+
+        def run(values):
+            data = [(name, "", "", f"{value} cm", "18.10.2026 14:15", "", "/" + name) for name, value in values]
+            with self.assertLogs(level="INFO"):
+                pipeline.evaluate({}, threshold_map, data, *pipeline.parse(data))
+
+        run([("Kirn", 200), ("Boos", 200), ("Odenbach", 50)])
+        self.assertEqual(dispatcher.published, [])
+        run([("Kirn", 320), ("Boos", 520), ("Odenbach", 120)])
+        self.assertEqual(len(dispatcher.published), 1)
+        self.assertEqual([(a.station, a.kind, a.level, a.previous_level) for a in dispatcher.published[0]],
+                         [("Kirn", "level", 2, 1), ("Boos", "level", 5, 1)])
+        run([("Kirn", 200), ("Boos", 520), ("Odenbach", 120)])
+        self.assertEqual([(a.station, a.level) for a in dispatcher.published[1]], [("Kirn", 1)])
+
+    def test_trend_alert_names_the_approached_threshold(self):
+        dispatcher = RecordingDispatcher()
+        pipeline = StationPipeline(alerts=dispatcher)
+        threshold_map = {"Odenbach": {"MW": 150, "HW2": 439, "HW100": 549}}
+        for minute, value in ((0, 380), (15, 395)):
+            data = [("Odenbach", "Glan", "Glan", f"{value} cm", f"18.10.2026 12:{minute:02d}", "", "/o")]
+            with self.assertLogs(level="INFO"):
+                pipeline.evaluate({}, threshold_map, data, *pipeline.parse(data))
+        trend = dispatcher.published[0][0]
+        self.assertEqual((trend.kind, trend.level), ("trend", LEVEL_HW2))
+        self.assertEqual(format_batch([trend]), "Odenbach: HW2 voraussichtlich in 44 min (395 cm)")
+        self.assertEqual(alert_to_dict(trend)["level"], "HW2")
+
+
+if __name__ == "__main__":
+    unittest.main()
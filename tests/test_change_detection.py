@@ -0,0 +1,98 @@
+# tests/test_change_detection.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from change_detection import ChangeDetector
+from config_manager import diff_threshold_maps
+from pipeline import StationPipeline
+
+
+def entry(name, y_last, x_last):
+    return (name, "Fluss", "Gebiet", y_last, x_last, "1 km²", "/" + name)
+
+
+class TestChangeDetector(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.detector = ChangeDetector(stale_after_seconds=1800, clock=lambda: self.now)
+
+    def test_only_new_measurements_are_reported(self):
+        first = [entry("A", "10 cm", "18.10.2026 14:00"), entry("B", "20 cm", "18.10.2026 14:00")]
+        delta = self.detector.update(first)
+        self.assertEqual([e[0] for e in delta.new], ["A", "B"])
+
+        delta = self.detector.update(first)
+        self.assertEqual((delta.new, delta.changed, delta.unchanged), ([], [], 2))
+
+        second = [entry("A", "12 cm", "18.10.2026 14:15"), first[1], entry("C", "5 cm", "18.10.2026 14:15")]
+        delta = self.detector.update(second)
+        self.assertEqual([e[0] for e in delta.changed], ["A"])
+        self.assertEqual([e[0] for e in delta.new], ["C"])
+        self.assertEqual(self.detector.counters, {"total": 3, "new": 1, "changed": 1, "unchanged": 1, "stale": 0})
+
+    def test_stale_is_reported_once(self):
+        data = [entry("A", "10 cm", "18.10.2026 14:00")]
+        self.detector.update(data)
+        self.now = 1000
+        self.assertEqual(self.detector.update(data).stale, [])
+        self.now = 2000
+        self.assertEqual(self.detector.update(data).stale, ["A"])
+        self.now = 3000
+        self.assertEqual(self.detector.update(data).stale, [])
+        # Neue Messung setzt den Zustand zurück
+        self.assertEqual(len(self.detector.update([entry("A", "11 cm", "18.10.2026 14:15")]).changed), 1)
+
+
+class TestConfigDiffReevaluation(unittest.TestCase):
+    def test_only_affected_stations_are_reevaluated(self):
+        pipeline = StationPipeline()
+        old_map = {"A": {"HW100": 100}, "B": {"HW100": 200}}
+        data = [entry("A", "10 cm", "18.10.2026 14:00"), entry("B", "20 cm", "18.10.2026 14:00")]
+        selected = pipeline.select({}, old_map, data)
+        pipeline.evaluate({}, old_map, selected, *pipeline.parse(selected))
+        classifier = pipeline.classifier
+
+        new_map = {"A": {"HW100": 5}, "B": {"HW100": 200}}
+        pipeline.apply_config_diff(diff_threshold_maps(old_map, new_map), new_map)
+        self.assertIs(pipeline.classifier, classifier)
+        self.assertEqual([e[0] for e in pipeline.select({}, new_map, data)], ["A"])
+        self.assertEqual(pipeline.select({}, new_map, data), [])
+
+    def test_replaced_map_without_diff_reevaluates_all(self):
+        pipeline = StationPipeline()
+        old_map = {"A": {"HW100": 100}, "B": {"HW100": 200}}
+        data = [entry("A", "10 cm", "18.10.2026 14:00"), entry("B", "20 cm", "18.10.2026 14:00")]
+        selected = pipeline.select({}, old_map, data)
+        pipeline.evaluate({}, old_map, selected, *pipeline.parse(selected))
+        self.assertEqual(len(pipeline.select({}, {"A": {"HW100": 5}, "B": {}}, data)), 2)
+
+
+class TestEvaluateLogging(unittest.TestCase):
+    def test_station_lines_only_on_level_change(self):
+        pipeline = StationPipeline()
+        threshold_map = {"A": {"HW2": 50, "HW100": 100}, "B": {"HW100": 200}}
+
+        def run(data):
+            with self.assertLogs(level="INFO") as logs:
+                pipeline.evaluate({}, threshold_map, data, *pipeline.parse(data))
+            return logs.output
+
+        output = run([entry("A", "60 cm", "18.10.2026 14:00"), entry("B", "20 cm", "18.10.2026 14:00")])
+        self.assertEqual(len(output), 2)
+        self.assertIn("WARNUNG: Station A hat HW2 erreicht", output[0])
+        self.assertIn("1 Stufenwechsel, 1 ab HW2, 0 ab HW100", output[1])
+
+        # Gleiche Stufen: nur die Zusammenfassung
+        output = run([entry("A", "61 cm", "18.10.2026 14:15"), entry("B", "21 cm", "18.10.2026 14:15")])
+        self.assertEqual(len(output), 1)
+        self.assertIn("Bewertung: 2 Stationen, 0 Stufenwechsel", output[0])
+
+        output = run([entry("A", "120 cm", "18.10.2026 14:30")])
+        self.assertIn("überschreitet kritischen Wert", output[0])
+        self.assertIn("1 ab HW100 (A)", output[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_chromedriver.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import chromedriver
+from chromedriver import resolve_chromedriver
+
+
+def fake_driver(directory, version, name="chromedriver"):
+    # Ausführbares Skript, das sich wie "chromedriver --version" meldet
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"#!{sys.executable}\nprint('ChromeDriver {version} (abc)')\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+@unittest.skipIf(os.name == "nt", "Fake-chromedriver ist ein Shebang-Skript")
+class TestResolveChromedriver(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.dir, "chromedriver.json")
+        self.installs = []
+        chromedriver._resolved.clear()
+        # Kein chromedriver aus der Umgebung oder dem PATH des Testrechners
+        self.env = mock.patch.dict(os.environ, {"PATH": self.dir}, clear=False)
+        self.env.start()
+        os.environ.pop("CHROMEDRIVER_PATH", None)
+
+    def tearDown(self):
+        self.env.stop()
+        chromedriver._resolved.clear()
+        shutil.rmtree(self.dir)
+
+    def installer(self, version):
+        self.installs.append(version)
+        directory = os.path.join(self.dir, f"wdm{len(self.installs)}")
+        os.makedirs(directory)
+        return fake_driver(directory, version or "120.0.6099.109")
+
+    def offline(self, version):
+        raise OSError("Netz nicht erreichbar")
+
+    def test_second_start_resolves_offline_from_cache(self):
+        path = resolve_chromedriver(cache_path=self.cache_path, installer=self.installer)
+        self.assertEqual(self.installs, [None])
+        with open(self.cache_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["version"], "120.0.6099.109")
+
+        chromedriver._resolved.clear()
+        self.assertEqual(resolve_chromedriver(cache_path=self.cache_path, installer=self.offline), path)
+        self.assertEqual(resolve_chromedriver("120", cache_path=self.cache_path, installer=self.offline), path)
+
+    def test_pinned_version_replaces_mismatching_cache(self):
+        resolve_chromedriver(cache_path=self.cache_path, installer=self.installer)
+        path = resolve_chromedriver("121.0.6167.85", cache_path=self.cache_path, installer=self.installer)
+        self.assertEqual(self.installs, [None, "121.0.6167.85"])
+        self.assertEqual(chromedriver.driver_version(path), "121.0.6167.85")
+
+    def test_explicit_path_and_path_lookup_need_no_network(self):
+        explicit = fake_driver(self.dir, "119.0.1", name="mein-chromedriver")
+        self.assertEqual(resolve_chromedriver(path=explicit, cache_path=self.cache_path, installer=self.offline), explicit)
+        on_path = fake_driver(self.dir, "120.0.1")
+        self.assertEqual(resolve_chromedriver(cache_path=self.cache_path, installer=self.offline), on_path)
+        # Nicht passende Version im PATH: ohne Netz gibt es keinen Driver
+        chromedriver._resolved.clear()
+        with self.assertRaises(Exception) as raised:
+            resolve_chromedriver("121", cache_path=self.cache_path, installer=self.offline)
+        self.assertIn("CHROMEDRIVER_PATH", str(raised.exception))
+
+    def test_refresh_skips_cache(self):
+        first = resolve_chromedriver(cache_path=self.cache_path, installer=self.installer)
+        second = resolve_chromedriver(cache_path=self.cache_path, installer=self.installer, refresh=True)
+        self.assertNotEqual(first, second)
+        chromedriver._resolved.clear()
+        self.assertEqual(resolve_chromedriver(cache_path=self.cache_path, installer=self.offline), second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_classification.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from config_manager import diff_threshold_maps
+from classification import LEVEL_HW100, LEVEL_NAMES, ThresholdClassifier, level_for
+
+THRESHOLDS = {
+    "Odenbach": {"HW100": 549, "HW50": 535, "HW20": 516, "HW2": 439, "MW": 150},
+    "Nur HW100": {"HW100": 150},
+}
+
+
+class TestThresholdClassifier(unittest.TestCase):
+    def test_levels_match_scalar_logic(self):
+        classifier = ThresholdClassifier(THRESHOLDS, hysteresis_cm=0)
+        values = [100, 150, 440, 520, 540, 600]
+        levels = classifier.classify(["Odenbach"] * len(values), values)
+        self.assertEqual([LEVEL_NAMES[l] for l in levels], ["unter MW", "MW", "HW2", "HW20", "HW50", "HW100"])
+        self.assertEqual(list(levels), [level_for(v, THRESHOLDS["Odenbach"]) for v in values])
+
+    def test_missing_thresholds_and_unknown_stations(self):
+        classifier = ThresholdClassifier(THRESHOLDS, hysteresis_cm=0)
+        levels = classifier.classify(["Nur HW100", "Nur HW100", "Unbekannt"], [149, 160, 10000])
+        self.assertEqual(list(levels), [0, LEVEL_HW100, 0])
+
+    def test_hysteresis_prevents_flapping(self):
+        classifier = ThresholdClassifier(THRESHOLDS, hysteresis_cm=5)
+        sequence = [440, 438, 436, 440, 433, 430]
+        levels = [int(classifier.classify(["Odenbach"], [v])[0]) for v in sequence]
+        # HW2 = 439: Rückfall erst unter 434 cm
+        self.assertEqual([LEVEL_NAMES[l] for l in levels], ["HW2", "HW2", "HW2", "HW2", "MW", "MW"])
+
+    def test_missing_value_keeps_level(self):
+        classifier = ThresholdClassifier(THRESHOLDS)
+        classifier.classify(["Odenbach"], [600])
+        self.assertEqual(int(classifier.classify(["Odenbach"], [None])[0]), LEVEL_HW100)
+
+    def test_update_keeps_state_of_remaining_stations(self):
+        classifier = ThresholdClassifier(THRESHOLDS)
+        classifier.classify(["Odenbach"], [600])
+        classifier.update_thresholds({"Neu": {"HW100": 10}, "Odenbach": THRESHOLDS["Odenbach"]})
+        self.assertEqual(int(classifier.classify(["Odenbach"], [547])[0]), LEVEL_HW100)
+
+    def test_apply_diff_matches_rebuild(self):
+        classifier = ThresholdClassifier(THRESHOLDS)
+        classifier.classify(["Odenbach", "Nur HW100"], [600, 160])
+        new_map = {"Odenbach": dict(THRESHOLDS["Odenbach"], HW2=300), "Neu": {"MW": 10, "HW100": 50}}
+        classifier.apply_diff(diff_threshold_maps(THRESHOLDS, new_map), new_map)
+        self.assertIs(classifier.threshold_map, new_map)
+        self.assertEqual(sorted(classifier.station_index), ["Neu", "Odenbach"])
+        # Stufe von Odenbach bleibt erhalten, die neue Schwelle wirkt
+        self.assertEqual(int(classifier.classify(["Odenbach"], [547])[0]), LEVEL_HW100)
+
+        rebuilt = ThresholdClassifier(new_map, hysteresis_cm=0)
+        classifier.hysteresis_cm = 0
+        names = ["Odenbach", "Neu", "Neu", "Nur HW100"]
+        values = [310, 20, 60, 1000]
+        self.assertEqual(list(classifier.classify(names, values)), list(rebuilt.classify(names, values)))
+
+
+if __name__ == "__main__":
+    unittest.main()
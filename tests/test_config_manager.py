@@ -4,7 +4,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 import unittest
 import json
-from config_manager import load_config
+from config_manager import load_config, config_file_hash, diff_threshold_maps
 
 class TestConfigManager(unittest.TestCase):
     def setUp(self):
@@ -39,5 +39,20 @@ class TestConfigManager(unittest.TestCase):
         self.assertIn("Odenbach", threshold_map)
         self.assertEqual(threshold_map["Odenbach"].get("HW100"), 150)
 
+    def test_hash_changes_only_with_content(self):
+        first = config_file_hash(self.test_config_path)
+        os.utime(self.test_config_path)
+        self.assertEqual(config_file_hash(self.test_config_path), first)
+        with open(self.test_config_path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        self.assertNotEqual(config_file_hash(self.test_config_path), first)
+
+    def test_diff_threshold_maps(self):
+        old = {"A": {"HW100": 100}, "B": {"HW100": 200}, "C": {"HW100": 300}}
+        new = {"A": {"HW100": 100}, "B": {"HW100": 210}, "D": {"HW100": 400}}
+        diff = diff_threshold_maps(old, new)
+        self.assertEqual((diff.added, diff.removed, diff.changed), (["D"], ["C"], ["B"]))
+        self.assertEqual(diff_threshold_maps(None, {"A": {}}).added, ["A"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_config_snapshot.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import shutil
+import tempfile
+import unittest
+from config_manager import load_config, save_config
+from config_snapshot import load_config_snapshot, snapshot_path_for
+from classification import ThresholdClassifier
+
+CONFIG = {
+    "general_config": {"poll_interval_seconds": 300, "data_url": "https://example.com", "unbenutzt": [1, 2, 3]},
+    "water_stations": [
+        {"name": "Odenbach", "riverName": "Glan", "riverAreaName": "Nahe", "catchmentArea": "20 km²",
+         "waterThresholds": {"HW100": 549, "HW50": 535, "HW20": 516, "HW2": 439, "MW": 150}},
+        {"name": "Nur HW100", "riverName": None, "waterThresholds": {"HW100": 150.5}},
+    ],
+}
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmpdir, "water_level_config.json")
+        save_config(CONFIG, self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_matches_json_loader(self):
+        config, threshold_map = load_config_snapshot(self.config_path)
+        self.assertTrue(os.path.exists(snapshot_path_for(self.config_path)))
+        json_config, json_map = load_config(self.config_path)
+        self.assertEqual(dict(threshold_map), json_map)
+        self.assertEqual(config["general_config"], {"poll_interval_seconds": 300, "data_url": "https://example.com"})
+        self.assertEqual(config["water_stations"], [{"name": "Odenbach", "riverName": "Glan"},
+                                                    {"name": "Nur HW100", "riverName": None}])
+        classifier = ThresholdClassifier(threshold_map, hysteresis_cm=0)
+        self.assertEqual(list(classifier.classify(["Odenbach", "Nur HW100"], [540, 151])), [4, 5])
+
+    def test_stale_snapshot_falls_back_to_json(self):
+        load_config_snapshot(self.config_path)
+        changed = json.loads(json.dumps(CONFIG))
+        changed["water_stations"][0]["waterThresholds"]["HW100"] = 600
+        save_config(changed, self.config_path)
+        _, threshold_map = load_config_snapshot(self.config_path)
+        self.assertEqual(threshold_map["Odenbach"]["HW100"], 600)
+
+    def test_touch_keeps_snapshot_and_corrupt_snapshot_is_rebuilt(self):
+        load_config_snapshot(self.config_path)
+        os.utime(self.config_path, ns=(0, 0))
+        self.assertEqual(load_config_snapshot(self.config_path)[1]["Odenbach"]["MW"], 150)
+        with open(snapshot_path_for(self.config_path), "wb") as f:
+            f.write(b"kaputt")
+        self.assertEqual(load_config_snapshot(self.config_path)[1]["Odenbach"]["MW"], 150)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_config_watcher.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from config_manager import save_config
+from config_watcher import ConfigFileHandler
+
+
+def event(src_path, dest_path=None):
+    return SimpleNamespace(src_path=src_path, dest_path=dest_path, is_directory=False)
+
+
+class TestConfigFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmpdir, "water_level_config.json")
+        save_config({"water_stations": []}, self.config_path)
+        self.calls = []
+        self.handler = ConfigFileHandler(self.config_path, lambda: self.calls.append(1), debounce_interval=0.05)
+
+    def tearDown(self):
+        self.handler.cancel()
+        shutil.rmtree(self.tmpdir)
+
+    def settle(self):
+        time.sleep(0.2)
+
+    def test_burst_triggers_one_reload(self):
+        save_config({"water_stations": [{"name": "A"}]}, self.config_path)
+        for _ in range(5):
+            self.handler.on_modified(event(self.config_path))
+        self.settle()
+        self.assertEqual(self.calls, [1])
+
+    def test_unchanged_content_is_ignored(self):
+        with open(self.config_path, "rb") as f:
+            content = f.read()
+        with open(self.config_path, "wb") as f:
+            f.write(content)
+        self.handler.on_modified(event(self.config_path))
+        self.settle()
+        self.assertEqual(self.calls, [])
+
+    def test_tmp_file_ignored_and_atomic_replace_detected(self):
+        save_config({"water_stations": [{"name": "B"}]}, self.config_path)
+        self.handler.on_modified(event(self.config_path + ".tmp"))
+        self.handler.on_modified(event(os.path.join(self.tmpdir, "old_water_level_config.json")))
+        self.settle()
+        self.assertEqual(self.calls, [])
+        self.handler.on_moved(event(self.config_path + ".tmp", self.config_path))
+        self.settle()
+        self.assertEqual(self.calls, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# tests/test_create_json_config.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import threading
+import unittest
+from unittest import mock
+from create_json_config import create_json_config, harvest_thresholds
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
+
+
+class FakeRetriever:
+    def __init__(self, failures):
+        self.failures = failures
+        self.closed = False
+
+    def get_station_thresholds(self, station_href):
+        with self.failures["lock"]:
+            remaining = self.failures.get(station_href, 0)
+            self.failures[station_href] = remaining - 1
+        if remaining > 0:
+            raise Exception("Timeout")
+        return {"HW100": int(station_href.rsplit("/", 1)[1])}
+
+    def close(self):
+        self.closed = True
+
+
+class TestHarvestThresholds(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        failures = {"lock": threading.Lock()}
+        created = []
+
+        def factory():
+            created.append(FakeRetriever(failures))
+            return created[-1]
+
+        hrefs = [f"/station/{i}" for i in range(50)]
+        results = harvest_thresholds(hrefs, factory, max_workers=8, progress=None)
+        self.assertEqual(results, [{"HW100": i} for i in range(50)])
+        self.assertLessEqual(len(created), 8)
+        self.assertTrue(all(r.closed for r in created))
+
+    def test_retry_with_backoff(self):
+        failures = {"lock": threading.Lock(), "/station/1": 2, "/station/2": 5}
+        progress = []
+        results = harvest_thresholds(
+            ["/station/1", "/station/2"], lambda: FakeRetriever(failures),
+            max_workers=2, retries=2, backoff_seconds=0.001,
+            progress=lambda done, total, href: progress.append((done, total)),
+        )
+        self.assertEqual(results, [{"HW100": 1}, {}])
+        self.assertEqual(sorted(progress), [(1, 2), (2, 2)])
+
+
+class ListRetriever:
+    def __init__(self, data):
+        self.data = data
+        self.detail_requests = []
+
+    def get_all_water_data(self, url, filter_names=None):
+        return self.data
+
+    def get_station_thresholds(self, station_href):
+        self.detail_requests.append(station_href)
+        return {"HW100": 100 + len(self.detail_requests)}
+
+    def close(self):
+        pass
+
+
+class FailingRetriever(ListRetriever):
+    def get_station_thresholds(self, station_href):
+        self.detail_requests.append(station_href)
+        raise Exception("Detailseite nicht erreichbar")
+
+
+class TestIncrementalConfig(unittest.TestCase):
+    def setUp(self):
+        self.output_filename = "test_incremental_config.json"
+        self.cache_filename = "test_station_cache.json"
+        self.output_path = os.path.join(CONFIG_DIR, self.output_filename)
+        self.cache_path = os.path.join(CONFIG_DIR, self.cache_filename)
+        existing = {
+            "water_stations": [
+                {"name": "Odenbach", "riverName": "Glan", "riverAreaName": "Glan",
+                 "catchmentArea": "1.088,17 km²", "waterThresholds": {"HW100": 549}},
+                {"name": "Entfallen", "riverName": "X", "riverAreaName": "X",
+                 "catchmentArea": "1 km²", "waterThresholds": {"HW100": 1}},
+            ],
+            "general_config": {"poll_interval_seconds": 10, "selected_stations": ["Odenbach"]},
+        }
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            json.dump(existing, f)
+
+    def tearDown(self):
+        for path in (self.output_path, self.cache_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _run(self, data, **kwargs):
+        retriever = ListRetriever(data)
+        create_json_config("https://example.com/pegelliste", output_filename=self.output_filename,
+                           retriever=retriever, incremental=True, cache_filename=self.cache_filename, **kwargs)
+        with open(self.output_path, encoding="utf-8") as f:
+            return retriever, json.load(f)
+
+    def test_only_new_stations_are_fetched(self):
+        data = [
+            ("Odenbach", "Glan", "Glan", "152 cm", "", "1.088,17 km²", "/glan/odenbach"),
+            ("Neu", "Nahe", "Nahe", "10 cm", "", "5 km²", "/nahe/neu"),
+        ]
+        retriever, config = self._run(data)
+        self.assertEqual(retriever.detail_requests, ["/nahe/neu"])
+        self.assertEqual([s["name"] for s in config["water_stations"]], ["Odenbach", "Neu"])
+        self.assertEqual(config["water_stations"][0]["waterThresholds"], {"HW100": 549})
+        self.assertEqual(config["water_stations"][1]["href"], "/nahe/neu")
+        self.assertEqual(config["general_config"]["poll_interval_seconds"], 10)
+
+        # Zweiter Lauf kommt vollständig aus dem Cache, ein geänderter href wird neu abgerufen
+        retriever, config = self._run(data)
+        self.assertEqual(retriever.detail_requests, [])
+        data[0] = data[0][:6] + ("/glan/odenbach-neu",)
+        retriever, config = self._run(data)
+        self.assertEqual(retriever.detail_requests, ["/glan/odenbach-neu"])
+
+    def test_expired_entries_are_refetched(self):
+        data = [("Odenbach", "Glan", "Glan", "152 cm", "", "1.088,17 km²", "/glan/odenbach")]
+        self._run(data)
+        retriever, config = self._run(data, cache_ttl_seconds=-1)
+        self.assertEqual(retriever.detail_requests, ["/glan/odenbach"])
+        self.assertEqual(config["water_stations"][0]["waterThresholds"], {"HW100": 101})
+        with open(self.cache_path, encoding="utf-8") as f:
+            fetched_at = json.load(f)["/glan/odenbach"]["fetchedAt"]
+
+        # Scheitert der erneute Abruf, bleiben die bekannten Werte samt Abrufzeitpunkt erhalten
+        failing = FailingRetriever(data)
+        with mock.patch("create_json_config.time.sleep"), self.assertLogs(level="WARNING"):
+            create_json_config("https://example.com/pegelliste", output_filename=self.output_filename,
+                               retriever=failing, incremental=True, cache_filename=self.cache_filename,
+                               cache_ttl_seconds=-1)
+        self.assertEqual(len(failing.detail_requests), 3)
+        with open(self.output_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["water_stations"][0]["waterThresholds"], {"HW100": 101})
+        with open(self.cache_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["/glan/odenbach"], {"waterThresholds": {"HW100": 101}, "fetchedAt": fetched_at})
+
+
+if __name__ == "__main__":
+    unittest.main()
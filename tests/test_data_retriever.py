@@ -0,0 +1,231 @@
+# tests/test_data_retriever.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import re
+import unittest
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+import time
+from data_retriever import extract_row_dom, get_all_water_data, get_station_thresholds, parse_water_rows, thresholds_from_rows
+from deadline import Deadline
+from fixture_server import FixtureServer
+from fixture_site import FixtureDriver, load_stations, site_routes, list_url
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+BASE_URL = "https://hochwasser.rlp.de/pegelliste/land"
+
+_COMPOUND = re.compile(r'^(\w+)?(?:\.([\w-]+))?(?:\[([\w-]+)="([^"]*)"\])?$')
+
+
+class FakeElement:
+    """
+    Minimaler WebElement-Ersatz auf Basis von ElementTree, der die im
+    data_retriever verwendeten CSS-Selektoren versteht.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def _matches(node, compound):
+        tag, cls, attr, value = _COMPOUND.match(compound).groups()
+        if tag and node.tag != tag:
+            return False
+        if cls and cls not in (node.get("class") or "").split():
+            return False
+        if attr and node.get(attr) != value:
+            return False
+        return True
+
+    def _select(self, compounds, node):
+        for child in node.iter():
+            if child is node or not self._matches(child, compounds[0]):
+                continue
+            if len(compounds) == 1:
+                yield child
+            else:
+                yield from self._select(compounds[1:], child)
+
+    def find_elements(self, by, selector):
+        if by == By.CLASS_NAME:
+            selector = "." + selector
+        matches = list(dict.fromkeys(self._select(selector.split(), self.node)))
+        return [FakeElement(m) for m in matches]
+
+    def find_element(self, by, selector):
+        matches = self.find_elements(by, selector)
+        if not matches:
+            raise Exception(f"NoSuchElement: {selector}")
+        return matches[0]
+
+    @property
+    def text(self):
+        return " ".join("".join(self.node.itertext()).split())
+
+    def get_attribute(self, name):
+        value = self.node.get(name)
+        if name == "href" and value is not None:
+            return urljoin(BASE_URL, value)
+        return value
+
+
+class TestPageSourceParser(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(FIXTURE_DIR, "pegelliste_page.html"), encoding="utf-8") as f:
+            self.page_source = f.read()
+        self.root = FakeElement(ET.fromstring(self.page_source.replace("<!DOCTYPE html>", "")))
+
+    def _extract_dom(self, filter_names=None):
+        water_data = []
+        for row in self.root.find_elements(By.CLASS_NAME, "MuiDataGrid-row"):
+            try:
+                entry = extract_row_dom(row, filter_names)
+            except Exception:
+                continue
+            if entry is not None:
+                water_data.append(entry)
+        return water_data
+
+    def test_source_matches_dom_extractor(self):
+        expected = self._extract_dom()
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(parse_water_rows(self.page_source, base_url=BASE_URL), expected)
+
+    def test_source_matches_dom_extractor_with_filter(self):
+        expected = self._extract_dom(["Odenbach"])
+        result = parse_water_rows(self.page_source, base_url=BASE_URL, filter_names=["Odenbach"])
+        self.assertEqual(result, expected)
+        self.assertEqual(result, [(
+            "Odenbach", "Glan", "Glan", "152 cm", "18.10.2026 14:15", "1.088,17 km²",
+            "https://hochwasser.rlp.de/flussgebiet/glan/odenbach",
+        )])
+
+    def test_values_above_1000_cm(self):
+        result = parse_water_rows(self.page_source, base_url=BASE_URL, filter_names=["Zeltingen & Rachtig"])
+        self.assertEqual(result[0][3], "1.204 cm")
+        self.assertEqual(result[0].value_cm, 1204)
+        self.assertEqual(thresholds_from_rows([("HW 100", "1.150 cm"), ("MW", "431 cm")], "x"), {"HW100": 1150, "MW": 431})
+
+    def test_river_area_falls_back_to_text(self):
+        result = parse_water_rows(self.page_source, base_url=BASE_URL, filter_names=["Albisheim"])
+        self.assertEqual(result[0][2], "Oberrhein")
+        self.assertEqual(result[0][3], "31 cm")
+
+
+class FakeGridElement:
+    def __init__(self, driver, page):
+        self.driver = driver
+        self.page = page
+
+    def is_enabled(self):
+        if self.driver.page != self.page:
+            raise StaleElementReferenceException("stale")
+        return True
+
+    def is_displayed(self):
+        return True
+
+    def find_element(self, by, selector):
+        return self
+
+    def click(self):
+        self.driver.page += 1
+
+
+class FakeGridDriver:
+    """Blättert durch eine Liste von Seitenquelltexten, wie es das MuiDataGrid tut."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page = 0
+        self.page_source_calls = 0
+        self.current_url = BASE_URL
+
+    def get(self, url):
+        self.page = 0
+
+    @property
+    def page_source(self):
+        self.page_source_calls += 1
+        return self.pages[self.page]
+
+    def find_elements(self, by, selector):
+        if by == By.CLASS_NAME:
+            return [FakeGridElement(self, self.page)]
+        return []
+
+    def find_element(self, by, selector):
+        if by == By.XPATH and self.page == len(self.pages) - 1:
+            raise NoSuchElementException("kein Next-Button")
+        return FakeGridElement(self, self.page)
+
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(FIXTURE_DIR, "pegelliste_page.html"), encoding="utf-8") as f:
+            page_source = f.read()
+        rows = re.findall(r'<div class="MuiDataGrid-row.*?</div>\n</div>', page_source, re.S)
+        self.pages = ["<div>" + "".join(chunk) + "</div>" for chunk in (rows[0:2], rows[2:3], rows[3:5])]
+
+    def test_stops_paging_when_all_stations_found(self):
+        driver = FakeGridDriver(self.pages)
+        data = get_all_water_data(driver, BASE_URL, filter_names=["Odenbach", "Abentheuer"])
+        self.assertEqual([entry[0] for entry in data], ["Abentheuer", "Odenbach"])
+        self.assertEqual(driver.page, 1)
+        self.assertEqual(driver.page_source_calls, 2)
+
+
+class TestRecordedPegelliste(unittest.TestCase):
+    """Mehrseitige Pegelliste mit allen 244 Stationen über den lokalen FixtureServer."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stations = load_stations()
+        cls.server = FixtureServer(site_routes(cls.stations)).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.driver = FixtureDriver()
+
+    def tearDown(self):
+        self.driver.quit()
+
+    def test_pages_through_all_stations(self):
+        last = self.stations[-1]
+        data = get_all_water_data(self.driver, list_url(self.server.base_url), filter_names=[last["name"]])
+        self.assertEqual(self.driver.page_loads, 10)
+        self.assertEqual([entry[0] for entry in data], [last["name"]])
+        self.assertEqual(data[0][3], f"{last['yLast']} cm")
+
+    def test_last_page_ends_without_waiting_for_disabled_button(self):
+        start = time.perf_counter()
+        data = get_all_water_data(self.driver, list_url(self.server.base_url))
+        self.assertEqual(len(data), len(self.stations))
+        self.assertEqual(self.driver.page_loads, 10)
+        self.assertLess(time.perf_counter() - start, 3)
+
+    def test_deadline_returns_pages_read_so_far(self):
+        # Frist in Seitenaufrufen statt Sekunden: läuft nach dem dritten Laden ab
+        deadline = Deadline(3, clock=lambda: self.driver.page_loads)
+        with self.assertLogs(level="WARNING") as logs:
+            data = get_all_water_data(self.driver, list_url(self.server.base_url), deadline=deadline)
+        self.assertEqual(self.driver.page_loads, 3)
+        self.assertEqual([entry[0] for entry in data], [s["name"] for s in self.stations[:len(data)]])
+        self.assertIn("nach 2 Seite(n)", logs.output[0])
+
+    def test_detail_page_thresholds(self):
+        station = next(s for s in self.stations if s["name"] == "Odenbach")
+        thresholds = get_station_thresholds(self.driver, self.server.base_url + station["href"])
+        self.assertEqual(thresholds, {key.replace(" ", ""): value for key, value in station["waterThresholds"].items()})
+
+
+if __name__ == "__main__":
+    unittest.main()
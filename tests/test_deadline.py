@@ -0,0 +1,114 @@
+# tests/test_deadline.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import unittest
+from deadline import Deadline
+from latest_readings import LatestReadings
+from pipeline import StationPipeline
+from retriever import HttpRetriever, Retriever
+from fixture_server import FixtureServer
+from fixture_site import api_url, load_stations, site_routes
+
+CONFIG = {"general_config": {"data_url": "x"}}
+
+
+def entry(name, value):
+    return (name, "Nahe", "Nahe", f"{value} cm", "18.10.2026 14:15", "", "/" + name)
+
+
+class SlowRetriever(Retriever):
+    """Liefert nur die ersten reach Stationen und lässt dabei die Frist ablaufen."""
+
+    def __init__(self, now):
+        self.now = now
+        self.reach = None
+
+    def get_all_water_data(self, url, filter_names=None, deadline=None):
+        names = filter_names[:self.reach] if self.reach is not None else filter_names
+        if self.reach is not None:
+            self.now[0] += 100
+        return [entry(name, 200 + self.now[0]) for name in names]
+
+    def get_station_thresholds(self, station_href):
+        return {}
+
+
+class TestDeadline(unittest.TestCase):
+    def test_timeout_is_capped_by_remaining_time(self):
+        now = [0.0]
+        deadline = Deadline(10, clock=lambda: now[0])
+        self.assertEqual(deadline.timeout(5), 5)
+        now[0] = 8
+        self.assertEqual(deadline.timeout(5), 2)
+        self.assertFalse(deadline.expired())
+        now[0] = 11
+        self.assertEqual(deadline.timeout(5), 0)
+        self.assertTrue(deadline.expired())
+        self.assertFalse(Deadline().expired())
+
+
+class TestLastKnownGood(unittest.TestCase):
+    def test_unreached_stations_are_filled_with_their_age(self):
+        now = [0.0]
+        clock = lambda: now[0]
+        retriever = SlowRetriever(now)
+        pipeline = StationPipeline(clock=clock)
+        names = ["Kirn", "Boos", "Odenbach"]
+
+        data = pipeline.fetch(CONFIG, retriever, names, Deadline(60, clock=clock))
+        self.assertEqual(pipeline.stale_ages, {})
+        now[0] = 900
+        retriever.reach = 1
+        with self.assertLogs(level="WARNING") as logs:
+            partial = pipeline.fetch(CONFIG, retriever, names, Deadline(60, clock=clock))
+        self.assertIn("2 Station(en) aus dem letzten Stand", logs.output[0])
+        self.assertEqual([e[0] for e in partial], names)
+        self.assertEqual(partial[0][3], "1200 cm")
+        self.assertEqual(partial[1:], data[1:])
+        self.assertEqual(pipeline.stale_ages, {"Boos": 1000, "Odenbach": 1000})
+
+        # Der ergänzte Stand ist unverändert und wird nicht erneut bewertet
+        threshold_map = {}
+        pipeline.get_classifier(threshold_map)
+        with self.assertLogs(level="INFO"):
+            self.assertEqual(len(pipeline.select(CONFIG, threshold_map, data)), 3)
+            selected = pipeline.select(CONFIG, threshold_map, partial)
+        self.assertEqual([e[0] for e in selected], ["Kirn"])
+
+    def test_http_timeout_falls_back_to_last_good(self):
+        # Das HTTP-Backend bricht mit dem durch die Frist begrenzten Socket-Timeout ab
+        stations = load_stations()
+        server = FixtureServer(site_routes(stations)).start()
+        retriever = HttpRetriever(api_url=api_url(server.base_url))
+        try:
+            pipeline = StationPipeline()
+            data = pipeline.fetch(CONFIG, retriever)
+            self.assertEqual(len(data), len(stations))
+            server.latency = 1.0
+            with self.assertLogs(level="WARNING") as logs:
+                partial = pipeline.fetch(CONFIG, retriever, deadline=Deadline(0.3))
+            self.assertIn("nach Ablauf der Frist abgebrochen", logs.output[0])
+            self.assertEqual(partial, data)
+            self.assertEqual(len(pipeline.stale_ages), len(stations))
+        finally:
+            retriever.close()
+            server.stop()
+
+    def test_latest_readings_carry_staleness(self):
+        latest = LatestReadings(clock=lambda: 0)
+        latest.update([entry("Kirn", 300), entry("Boos", 310)], [1, 1])
+        latest.mark_stale({"Boos": 912.4}, ["Kirn", "Boos"])
+        self.assertEqual(latest.snapshot.records["Boos"]["staleSeconds"], 912)
+        self.assertNotIn("staleSeconds", latest.snapshot.records["Kirn"])
+        etag = latest.snapshot.etag
+        latest.mark_stale({}, ["Kirn"])
+        self.assertEqual(latest.snapshot.etag, etag)
+        latest.mark_stale({}, ["Boos"])
+        self.assertNotIn("staleSeconds", latest.snapshot.records["Boos"])
+
+
+if __name__ == "__main__":
+    unittest.main()
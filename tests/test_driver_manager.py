@@ -0,0 +1,133 @@
+# tests/test_driver_manager.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from selenium.common.exceptions import InvalidSessionIdException
+from driver_manager import DriverPool
+
+
+class FakeDriver:
+    created = 0
+
+    def __init__(self):
+        FakeDriver.created += 1
+        self.id = FakeDriver.created
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise Exception("chrome not reachable")
+        return "about:blank"
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDriverPool(unittest.TestCase):
+    def setUp(self):
+        FakeDriver.created = 0
+        self.clock = FakeClock()
+
+    def test_pool_is_warm(self):
+        pool = DriverPool(size=3, driver_factory=FakeDriver, clock=self.clock)
+        self.assertEqual(FakeDriver.created, 3)
+        self.assertEqual(pool.stats()["idle"], 3)
+        pool.close()
+
+    def test_dead_driver_is_replaced_on_checkout(self):
+        pool = DriverPool(size=1, driver_factory=FakeDriver, clock=self.clock)
+        with pool.driver() as driver:
+            driver.alive = False
+        with pool.driver() as driver:
+            self.assertEqual(driver.id, 2)
+        self.assertEqual(pool.stats()["replaced"], 1)
+
+    def test_recycle_after_page_loads(self):
+        pool = DriverPool(size=1, driver_factory=FakeDriver, max_page_loads=2, clock=self.clock)
+        ids = [pool.run(lambda driver: driver.get("about:blank") or driver.id) for _ in range(5)]
+        self.assertEqual(ids, [1, 1, 2, 2, 3])
+        self.assertEqual(pool.stats()["recycled"], 2)
+
+    def test_page_loads_count_get_calls_not_checkouts(self):
+        pool = DriverPool(size=1, driver_factory=FakeDriver, max_page_loads=3, clock=self.clock)
+        for _ in range(5):
+            pool.run(lambda driver: driver.id)
+        self.assertEqual(pool.stats()["recycled"], 0)
+
+        def three_pages(driver):
+            for page in range(3):
+                driver.get(f"/seite/{page}")
+            return driver.id
+
+        self.assertEqual(pool.run(three_pages), 1)
+        self.assertEqual(pool.run(lambda driver: driver.id), 2)
+
+    def test_failed_replacement_keeps_original_error_and_refills_slot(self):
+        fail = [False]
+
+        def factory():
+            if fail[0]:
+                raise Exception("chromedriver startet nicht")
+            return FakeDriver()
+
+        pool = DriverPool(size=1, driver_factory=factory, clock=self.clock)
+        fail[0] = True
+        with self.assertRaises(InvalidSessionIdException), self.assertLogs(level="ERROR"):
+            with pool.driver():
+                raise InvalidSessionIdException("invalid session id")
+        self.assertEqual(pool.stats()["missing"], 1)
+        fail[0] = False
+        with pool.driver() as driver:
+            self.assertEqual(driver.id, 2)
+        self.assertEqual(pool.stats()["missing"], 0)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_session_error_is_retried_with_new_driver(self):
+        pool = DriverPool(size=1, driver_factory=FakeDriver, clock=self.clock)
+        calls = []
+
+        def fetch(driver):
+            calls.append(driver.id)
+            if driver.id == 1:
+                raise InvalidSessionIdException("invalid session id")
+            return "ok"
+
+        self.assertEqual(pool.run(fetch), "ok")
+        self.assertEqual(calls, [1, 2])
+
+    def test_other_errors_keep_driver(self):
+        pool = DriverPool(size=1, driver_factory=FakeDriver, clock=self.clock)
+
+        def fetch(driver):
+            raise ValueError("Parserfehler")
+
+        with self.assertRaises(ValueError):
+            pool.run(fetch)
+        self.assertEqual(pool.run(lambda driver: driver.id), 1)
+
+    def test_stats_report_driver_age(self):
+        pool = DriverPool(size=2, driver_factory=FakeDriver, clock=self.clock)
+        self.clock.now = 120.0
+        stats = pool.stats()
+        self.assertEqual(stats["driver_age_max_seconds"], 120.0)
+        pool.close()
+        self.assertEqual(pool.stats()["driver_age_max_seconds"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_latest_readings.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import gzip
+import json
+import unittest
+import http.client
+from latest_readings import LatestReadings, start_http_server
+
+
+def entry(name, river, area, y_last, x_last="18.10.2026 14:15"):
+    return (name, river, area, y_last, x_last, "1,00 km²", "/" + name)
+
+
+class TestLatestReadingsApi(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_800_000_000
+        self.latest = LatestReadings(clock=lambda: self.now)
+        self.latest.update([
+            entry("Odenbach", "Glan", "Glan", "152 cm"),
+            entry("Kirn", "Nahe", "Nahe", "480 cm"),
+            entry("Abentheuer", "Traunbach", "Nahe", "38 cm"),
+        ], [1, 2, 0])
+        self.server = start_http_server(self.latest, 0)
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, path, headers=None):
+        self.conn.request("GET", path, headers=headers or {})
+        response = self.conn.getresponse()
+        body = response.read()
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response, json.loads(body) if body else None
+
+    def test_bulk_and_conditional_get(self):
+        response, payload = self.get("/readings", {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual([s["name"] for s in payload["stations"]], ["Odenbach", "Kirn", "Abentheuer"])
+        self.assertEqual(payload["stations"][1]["valueCm"], 480)
+        self.assertEqual(payload["stations"][1]["level"], "HW2")
+        etag = response.getheader("ETag")
+
+        response, _ = self.get("/readings", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        response, _ = self.get("/readings?river=Nahe", {"If-Modified-Since": response.getheader("Last-Modified")})
+        self.assertEqual(response.status, 304)
+
+        # Gleiche Messung erneut: Stand und ETag bleiben, neue Messung ändert beide
+        self.latest.update([entry("Kirn", "Nahe", "Nahe", "480 cm")], [2])
+        self.assertEqual(self.get("/readings", {"If-None-Match": etag})[0].status, 304)
+        self.now += 900
+        self.latest.update([entry("Kirn", "Nahe", "Nahe", "470 cm", "18.10.2026 14:30")], [2])
+        response, payload = self.get("/readings", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader("ETag"), etag)
+        self.assertEqual(len(payload["stations"]), 3)
+
+    def test_filters_and_single_station(self):
+        _, payload = self.get("/readings?area=Nahe")
+        self.assertEqual([s["name"] for s in payload["stations"]], ["Kirn", "Abentheuer"])
+        _, payload = self.get("/readings?area=Nahe&min_level=HW2")
+        self.assertEqual([s["name"] for s in payload["stations"]], ["Kirn"])
+        _, payload = self.get("/readings?station=Odenbach,Kirn&river=Glan")
+        self.assertEqual([s["name"] for s in payload["stations"]], ["Odenbach"])
+        self.assertEqual(self.get("/readings?min_level=HW7")[0].status, 400)
+
+        response, record = self.get("/readings/Odenbach")
+        self.assertEqual((response.status, record["valueCm"], record["level"]), (200, 152, "MW"))
+        self.assertEqual(self.get("/readings/Unbekannt")[0].status, 404)
+
+        self.latest.remove(["Odenbach"])
+        self.assertEqual(self.get("/readings/Odenbach")[0].status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_logging_config.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+import logging_config
+from logging.handlers import TimedRotatingFileHandler
+from logging_config import JsonLinesFormatter, RateLimitFilter, setup_logging, shutdown_logging
+
+
+def record(message, level=logging.ERROR, **extra):
+    entry = logging.LogRecord("root", level, __file__, 1, message, None, None)
+    entry.__dict__.update(extra)
+    return entry
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    def test_repeated_errors_are_suppressed_and_counted(self):
+        now = [0.0]
+        limiter = RateLimitFilter(interval_seconds=60, clock=lambda: now[0])
+        self.assertTrue(limiter.filter(record("Timeout")))
+        self.assertFalse(limiter.filter(record("Timeout")))
+        self.assertFalse(limiter.filter(record("Timeout")))
+        self.assertTrue(limiter.filter(record("Anderer Fehler")))
+        self.assertTrue(limiter.filter(record("Timeout", level=logging.INFO)))
+        now[0] = 61
+        passed = record("Timeout")
+        self.assertTrue(limiter.filter(passed))
+        self.assertEqual(passed.getMessage(), "Timeout (2 gleiche Meldungen unterdrückt)")
+
+
+class TestSetupLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.root = logging.getLogger()
+        self.previous = (self.root.level, list(self.root.handlers))
+
+    def tearDown(self):
+        shutdown_logging()
+        self.root.setLevel(self.previous[0])
+        self.root.handlers[:] = self.previous[1]
+        shutil.rmtree(self.tmpdir)
+
+    def test_queue_mode_writes_json_lines(self):
+        setup_logging(log_dir=self.tmpdir, log_file="test.log", use_queue=True, json_lines=True)
+        # Erneuter Aufruf ersetzt die Handler statt sie zu verdoppeln
+        setup_logging(log_dir=self.tmpdir, log_file="test.log", use_queue=True, json_lines=True,
+                      rate_limit_seconds=60)
+        handlers = [h for h in self.root.handlers if h not in self.previous[1]]
+        self.assertEqual([type(h).__name__ for h in handlers], ["QueueHandler"])
+        for _ in range(3):
+            logging.error("Seite nicht erreichbar")
+        logging.info("Zyklus fertig", extra={"stations": 244})
+        shutdown_logging()
+        with open(os.path.join(self.tmpdir, "test.log"), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["message"] for line in lines], ["Seite nicht erreichbar", "Zyklus fertig"])
+        self.assertEqual(lines[1]["stations"], 244)
+        self.assertEqual(lines[0]["level"], "ERROR")
+
+    def test_queue_mode_closes_file_on_re_setup(self):
+        setup_logging(log_dir=self.tmpdir, log_file="test.log", use_queue=True)
+        file_handler = next(h for h in logging_config._listener.handlers if isinstance(h, TimedRotatingFileHandler))
+        logging.info("erste Einrichtung")
+        self.assertIsNotNone(file_handler.stream)
+        setup_logging(log_dir=self.tmpdir, log_file="test.log", use_queue=True)
+        self.assertIsNone(file_handler.stream)
+        shutdown_logging()
+        self.assertEqual(logging_config._listener_handlers, [])
+
+    def test_json_formatter_includes_exception(self):
+        try:
+            raise ValueError("kaputt")
+        except ValueError:
+            entry = logging.LogRecord("root", logging.ERROR, __file__, 1, "Fehler", None, sys.exc_info())
+        line = json.loads(JsonLinesFormatter().format(entry))
+        self.assertIn("ValueError: kaputt", line["exception"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# tests/test_metrics.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import unittest
+import urllib.request
+import metrics
+from fixture_server import FixtureServer
+from fixture_site import FixtureDriver, load_stations, site_routes, list_url
+from pipeline import StationPipeline
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_prometheus_text(self):
+        registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+        registry.inc("water_pages_visited_total", 3)
+        registry.set_gauge("water_driver_rss_bytes", 1024, driver=0)
+        registry.observe("water_stage_seconds", 0.05, stage="navigate")
+        registry.observe("water_stage_seconds", 0.5, stage="navigate")
+        text = registry.render()
+        self.assertIn("# TYPE water_pages_visited_total counter\nwater_pages_visited_total 3\n", text)
+        self.assertIn('water_driver_rss_bytes{driver="0"} 1024\n', text)
+        self.assertIn('water_stage_seconds_bucket{stage="navigate",le="0.1"} 1\n', text)
+        self.assertIn('water_stage_seconds_bucket{stage="navigate",le="1.0"} 2\n', text)
+        self.assertIn('water_stage_seconds_bucket{stage="navigate",le="+Inf"} 2\n', text)
+        self.assertIn('water_stage_seconds_count{stage="navigate"} 2\n', text)
+
+    def test_driver_pool_totals_are_counters(self):
+        class Pool:
+            def stats(self):
+                return {"idle": 1, "recycled": 2, "replaced": 1}
+
+            def memory(self):
+                return [None]
+
+        metrics.enable()
+        try:
+            metrics.record_driver_pool(Pool())
+            text = metrics.registry().render()
+        finally:
+            metrics.disable()
+        self.assertIn("# TYPE water_driver_pool_recycled_total counter\nwater_driver_pool_recycled_total 2\n", text)
+        self.assertIn("# TYPE water_driver_pool_replaced_total counter\n", text)
+        self.assertIn("# TYPE water_driver_pool_idle gauge\n", text)
+
+    def test_disabled_is_noop(self):
+        metrics.disable()
+        self.assertIsNone(metrics.start_cycle())
+        self.assertIs(metrics.timer("a"), metrics.timer("b"))
+        metrics.inc("water_rows_parsed_total")
+        self.assertIsNone(metrics.registry())
+
+
+class TestCycleInstrumentation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stations = load_stations()
+        cls.server = FixtureServer(site_routes(cls.stations)).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_cycle_summary_and_endpoint(self):
+        registry = metrics.enable()
+        last = self.stations[-1]
+        config = {"general_config": {"data_url": list_url(self.server.base_url), "selected_stations": [last["name"]]}}
+        driver = FixtureDriver()
+        try:
+            with self.assertLogs(level="INFO") as logs:
+                StationPipeline().process(config, {}, driver)
+        finally:
+            driver.quit()
+
+        summary = [line for line in logs.output if "Zyklus:" in line]
+        self.assertEqual(len(summary), 1)
+        self.assertIn("1 Zeilen, 0 Fehler, 10 Seiten, 0 Timeouts", summary[0])
+        for stage in ("fetch", "navigate", "wait_rows", "extract", "paginate", "evaluate"):
+            self.assertIn(stage, summary[0])
+        self.assertEqual(registry.counters[("water_pages_visited_total", ())], 10)
+
+        server = metrics.start_http_server(0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                text = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("water_pages_visited_total 10\n", text)
+        self.assertIn("water_cycle_duration_seconds_count 1\n", text)
+        self.assertIn('water_stage_seconds_count{stage="paginate"} 9\n', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_reading_store.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import shutil
+import tempfile
+import unittest
+from reading_store import ReadingStore, parse_x_last
+
+
+class TestReadingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ReadingStore(os.path.join(self.tmpdir, "readings.sqlite"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_unchanged_timestamp_is_deduplicated(self):
+        cycle = [("Odenbach", 1000, 150), ("Abentheuer", 1000, 38)]
+        self.assertEqual(self.store.append_cycle(cycle), 2)
+        self.assertEqual(self.store.append_cycle(cycle), 0)
+        self.assertEqual(self.store.append_cycle([("Odenbach", 1900, 152), ("Abentheuer", 1000, 38)]), 1)
+        self.assertEqual(self.store.range("Odenbach"), [(1000, 150), (1900, 152)])
+
+    def test_dedup_survives_reopen(self):
+        self.store.append_cycle([("Odenbach", 1000, 150)])
+        self.store.close()
+        self.store = ReadingStore(os.path.join(self.tmpdir, "readings.sqlite"))
+        self.assertEqual(self.store.append_cycle([("Odenbach", 1000, 150)]), 0)
+
+    def test_range_and_downsample(self):
+        for i in range(8):
+            self.store.append_cycle([("Odenbach", i * 900, 100 + i)])
+        self.assertEqual(self.store.range("Odenbach", 1800, 3600), [(1800, 102), (2700, 103), (3600, 104)])
+        self.assertEqual(self.store.downsample("Odenbach", 3600), [
+            (0, 101.5, 100, 103, 4),
+            (3600, 105.5, 104, 107, 4),
+        ])
+        self.assertEqual(self.store.range("Unbekannt"), [])
+
+    def test_retention(self):
+        store = ReadingStore(os.path.join(self.tmpdir, "retention.sqlite"), retention_days=1,
+                             clock=lambda: 10 * 24 * 3600)
+        store.append_cycle([("Odenbach", 0, 1), ("Odenbach", 10 * 24 * 3600 - 60, 2)])
+        self.assertEqual(store.range("Odenbach"), [(10 * 24 * 3600 - 60, 2)])
+        store.close()
+
+    def test_parse_x_last(self):
+        self.assertEqual(parse_x_last("18.10.2026 14:15"), parse_x_last("18.10.2026, 14:15 Uhr"))
+        self.assertEqual(parse_x_last("18.10.2026 14:15") - parse_x_last("18.10.2026 14:00"), 900)
+        self.assertIsNone(parse_x_last("-"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_readings.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+from change_detection import ChangeDetector
+from reading_store import parse_x_last
+from readings import Reading, ReadingBuilder, parse_value_cm, to_readings
+
+ODENBACH = ("Odenbach", "Glan", "Glan", "152 cm", "18.10.2026 14:15", "1.088,17 km²",
+            "https://hochwasser.rlp.de/flussgebiet/glan/odenbach")
+
+
+class TestReading(unittest.TestCase):
+    def test_typed_fields_and_tuple_access(self):
+        reading = ReadingBuilder().build(*ODENBACH)
+        self.assertEqual(reading.value_cm, 152)
+        self.assertEqual(reading.timestamp, parse_x_last("18.10.2026 14:15"))
+        self.assertEqual(reading.station.catchment_km2, 1088.17)
+        self.assertEqual(reading.datetime.utcoffset().total_seconds(), 7200)
+        self.assertIsNone(reading.raw)
+
+        self.assertEqual(reading, ODENBACH)
+        self.assertEqual(tuple(reading), ODENBACH)
+        self.assertEqual(reading[3], "152 cm")
+        self.assertEqual(reading[-1], ODENBACH[6])
+        name, _, _, y_last, x_last, _, _ = reading
+        self.assertEqual((name, y_last, x_last), ("Odenbach", "152 cm", "18.10.2026 14:15"))
+
+    def test_unparseable_text_is_kept(self):
+        reading = ReadingBuilder().build("Kirn", "Nahe", "Nahe", "-- cm", "-", "", None)
+        self.assertIsNone(reading.value_cm)
+        self.assertIsNone(reading.timestamp)
+        self.assertIsNone(reading.station.catchment_km2)
+        self.assertEqual(reading[3:5], ("-- cm", "-"))
+
+    def test_thousands_separator(self):
+        reading = ReadingBuilder().build("Zeltingen & Rachtig", "Mosel", "Mosel", "1.204 cm", "18.10.2026 13:45", "", None)
+        self.assertEqual(reading.value_cm, 1204)
+        self.assertEqual(reading[3], "1.204 cm")
+        self.assertEqual(parse_value_cm("1.204 cm"), 1204)
+
+    def test_json_numbers_render_like_the_table(self):
+        reading = ReadingBuilder().build("Odenbach", "Glan", "Glan", 152, "18.10.2026 14:15", 1088.17, ODENBACH[6])
+        self.assertEqual(reading, ODENBACH)
+        self.assertIsNone(reading.raw)
+
+    def test_stations_and_timestamps_are_shared(self):
+        first = to_readings([ODENBACH])[0]
+        later = ("Odenbach",) + ODENBACH[1:3] + ("153 cm", "18.10.2026 14:30") + ODENBACH[5:]
+        builder = ReadingBuilder()
+        second, third = builder.build(*later), builder.build(*later)
+        self.assertIs(first.station, second.station)
+        self.assertIs(second.timestamp, third.timestamp)
+        self.assertIs(to_readings([first])[0], first)
+        self.assertIsInstance(first, Reading)
+
+    def test_change_detector_compares_parsed_values(self):
+        detector = ChangeDetector(clock=lambda: 0)
+        self.assertEqual(len(detector.update(to_readings([ODENBACH])).new), 1)
+        delta = detector.update(to_readings([ODENBACH]))
+        self.assertEqual((delta.new, delta.changed, delta.unchanged), ([], [], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_retriever.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import unittest
+from fixture_server import FixtureServer
+from retriever import HttpRetriever, Retriever, create_retriever
+
+
+class TestHttpRetriever(unittest.TestCase):
+    def setUp(self):
+        self.server = FixtureServer({
+            "/pegelliste/land": "pegelliste_page.html",
+            "/api/pegelliste": "pegelliste_api.json",
+            "/flussgebiet/glan/odenbach": "station_detail.html",
+        }).start()
+        self.retriever = HttpRetriever(timeout=5)
+
+    def tearDown(self):
+        self.retriever.close()
+        self.server.stop()
+
+    def test_html_station_list(self):
+        url = self.server.base_url + "/pegelliste/land"
+        data = self.retriever.get_all_water_data(url, filter_names=["Odenbach"])
+        self.assertEqual(data, [(
+            "Odenbach", "Glan", "Glan", "152 cm", "18.10.2026 14:15", "1.088,17 km²",
+            "https://hochwasser.rlp.de/flussgebiet/glan/odenbach",
+        )])
+
+    def test_json_station_list(self):
+        retriever = create_retriever({"retriever": "http", "http_api_url": self.server.base_url + "/api/pegelliste"})
+        try:
+            data = retriever.get_all_water_data(self.server.base_url + "/pegelliste/land")
+        finally:
+            retriever.close()
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[2], (
+            "Odenbach", "Glan", "Glan", "152 cm", "18.10.2026 14:15", "1.088,17 km²",
+            self.server.base_url + "/flussgebiet/glan/odenbach",
+        ))
+
+    def test_station_thresholds(self):
+        thresholds = self.retriever.get_station_thresholds(self.server.base_url + "/flussgebiet/glan/odenbach")
+        self.assertEqual(thresholds, {"HW100": 549, "HW50": 535, "HW20": 516, "HW2": 439, "MW": 150})
+
+    def test_missing_detail_page(self):
+        self.assertEqual(self.retriever.get_station_thresholds(self.server.base_url + "/flussgebiet/unbekannt"), {})
+
+    def test_keep_alive_connection_is_reused(self):
+        url = self.server.base_url + "/pegelliste/land"
+        for _ in range(3):
+            self.retriever.get_all_water_data(url)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.requests), 3)
+
+
+class TestRetrieverInterface(unittest.TestCase):
+    def test_incomplete_backend_fails_on_creation(self):
+        class ListOnly(Retriever):
+            def get_all_water_data(self, url, filter_names=None, deadline=None):
+                return []
+
+        with self.assertRaises(TypeError):
+            ListOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
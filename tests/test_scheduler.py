@@ -0,0 +1,97 @@
+# tests/test_scheduler.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import random
+import unittest
+from scheduler import PollScheduler, scheduled_stations
+
+THRESHOLDS = {"HW100": 549, "HW50": 535, "HW20": 516, "HW2": 439, "MW": 150}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPollScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make(self, stations, **kwargs):
+        options = dict(base_interval=300, min_interval=60, max_interval=900, jitter=0.0,
+                       min_fetch_gap=10, batch_window=10, clock=self.clock)
+        options.update(kwargs)
+        return PollScheduler(stations, **options)
+
+    def run_cycle(self, scheduler, duration=0.0):
+        self.clock.now += scheduler.next_delay()
+        due = scheduler.pop_due()
+        self.clock.now += duration
+        scheduler.complete(due)
+        return due
+
+    def test_all_stations_due_at_start_and_intervals_per_river(self):
+        scheduler = self.make([("A", "Nahe"), ("B", "Glan")], river_intervals={"Glan": 120})
+        self.assertEqual(sorted(self.run_cycle(scheduler)), ["A", "B"])
+        self.assertEqual(scheduler.next_delay(), 120)
+        self.assertEqual(self.run_cycle(scheduler), ["B"])
+        self.assertEqual(self.clock.now, 120)
+
+    def test_drift_correction(self):
+        scheduler = self.make([("A", "Nahe")])
+        starts = []
+        for _ in range(4):
+            self.clock.now += scheduler.next_delay()
+            starts.append(self.clock.now)
+            due = scheduler.pop_due()
+            self.clock.now += 40  # langsamer Abruf
+            scheduler.complete(due)
+        self.assertEqual(starts, [0, 300, 600, 900])
+
+    def test_rising_towards_hw2_polls_faster_and_mw_backs_off(self):
+        scheduler = self.make([("Steigt", "Glan"), ("Niedrig", "Glan")])
+        self.run_cycle(scheduler)
+        scheduler.observe("Steigt", 380, 1, THRESHOLDS)
+        scheduler.observe("Steigt", 400, 1, THRESHOLDS)
+        scheduler.observe("Niedrig", 100, 0, THRESHOLDS)
+        self.assertEqual(scheduler.interval_for("Steigt"), 60)
+        self.assertEqual(scheduler.interval_for("Niedrig"), 600)
+        scheduler.observe("Steigt", 300, 1, THRESHOLDS)
+        self.assertEqual(scheduler.interval_for("Steigt"), 300)
+
+    def test_rate_limit_and_jitter(self):
+        scheduler = self.make([(str(i), "Nahe") for i in range(20)], min_interval=1, base_interval=5,
+                              jitter=0.2, min_fetch_gap=30, batch_window=0, rng=random.Random(1))
+        fetch_times = []
+        for _ in range(5):
+            self.clock.now += scheduler.next_delay()
+            if scheduler.pop_due():
+                fetch_times.append(self.clock.now)
+        gaps = [b - a for a, b in zip(fetch_times, fetch_times[1:])]
+        self.assertTrue(all(gap >= 30 for gap in gaps))
+
+    def test_sync_adds_and_removes_stations(self):
+        scheduler = self.make([("A", "Nahe")])
+        self.run_cycle(scheduler)
+        scheduler.sync([("B", "Nahe")])
+        self.assertEqual(scheduler.next_delay(), 10)  # min_fetch_gap seit dem letzten Abruf
+        self.clock.now += 10
+        self.assertEqual(scheduler.pop_due(), ["B"])
+
+    def test_scheduled_stations_from_config(self):
+        config = {
+            "water_stations": [{"name": "A", "riverName": "Nahe"}, {"name": "B", "riverName": "Glan"}],
+            "general_config": {"selected_stations": []},
+        }
+        self.assertEqual(scheduled_stations(config), [("A", "Nahe"), ("B", "Glan")])
+        config["general_config"]["selected_stations"] = ["B"]
+        self.assertEqual(scheduled_stations(config), [("B", "Glan")])
+
+
+if __name__ == "__main__":
+    unittest.main()
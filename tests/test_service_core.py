@@ -0,0 +1,139 @@
+# tests/test_service_core.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import subprocess
+import unittest
+from retriever import Retriever
+from service_core import ServiceCore
+
+
+class CountingRetriever(Retriever):
+    def __init__(self):
+        self.fetches = 0
+        self.closed = False
+
+    def get_all_water_data(self, url, filter_names=None, deadline=None):
+        self.fetches += 1
+        # Jeder Abruf liefert eine neue Messung
+        return [("Odenbach", "Glan", "Glan", f"{400 + self.fetches} cm", f"18.10.2026 14:{self.fetches:02d}", "1 km²", "/o")]
+
+    def get_station_thresholds(self, station_href):
+        return {}
+
+    def close(self):
+        self.closed = True
+
+
+class SlowStore:
+    def __init__(self):
+        self.batches = []
+
+    def append_cycle(self, readings):
+        time.sleep(0.15)
+        self.batches.append(list(readings))
+
+    def close(self):
+        pass
+
+
+class TestServiceCore(unittest.TestCase):
+    def setUp(self):
+        fd, self.config_path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "water_stations": [{"name": "Odenbach", "riverName": "Glan",
+                                    "waterThresholds": {"HW100": 549, "HW2": 439, "MW": 150}}],
+                "general_config": {"poll_interval_seconds": 0.02, "min_fetch_gap_seconds": 0.02,
+                                   "selected_stations": [], "data_url": "x"},
+            }, f)
+        self.retriever = CountingRetriever()
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def make_core(self):
+        return ServiceCore(
+            self.config_path, retriever_factory=lambda general: self.retriever,
+            store_factory=lambda general: None, watch_config=False,
+            scheduler_options={"clock": time.monotonic},
+        )
+
+    def test_slow_sink_does_not_delay_fetching(self):
+        core = self.make_core()
+        sink_calls = []
+
+        def slow_sink(cycle):
+            sink_calls.append(cycle["readings"])
+            time.sleep(0.5)
+
+        core.add_sink("langsam", slow_sink)
+
+        async def scenario():
+            task = asyncio.ensure_future(core.run())
+            await asyncio.sleep(0.4)
+            core.stop()
+            await task
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(self.retriever.fetches, 5)
+        self.assertGreaterEqual(core.cycles, 5)
+        self.assertLess(len(sink_calls), core.cycles)
+        self.assertTrue(self.retriever.closed)
+        # Lese-API-Stand folgt jedem Abruf, auch wenn eine Ausgabe Abrufe verwirft
+        self.assertEqual(core.latest.snapshot.records["Odenbach"]["valueCm"], 400 + self.retriever.fetches)
+
+    def test_slow_store_loses_no_readings(self):
+        store = SlowStore()
+        core = ServiceCore(
+            self.config_path, retriever_factory=lambda general: self.retriever,
+            store_factory=lambda general: store, watch_config=False,
+            scheduler_options={"clock": time.monotonic},
+        )
+
+        async def scenario():
+            task = asyncio.ensure_future(core.run())
+            await asyncio.sleep(0.5)
+            core.stop()
+            await task
+
+        with self.assertLogs(level="WARNING") as logs:
+            asyncio.run(scenario())
+        self.assertTrue(any("zusammen gespeichert" in line for line in logs.output))
+        # Weniger Schreibvorgänge als Abrufe, aber jede Messung ist gespeichert
+        self.assertLess(len(store.batches), core.cycles)
+        self.assertEqual(sum(len(batch) for batch in store.batches), self.retriever.fetches)
+        self.assertEqual([r[2] for batch in store.batches for r in batch],
+                         [400 + i for i in range(1, self.retriever.fetches + 1)])
+
+    def test_stop_from_other_thread_before_start(self):
+        core = self.make_core()
+        core.stop()
+        thread = threading.Thread(target=lambda: asyncio.run(core.run()))
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(self.retriever.closed)
+
+
+class TestColdStart(unittest.TestCase):
+    def test_import_does_not_load_browser_or_watcher(self):
+        # Eigener Prozess, da die übrigen Tests selenium bereits geladen haben; service legt
+        # sein Log-Verzeichnis relativ zum Arbeitsverzeichnis an
+        src = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); import service, service_core, create_json_config; "
+                "print(sorted(m for m in sys.modules "
+                "if m.startswith(('selenium.webdriver.remote', 'watchdog', 'webdriver_manager'))))")
+        with tempfile.TemporaryDirectory() as cwd:
+            output = subprocess.run([sys.executable, "-c", code, src], cwd=cwd, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
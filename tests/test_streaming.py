@@ -0,0 +1,139 @@
+# tests/test_streaming.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import json
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from config_manager import save_config_stream
+from create_json_config import create_json_config
+from readings import ReadingBuilder, _format_number_de
+from retriever import Retriever, SeleniumRetriever
+from fixture_server import FixtureServer
+from fixture_site import FixtureDriver, list_url, load_stations, site_routes, synthetic_stations
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
+
+
+class SyntheticRetriever(Retriever):
+    """Liefert count synthetische Stationen seitenweise, erzeugt erst beim Abruf der Seite."""
+
+    def __init__(self, count, page_size=500):
+        self.count = count
+        self.page_size = page_size
+        self.pages_read = 0
+        self.details_before_last_page = 0
+        self.detail_requests = 0
+        self._lock = threading.Lock()
+
+    def iter_water_data(self, url, filter_names=None, deadline=None):
+        builder = ReadingBuilder()
+        page = []
+        for station in synthetic_stations(self.count):
+            page.append(builder.build(
+                station["name"], station["riverName"], station["riverAreaName"], f"{station['yLast']} cm",
+                station["xLast"], f"{_format_number_de(station['catchmentArea'])} km²"
+                if station["catchmentArea"] is not None else "", station["href"],
+            ))
+            if len(page) == self.page_size:
+                self.pages_read += 1
+                yield page
+                page = []
+        if page:
+            self.pages_read += 1
+            yield page
+
+    def get_all_water_data(self, url, filter_names=None, deadline=None):
+        return [entry for page in self.iter_water_data(url, filter_names) for entry in page]
+
+    def get_station_thresholds(self, station_href):
+        with self._lock:
+            self.detail_requests += 1
+            if self.pages_read * self.page_size < self.count:
+                self.details_before_last_page += 1
+        return {"HW100": len(station_href)}
+
+
+class TestSaveConfigStream(unittest.TestCase):
+    def test_matches_json_dump(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            for stations in ([], [{"name": "Kördorf", "waterThresholds": {}}, {"name": "B", "waterThresholds": {"MW": 1}}]):
+                general = {"poll_interval_seconds": 300, "selected_stations": [], "alerts": {"sinks": [{"type": "log"}]}}
+                count = save_config_stream(iter(stations), general, path)
+                with open(path, encoding="utf-8") as f:
+                    written = f.read()
+                expected = json.dumps({"water_stations": stations, "general_config": general}, indent=4, ensure_ascii=False)
+                self.assertEqual(written, expected)
+                self.assertEqual(count, len(stations))
+        finally:
+            os.remove(path)
+
+
+class TestPageStream(unittest.TestCase):
+    def test_first_page_arrives_before_the_next_is_loaded(self):
+        stations = load_stations()
+        server = FixtureServer(site_routes(stations)).start()
+        driver = FixtureDriver()
+        try:
+            pages = SeleniumRetriever(driver, owns_driver=False).iter_water_data(list_url(server.base_url))
+            first = next(pages)
+            self.assertEqual(driver.page_loads, 1)
+            self.assertEqual(len(first), 25)
+            rest = [entry for page in pages for entry in page]
+            self.assertEqual([e[0] for e in first + rest], [s["name"] for s in stations])
+        finally:
+            driver.quit()
+            server.stop()
+
+
+class TestSyntheticFixture50k(unittest.TestCase):
+    COUNT = 50_000
+
+    def setUp(self):
+        self.output_filename = "test_streaming_config.json"
+        self.cache_filename = "test_streaming_cache.json"
+
+    def tearDown(self):
+        for name in (self.output_filename, self.cache_filename):
+            path = os.path.join(CONFIG_DIR, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load(self):
+        with open(os.path.join(CONFIG_DIR, self.output_filename), encoding="utf-8") as f:
+            return json.load(f)["water_stations"]
+
+    def test_peak_memory_stays_flat(self):
+        retriever = SyntheticRetriever(self.COUNT)
+        tracemalloc.start()
+        try:
+            create_json_config("https://example.com/pegelliste", output_filename=self.output_filename,
+                               retriever=retriever, collect_thresholds=False)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Die fertige Stationsliste allein bräuchte ein Vielfaches (ca. 1 KB je Station)
+        self.assertLess(peak, 4 * 1024 * 1024)
+        stations = self._load()
+        self.assertEqual(len(stations), self.COUNT)
+        self.assertTrue(stations[-1]["name"].endswith(f" {self.COUNT - 1}"))
+
+    def test_details_are_harvested_while_pages_load(self):
+        retriever = SyntheticRetriever(self.COUNT)
+        create_json_config("https://example.com/pegelliste", output_filename=self.output_filename,
+                           retriever=retriever, workers=4, cache_filename=self.cache_filename)
+        stations = self._load()
+        self.assertEqual(retriever.detail_requests, self.COUNT)
+        self.assertGreater(retriever.details_before_last_page, 0)
+        self.assertEqual([s["name"] for s in stations[:3]], [s["name"] for s in synthetic_stations(3)])
+        self.assertEqual(stations[-1]["waterThresholds"], {"HW100": len(stations[-1]["href"])})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# tests/test_subscriptions.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import json
+import time
+import asyncio
+import tempfile
+import unittest
+from retriever import Retriever
+from scheduler import scheduled_stations
+from service_core import ServiceCore
+from subscriptions import Subscription, SubscriptionPlan
+
+CONFIG = {
+    "water_stations": [
+        {"name": "Kirn", "riverName": "Nahe", "waterThresholds": {"HW2": 300, "MW": 100}},
+        {"name": "Boos", "riverName": "Nahe", "waterThresholds": {"HW2": 300, "MW": 100}},
+        {"name": "Odenbach", "riverName": "Glan", "waterThresholds": {"HW2": 439, "MW": 150}},
+    ],
+    "general_config": {"selected_stations": []},
+}
+
+
+def entry(name, value):
+    return (name, "", "", f"{value} cm", "18.10.2026 14:15", "", "/" + name)
+
+
+class TestSubscriptionPlan(unittest.TestCase):
+    def test_merged_stations_intervals_and_index(self):
+        nahe = Subscription("nahe", rivers=["Nahe"], poll_interval=120)
+        kirn = Subscription("kirn", stations=["Kirn", "Kirn"], poll_interval=60)
+        plan = SubscriptionPlan([nahe, kirn], CONFIG)
+        self.assertEqual(plan.stations, ["Kirn", "Boos"])
+        self.assertEqual(plan.station_intervals, {"Kirn": 60, "Boos": 120})
+        self.assertEqual(plan.index["Kirn"], (nahe, kirn))
+        self.assertEqual(len(scheduled_stations(CONFIG, [])), 3)
+
+    def test_subscriptions_extend_the_selected_stations(self):
+        plan = SubscriptionPlan([Subscription("kirn", stations=["Kirn"])], CONFIG)
+        # Leere selected_stations bedeuten weiterhin alle Stationen
+        self.assertEqual(scheduled_stations(CONFIG, plan.stations),
+                         [("Kirn", "Nahe"), ("Boos", "Nahe"), ("Odenbach", "Glan")])
+        config = {**CONFIG, "general_config": {"selected_stations": ["Odenbach"]}}
+        self.assertEqual(scheduled_stations(config, plan.stations), [("Odenbach", "Glan"), ("Kirn", "Nahe")])
+
+    def test_rules_filter_per_subscriber(self):
+        all_changes = Subscription("alle", rivers=["Nahe"])
+        alarms = Subscription("alarm", stations=["Kirn", "Boos"], min_level="HW2", changes_only=True)
+        plan = SubscriptionPlan([all_changes, alarms], CONFIG)
+        data = [entry("Kirn", 320), entry("Boos", 310), entry("Odenbach", 200)]
+        routed = plan.route(data, levels=[2, 2, 1], previous_levels=[1, 2, 1])
+        self.assertEqual([(s.name, [n.station for n in batch]) for s, batch in routed],
+                         [("alle", ["Kirn", "Boos"]), ("alarm", ["Kirn"])])
+        self.assertEqual(routed[1][1][0].value_cm, 320)
+
+
+class StationRetriever(Retriever):
+    def __init__(self):
+        self.calls = []
+
+    def get_all_water_data(self, url, filter_names=None, deadline=None):
+        self.calls.append(sorted(filter_names))
+        value = 400 + len(self.calls)
+        return [entry(name, value) for name in filter_names]
+
+    def get_station_thresholds(self, station_href):
+        return {}
+
+
+class TestSharedFetch(unittest.TestCase):
+    def test_one_fetch_serves_all_subscribers(self):
+        fd, config_path = tempfile.mkstemp(suffix=".json")
+        config = json.loads(json.dumps(CONFIG))
+        config["general_config"].update({"poll_interval_seconds": 60, "min_fetch_gap_seconds": 0.01, "data_url": "x"})
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        retriever = StationRetriever()
+        received = {}
+
+        def sink(subscription, notifications):
+            received.setdefault(subscription.name, []).extend(n.station for n in notifications)
+
+        core = ServiceCore(config_path, retriever_factory=lambda general: retriever,
+                           store_factory=lambda general: None, watch_config=False,
+                           scheduler_options={"clock": time.monotonic})
+        for name in ("a", "b", "c"):
+            core.subscribe(Subscription(name, stations=["Kirn", "Odenbach"] if name != "c" else ["Boos"],
+                                        sinks=[sink]))
+
+        async def scenario():
+            task = asyncio.ensure_future(core.run())
+            await asyncio.sleep(0.3)
+            core.stop()
+            await task
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            os.remove(config_path)
+            snapshot = os.path.splitext(config_path)[0] + ".snapshot"
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+        self.assertEqual(retriever.calls, [["Boos", "Kirn", "Odenbach"]])
+        self.assertEqual(received, {"a": ["Kirn", "Odenbach"], "b": ["Kirn", "Odenbach"], "c": ["Boos"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_trend.py
+import sys, os
+# Füge den absoluten Pfad zum src-Ordner hinzu
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import unittest
+import numpy as np
+from trend import TrendEngine
+from pipeline import StationPipeline
+
+START = 1_792_000_000
+QUARTER = 900
+
+
+class TestTrendEngine(unittest.TestCase):
+    def test_incremental_slope_matches_regression_over_window(self):
+        engine = TrendEngine(capacity=4, alpha=1.0)
+        rng = np.random.default_rng(1)
+        values = np.cumsum(rng.integers(-3, 8, 30)) + 100
+        for i, value in enumerate(values):
+            rows = engine.update(["A"], [START + i * QUARTER], [int(value)])
+            if i >= 1:
+                window = slice(max(0, i - 3), i + 1)
+                hours = np.arange(30)[window] * QUARTER / 3600
+                expected = np.polyfit(hours, values[window], 1)[0]
+                self.assertAlmostEqual(engine.slopes(rows)[0], expected, places=6)
+
+    def test_only_newer_measurements_count(self):
+        engine = TrendEngine(alpha=1.0)
+        engine.update(["A"], [START], [100])
+        rows = engine.update(["A"], [START + QUARTER], [105])
+        engine.update(["A"], [START + QUARTER], [500])
+        engine.update(["A"], [None], [None])
+        self.assertAlmostEqual(engine.slopes(rows)[0], 20.0)
+
+    def test_gap_restarts_buffer(self):
+        engine = TrendEngine(alpha=1.0, max_gap_seconds=3600)
+        engine.update(["A"], [START], [100])
+        engine.update(["A"], [START + QUARTER], [50])
+        rows = engine.update(["A"], [START + 5 * 3600], [200])
+        self.assertTrue(np.isnan(engine.slopes(rows)[0]))
+
+    def test_time_to_thresholds(self):
+        engine = TrendEngine(alpha=1.0)
+        for i in range(4):
+            rows = engine.update(["steigt", "fällt"], [START + i * QUARTER] * 2, [400 + 10 * i, 400 - 10 * i])
+        limits = np.array([[150, 439, 516, np.inf, 549], [150, 439, 516, 535, 549]], dtype=float)
+        eta = engine.time_to_thresholds(rows, limits)
+        # 40 cm/h ab 430 cm: HW2 (439) in 13,5 min, HW20 (516) in 2 h 9 min
+        np.testing.assert_allclose(eta[0, :3], [0, 9 / 40 * 3600, 86 / 40 * 3600])
+        self.assertEqual(eta[0, 3], np.inf)
+        self.assertEqual(list(eta[1, 1:]), [np.inf] * 4)
+
+
+class TestApproachWarning(unittest.TestCase):
+    def test_warns_once_when_next_threshold_is_near(self):
+        pipeline = StationPipeline()
+        threshold_map = {"Odenbach": {"MW": 150, "HW2": 439, "HW100": 549}}
+
+        def run(i, value):
+            data = [("Odenbach", "Glan", "Glan", f"{value} cm", f"18.10.2026 {12 + i // 4:02d}:{i % 4 * 15:02d}", "", "/o")]
+            with self.assertLogs(level="INFO") as logs:
+                pipeline.evaluate({}, threshold_map, data, *pipeline.parse(data))
+            return [line for line in logs.output if "voraussichtlich" in line]
+
+        self.assertEqual(run(0, 380), [])
+        warnings = run(1, 395)
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("Station Odenbach steigt um 60 cm/h, HW2 voraussichtlich in 44 min", warnings[0])
+        self.assertEqual(run(2, 410), [])
+        # Fällt der Pegel anhaltend, gilt die Station nicht mehr als ansteigend
+        run(3, 360)
+        run(4, 300)
+        self.assertEqual(pipeline._approaching, {})
+
+
+if __name__ == "__main__":
+    unittest.main()